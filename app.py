@@ -1,4 +1,5 @@
 from flask import Flask, request, jsonify, render_template
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
 import json
@@ -7,44 +8,290 @@ from apscheduler.schedulers.background import BackgroundScheduler
 import logging
 from werkzeug.exceptions import BadRequest
 import uuid
+import hashlib
+import threading
+import atexit
 import shutil
 import re
 from backend.service.analyze_single_file import calculate_single_match_record_statistics
 from backend.schema.match_statistics_schema import MatchStatistics
-from backend.service.aggregate_team_statistics import (
-    create_team_statistics_from_matches,
-)
+from backend.schema import serialization
+from backend.service.statistics_cache import TeamStatisticsCache
+from backend.service.ingest_queue import IngestQueue, IngestJob
+from backend.service.backfill import backfill_processed_files
+from backend.service.warm_start import TeamStatisticsWarmStart
+from backend.service.aggregate_team_statistics import sections_for_fields
+from backend.service.match_filter import compile_filter
+from backend.service.response_cache import ResponseCache
+from backend.service.metrics import stage_metrics
 from backend.schema.team_statistics_schema import TeamStatistics
 from dataclasses import fields
 from backend.utils import *
 
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify 和 request.get_json 使用 serialization 选定的JSON实现"""
+
+    def dumps(self, obj, **kwargs):
+        return serialization.dumps(
+            obj,
+            indent=bool(kwargs.get("indent")),
+            sort_keys=kwargs.get("sort_keys", self.sort_keys),
+            default=kwargs.get("default", self.default),
+        )
+
+    def loads(self, s, **kwargs):
+        return serialization.loads(s)
+
+    def encode(self, obj) -> bytes:
+        """按 jsonify 的格式把对象编码为响应字节"""
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        with stage_metrics.stage("jsonify"):
+            body = serialization.dumps_bytes(
+                obj, indent=indent, sort_keys=self.sort_keys, default=self.default
+            )
+        return body + b"\n"
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # 启用跨域支持
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 不计入耗时统计的端点
+UNTIMED_ENDPOINTS = {"static", "get_metrics"}
+# Prometheus 文本格式的内容类型
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+@app.before_request
+def begin_stage_timing():
+    """开始记录本次请求各阶段的耗时，按 "方法 路由" 分别统计"""
+    if request.url_rule is not None and request.endpoint not in UNTIMED_ENDPOINTS:
+        stage_metrics.begin(f"{request.method} {request.url_rule.rule}")
+
+
+@app.teardown_request
+def finish_stage_timing(exc=None):
+    """结束本次请求的耗时记录（请求出错时也会调用）"""
+    stage_metrics.finish()
+
+
+# 按过滤条件缓存的队伍统计数据，/api/team-statistics 与 /api/rankings 共用
+team_statistics_cache = TeamStatisticsCache(
+    match_store,
+    vectorized=VECTORIZED_AGGREGATION,
+    partial_aggregation=PARTIAL_AGGREGATION,
+)
+# ETag 中的实例标识：数据集版本号在每次启动时从头计数，重启后不能复用旧的ETag
+ETAG_INSTANCE_ID = uuid.uuid4().hex[:8]
+
+
+def make_etag(endpoint, *params):
+    """由数据集版本和规范化后的请求参数生成强ETag"""
+    version = match_store.version
+    digest = hashlib.sha1(
+        serialization.dumps_bytes(
+            [endpoint, version, team_statistics_cache.generation, *params],
+            default=str,
+        )
+    ).hexdigest()[:16]
+    return f"{ETAG_INSTANCE_ID}-{version}-{digest}"
+
+
+# 编码好的响应字节（含gzip副本），键为上面的ETag，即 (接口, 规范化参数, 数据集版本)
+response_cache = ResponseCache(max_bytes=RESPONSE_CACHE_MAX_BYTES)
+# 数据变化后旧版本的响应不会再被请求，直接释放
+match_store.subscribe(response_cache.clear)
+
+# gzip 压缩的响应是另一种表示，使用带后缀的ETag
+GZIP_ETAG_SUFFIX = "-gzip"
+
+
+def not_modified(etag):
+    """
+    请求的 If-None-Match 与 etag 相同时返回304响应，否则返回None
+
+    压缩副本的ETag只在客户端接受gzip时才算匹配，否则客户端缓存的是它无法
+    使用的表示
+    """
+    candidates = [etag]
+    if request.accept_encodings["gzip"] > 0:
+        candidates.append(etag + GZIP_ETAG_SUFFIX)
+    for candidate in candidates:
+        if request.if_none_match.contains(candidate):
+            response = app.response_class(status=304)
+            response.set_etag(candidate)
+            response.headers["Cache-Control"] = "no-cache"
+            response.vary.add("Accept-Encoding")
+            return response
+    return None
+
+
+def with_etag(response, etag):
+    """给响应加上ETag；no-cache 让浏览器每次都带上 If-None-Match 重新验证"""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def cached_json_response(etag, build_payload):
+    """
+    返回 etag 对应的JSON响应
+
+    先查预序列化的响应缓存，未命中时才调用 build_payload() 生成数据并编码；
+    客户端接受gzip且有压缩副本时直接返回压缩后的字节
+    """
+    entry = response_cache.get(etag)
+    if entry is None:
+        entry = response_cache.put(etag, app.json.encode(build_payload()))
+
+    if entry.gzip_body is not None and request.accept_encodings["gzip"] > 0:
+        response = app.response_class(entry.gzip_body, mimetype=app.json.mimetype)
+        response.headers["Content-Encoding"] = "gzip"
+        etag += GZIP_ETAG_SUFFIX
+    else:
+        response = app.response_class(entry.body, mimetype=app.json.mimetype)
+    response.vary.add("Accept-Encoding")
+    return with_etag(response, etag)
+
+
+# 缓存的持久化，重启后直接恢复上次的聚合结果
+warm_start = TeamStatisticsWarmStart(
+    WARM_START_FILE, match_store, team_statistics_cache
+)
+
+# 后台定时任务
+scheduler = BackgroundScheduler(daemon=True)
+
+
+def start_background_jobs():
+    """
+    启动后台定时任务
+    """
+    if scheduler.running:
+        return
+    # 定期把追加日志压缩进处理后数据的快照
+    scheduler.add_job(
+        match_store.compact_snapshot,
+        "interval",
+        minutes=SNAPSHOT_COMPACT_INTERVAL_MINUTES,
+        id="compact_processed_snapshot",
+        replace_existing=True,
+    )
+    # 定期保存聚合结果的热启动快照
+    scheduler.add_job(
+        warm_start.save,
+        "interval",
+        minutes=WARM_START_SAVE_INTERVAL_MINUTES,
+        id="save_warm_start_snapshot",
+        replace_existing=True,
+    )
+    scheduler.start()
+    atexit.register(warm_start.save)
+
+
+def is_serving_process(use_reloader: bool) -> bool:
+    """
+    当前进程是否实际处理请求
+
+    debug 模式默认启用 Werkzeug 的自动重载器：父进程只负责监视文件并重启子进程，
+    不处理请求，它的定时任务会用过时的数据覆盖子进程写入的快照和追加日志。
+    实际提供服务的子进程中环境变量 WERKZEUG_RUN_MAIN 为 "true"
+    """
+    return not use_reloader or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+
 
 def perform_initial_statistics():
     """
     执行初始统计
     """
-    raw_files = [f for f in os.listdir(RAW_DATA_DIR) if f.endswith(".json")]
-    processed_files = [f for f in os.listdir(PROCESSED_DATA_DIR) if f.endswith(".json")]
-    for raw_file in raw_files:
-        if raw_file not in processed_files:
-            with open(os.path.join(RAW_DATA_DIR, raw_file), "r", encoding="utf-8") as f:
-                data = json.load(f)
-                match_statistics: MatchStatistics = (
-                    calculate_single_match_record_statistics(data)
-                )
-                processed_filepath = os.path.join(PROCESSED_DATA_DIR, raw_file)
-                match_statistics.save_to_json_file(processed_filepath)
-                logger.info(f"成功保存比赛记录: {raw_file}")
+    with stage_metrics.collect("startup"):
+        with stage_metrics.stage("backfill"):
+            backfill_processed_files(RAW_DATA_DIR, PROCESSED_DATA_DIR)
+        # 一次性加载所有处理后的数据到内存
+        match_store.load()
+        # 恢复上次保存的聚合结果，过期部分在后台重新计算
+        with stage_metrics.stage("warm_start"):
+            warm_start.restore()
     logger.info("初始统计完成")
 
 
+# 比赛记录必须包含的字段
+REQUIRED_MATCH_RECORD_FIELDS = ["teamNo", "matchNumber", "eventCode"]
+
+# 上一次分配的文件名时间戳（毫秒），保证同一进程内严格递增，批量上传时文件名不重复
+_last_record_timestamp = 0
+_record_timestamp_lock = threading.Lock()
+
+
+def _next_record_timestamp():
+    """获取用于文件名的毫秒时间戳"""
+    global _last_record_timestamp
+    with _record_timestamp_lock:
+        timestamp = int(datetime.datetime.now().timestamp() * 1000)
+        timestamp = max(timestamp, _last_record_timestamp + 1)
+        _last_record_timestamp = timestamp
+        return timestamp
+
+
+def validate_match_record(data):
+    """
+    验证比赛记录，返回错误信息；验证通过返回None
+    """
+    if not data or not isinstance(data, dict):
+        return "无效的JSON数据"
+    missing_fields = [
+        field for field in REQUIRED_MATCH_RECORD_FIELDS if field not in data
+    ]
+    if missing_fields:
+        return f'缺少必要字段: {", ".join(missing_fields)}'
+    return None
+
+
+def prepare_match_record(data):
+    """
+    为比赛记录生成文件名并添加服务器接收时间戳
+
+    Returns:
+        (文件名, 时间戳)
+    """
+    timestamp = _next_record_timestamp()
+    team_no = data.get("teamNo")
+    match_no = data.get("matchNumber")
+    event_code = data.get("eventCode")
+    tournament_level = data.get("tournamentLevel")
+    filename = f"match_record_{event_code}_{team_no}_{tournament_level}_{match_no}_{timestamp}.json"
+
+    # 添加服务器接收时间戳
+    data["serverReceivedTimestamp"] = datetime.datetime.now().isoformat()
+    data["filename"] = filename
+    return filename, timestamp
+
+
+def analyze_match_record(data, filename, timestamp):
+    """
+    分析比赛记录并保存处理后的文件（不更新内存存储）
+    """
+    with stage_metrics.stage("analyze"):
+        match_statistics: MatchStatistics = calculate_single_match_record_statistics(
+            data
+        )
+    processed_filepath = os.path.join(PROCESSED_DATA_DIR, filename)
+    with stage_metrics.stage("processed_write"):
+        match_statistics.save_to_json_file(processed_filepath)
+    match_statistics.file_name = filename
+    match_statistics.timestamp = str(timestamp)
+    return match_statistics
+
+
 @app.route("/api/match-records", methods=["POST"])
 def upload_match_record():
     """
@@ -58,46 +305,41 @@ def upload_match_record():
         # 获取JSON数据
         data = request.get_json()
 
-        if not data:
-            return jsonify({"success": False, "message": "无效的JSON数据"}), 400
-
         # 验证必要字段
-        required_fields = ["teamNo", "matchNumber", "eventCode"]
-        missing_fields = [field for field in required_fields if field not in data]
-
-        if missing_fields:
-            return (
-                jsonify(
-                    {
-                        "success": False,
-                        "message": f'缺少必要字段: {", ".join(missing_fields)}',
-                    }
-                ),
-                400,
-            )
+        error_message = validate_match_record(data)
+        if error_message:
+            return jsonify({"success": False, "message": error_message}), 400
 
         # 生成文件名
-        timestamp = int(datetime.datetime.now().timestamp() * 1000)
-        team_no = data.get("teamNo")
-        match_no = data.get("matchNumber")
-        event_code = data.get("eventCode")
-        tournament_level = data.get("tournamentLevel")
-        filename = f"match_record_{event_code}_{team_no}_{tournament_level}_{match_no}_{timestamp}.json"
+        filename, timestamp = prepare_match_record(data)
         filepath = os.path.join(RAW_DATA_DIR, filename)
 
-        # 添加服务器接收时间戳
-        data["serverReceivedTimestamp"] = datetime.datetime.now().isoformat()
-        data["filename"] = filename
-
         # 保存到文件
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with stage_metrics.stage("raw_write"):
+            serialization.dump_file(filepath, data, indent=True)
 
-        match_statistics: MatchStatistics = calculate_single_match_record_statistics(
-            data
-        )
-        processed_filepath = os.path.join(PROCESSED_DATA_DIR, filename)
-        match_statistics.save_to_json_file(processed_filepath)
+        # 交给后台队列分析，队列已满时同步处理
+        if INGEST_ASYNC:
+            job = ingest_queue.submit(filename, (data, timestamp))
+            if job is not None:
+                return (
+                    jsonify(
+                        {
+                            "success": True,
+                            "message": "比赛记录已接收，正在后台分析",
+                            "filename": filename,
+                            "timestamp": data["serverReceivedTimestamp"],
+                            "job_id": job.job_id,
+                            "status_url": f"/api/ingest-jobs/{job.job_id}",
+                        }
+                    ),
+                    202,
+                )
+            logger.warning(f"分析队列已满，同步处理比赛记录: {filename}")
+
+        match_statistics = analyze_match_record(data, filename, timestamp)
+        with stage_metrics.stage("store_update"):
+            match_store.add(filename, match_statistics)
         logger.info(f"成功保存比赛记录: {filename}")
 
         return (
@@ -119,6 +361,161 @@ def upload_match_record():
         return jsonify({"success": False, "message": f"服务器内部错误: {str(e)}"}), 500
 
 
+def _process_ingest_job(job: IngestJob):
+    """
+    后台分析一条已落盘的比赛记录
+    """
+    data, timestamp = job.payload
+    with stage_metrics.collect("ingest_queue"):
+        match_statistics = analyze_match_record(data, job.filename, timestamp)
+        with stage_metrics.stage("store_update"):
+            match_store.add(job.filename, match_statistics)
+    logger.info(f"成功保存比赛记录: {job.filename}")
+
+
+# 比赛记录的后台分析队列
+ingest_queue = IngestQueue(_process_ingest_job, max_size=INGEST_QUEUE_SIZE)
+
+
+@app.route("/api/ingest-jobs/<job_id>", methods=["GET"])
+def get_ingest_job(job_id):
+    """
+    查询后台分析任务状态
+    """
+    job = ingest_queue.get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "任务不存在"}), 404
+    return jsonify({"success": True, "data": job.to_dict()})
+
+
+def _parse_batch_body():
+    """
+    解析批量上传的请求体，支持JSON数组、单个JSON对象和NDJSON（每行一条JSON）
+
+    先按整个JSON文档解析：数组逐条处理，对象作为只有一条记录的批次，
+    其他类型的值抛出 ValueError。整体解析失败时才按NDJSON逐行解析。
+
+    Returns:
+        列表，每项为 (记录, 解析错误信息)
+    """
+    body = request.get_data(as_text=True).strip()
+    try:
+        parsed = serialization.loads(body)
+    except ValueError:
+        if body.startswith("["):
+            raise
+    else:
+        if isinstance(parsed, list):
+            return [(record, None) for record in parsed]
+        if isinstance(parsed, dict):
+            return [(parsed, None)]
+        raise ValueError("请求体应为JSON数组、JSON对象或NDJSON")
+
+    items = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append((serialization.loads(line), None))
+        except ValueError as e:
+            items.append((None, f"JSON格式错误: {str(e)}"))
+    return items
+
+
+@app.route("/api/match-records/batch", methods=["POST"])
+def upload_match_records_batch():
+    """
+    批量接收比赛记录（JSON数组或NDJSON）
+
+    所有记录先逐条验证和分析，再一次性写入文件，最后一次性更新内存存储，
+    缓存只失效一次。返回每条记录的处理结果。
+    """
+    try:
+        try:
+            items = _parse_batch_body()
+        except ValueError as e:
+            return jsonify({"success": False, "message": f"JSON格式错误: {str(e)}"}), 400
+
+        if not items:
+            return jsonify({"success": False, "message": "没有需要上传的比赛记录"}), 400
+
+        results = []
+        accepted = []
+        # 逐条验证并分析
+        for index, (data, error_message) in enumerate(items):
+            if error_message is None:
+                error_message = validate_match_record(data)
+            if error_message:
+                results.append(
+                    {"index": index, "success": False, "message": error_message}
+                )
+                continue
+            try:
+                filename, timestamp = prepare_match_record(data)
+                # 分析会修改动作列表，先序列化原始数据
+                with stage_metrics.stage("raw_write"):
+                    raw_content = serialization.dumps(data, indent=True)
+                with stage_metrics.stage("analyze"):
+                    match_statistics = calculate_single_match_record_statistics(data)
+                match_statistics.file_name = filename
+                match_statistics.timestamp = str(timestamp)
+            except Exception as e:
+                results.append(
+                    {"index": index, "success": False, "message": f"分析失败: {str(e)}"}
+                )
+                continue
+            accepted.append((index, filename, raw_content, match_statistics))
+            results.append(
+                {
+                    "index": index,
+                    "success": True,
+                    "filename": filename,
+                    "timestamp": data["serverReceivedTimestamp"],
+                }
+            )
+
+        # 一次性写入文件
+        stored = []
+        for index, filename, raw_content, match_statistics in accepted:
+            try:
+                with stage_metrics.stage("raw_write"), open(
+                    os.path.join(RAW_DATA_DIR, filename), "w", encoding="utf-8"
+                ) as f:
+                    f.write(raw_content)
+                with stage_metrics.stage("processed_write"):
+                    match_statistics.save_to_json_file(
+                        os.path.join(PROCESSED_DATA_DIR, filename)
+                    )
+                stored.append((filename, match_statistics))
+            except Exception as e:
+                logger.error(f"保存比赛记录 {filename} 失败: {str(e)}")
+                results[index] = {
+                    "index": index,
+                    "success": False,
+                    "message": f"保存失败: {str(e)}",
+                }
+
+        # 一次性更新内存存储
+        with stage_metrics.stage("store_update"):
+            match_store.add_many(stored)
+        logger.info(f"批量保存比赛记录: 成功 {len(stored)} 条，共 {len(items)} 条")
+
+        return jsonify(
+            {
+                "success": bool(stored),
+                "message": f"成功上传 {len(stored)} 条比赛记录",
+                "success_count": len(stored),
+                "error_count": len(items) - len(stored),
+                "results": results,
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"批量上传比赛记录失败: {str(e)}")
+        return jsonify({"success": False, "message": f"服务器内部错误: {str(e)}"}), 500
+
+
 @app.route("/api/health", methods=["GET"])
 def health_check():
     """
@@ -130,12 +527,49 @@ def health_check():
                 "status": "healthy",
                 "timestamp": datetime.datetime.now().isoformat(),
                 "version": "1.0.0",
+                "team_statistics_cache": team_statistics_cache.stats(),
+                "response_cache": response_cache.stats(),
+                "ingest_queue": ingest_queue.stats(),
             }
         ),
         200,
     )
 
 
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """
+    各接口各阶段耗时的滚动分位数
+
+    默认返回JSON（毫秒）；format=prometheus 或 Accept 优先 text/plain 时
+    返回 Prometheus 文本格式（秒）
+    """
+    output_format = request.args.get("format")
+    if output_format is None:
+        # Prometheus 抓取时的 Accept 带有 version 参数，需要单独列出才能匹配
+        best = request.accept_mimetypes.best_match(
+            ["application/json", PROMETHEUS_CONTENT_TYPE, "text/plain"]
+        )
+        output_format = "json" if best in (None, "application/json") else "prometheus"
+    if output_format == "prometheus":
+        return app.response_class(
+            stage_metrics.to_prometheus(),
+            content_type=f"{PROMETHEUS_CONTENT_TYPE}; charset=utf-8",
+        )
+    if output_format != "json":
+        return (
+            jsonify({"success": False, "message": "format 必须为 json 或 prometheus"}),
+            400,
+        )
+    return jsonify(
+        {
+            "success": True,
+            "window_size": stage_metrics.window_size,
+            "data": stage_metrics.snapshot(),
+        }
+    )
+
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"success": False, "message": "接口不存在"}), 404
@@ -148,19 +582,8 @@ def internal_error(error):
 
 # 新增：获取所有处理过的比赛数据
 def get_all_match_statistics():
-    """获取所有已处理的比赛统计数据"""
-    processed_files = [f for f in os.listdir(PROCESSED_DATA_DIR) if f.endswith(".json")]
-    match_stats = []
-
-    for filename in processed_files:
-        filepath = os.path.join(PROCESSED_DATA_DIR, filename)
-        try:
-            match_stat = MatchStatistics.from_json_file(filepath)
-            match_stats.append(match_stat)
-        except Exception as e:
-            logger.error(f"读取文件 {filename} 时出错: {str(e)}")
-
-    return match_stats
+    """获取所有已处理的比赛统计数据（来自常驻内存的存储）"""
+    return match_store.get_all()
 
 
 # 新增：获取队伍快捷方式配置
@@ -191,6 +614,33 @@ def get_attribute_shortcuts():
         return {}
 
 
+def resolve_attribute_fields(names):
+    """
+    把属性名和属性快捷组名展开为队伍统计字段列表（去重，保持顺序）
+
+    Returns:
+        (字段列表, 无法识别的名称列表)
+    """
+    attribute_names = {field.name for field in fields(TeamStatistics)}
+    shortcuts = None
+    resolved = []
+    unknown = []
+    for name in names:
+        if name in attribute_names:
+            candidates = [name]
+        else:
+            if shortcuts is None:
+                shortcuts = get_attribute_shortcuts()
+            if name not in shortcuts:
+                unknown.append(name)
+                continue
+            candidates = [item for item in shortcuts[name] if item in attribute_names]
+        for candidate in candidates:
+            if candidate != "team_no" and candidate not in resolved:
+                resolved.append(candidate)
+    return resolved, unknown
+
+
 # 新增：保存快捷方式配置
 def save_shortcut(name, shortcut_type, items):
     """保存快捷方式配置"""
@@ -256,6 +706,27 @@ def ranking():
     return render_template("ranking.html")
 
 
+def parse_match_filter():
+    """
+    从查询参数编译过滤条件
+
+    tournament_levels 为比赛等级（可重复）；match_range 为场次范围表达式，
+    如 "1-7,9-11,15"；旧的 match_nos（逐个场次号）仍然支持；window 为正整数时
+    每支队伍只统计最近的 window 场。格式错误时抛出 ValueError
+    """
+    window = request.args.get("window", "").strip() or None
+    if window is not None:
+        if not window.isdecimal():
+            raise ValueError("window 必须为正整数")
+        window = int(window)
+    return compile_filter(
+        request.args.getlist("tournament_levels"),
+        request.args.get("match_range"),
+        request.args.getlist("match_nos"),
+        window,
+    )
+
+
 # 新增：API端点 - 获取队伍统计数据
 @app.route("/api/team-statistics", methods=["GET"])
 def get_team_statistics():
@@ -263,50 +734,183 @@ def get_team_statistics():
     try:
         # 获取查询参数
         teams = request.args.getlist("teams")  # 选择的队伍
-        tournament_levels = request.args.getlist("tournament_levels")  # 选择的比赛等级
-        match_nos = request.args.getlist("match_nos")  # 选择的比赛场次
-
-        # 获取所有比赛数据
-        match_stats = get_all_match_statistics()
-
-        # 过滤比赛数据
-        def filter_matches(match_stat):
-            # 过滤掉不需要的比赛等级
-            if (
-                tournament_levels
-                and match_stat.tournament_level not in tournament_levels
-            ):
-                return True
-            # 过滤掉不需要的比赛场次
-            if match_nos and str(match_stat.match_no) not in match_nos:
-                return True
-            return False
+        # 比赛等级和场次范围编译为过滤条件
+        try:
+            match_filter = parse_match_filter()
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        # 可选：只返回这些属性，可以是属性名或属性快捷组名（可重复传入或用逗号分隔）
+        field_args = [
+            name.strip()
+            for value in request.args.getlist("fields")
+            for name in value.split(",")
+            if name.strip()
+        ]
+        field_names = None
+        if field_args:
+            field_names, unknown = resolve_attribute_fields(field_args)
+            if unknown:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": f"未知的属性或快捷组: {', '.join(unknown)}",
+                        }
+                    ),
+                    400,
+                )
 
-        # 创建队伍统计数据
-        team_statistics = create_team_statistics_from_matches(
-            match_stats, filter_matches
+        # 数据没有变化时直接返回304，不再聚合
+        etag = make_etag(
+            "team-statistics",
+            teams,
+            match_filter.tournament_levels,
+            match_filter.match_ranges,
+            match_filter.window,
+            field_names,
         )
-        # 过滤掉不需要的队伍
-        if teams:
-            # 保持顺序：先构建 team_no->stat 映射，再按 teams 顺序输出
-            team_stat_map = {
-                str(team_stat.team_no): team_stat for team_stat in team_statistics
-            }
-            team_statistics = [
-                team_stat_map[team_no] for team_no in teams if team_no in team_stat_map
-            ]
-        # 转换为字典格式
-        result = []
-        for team_stat in team_statistics:
-            result.append(team_stat.to_dict())
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
+        def build_payload():
+            # 获取队伍统计数据（按过滤条件缓存），指定了属性时只计算所需的统计板块
+            if field_names is None:
+                team_statistics = team_statistics_cache.get(match_filter)
+            else:
+                team_statistics = team_statistics_cache.get_sections(
+                    match_filter, sections_for_fields(field_names)
+                )
+            result = team_statistics_to_dicts(team_statistics, teams, field_names)
+            return {"success": True, "data": result, "total_teams": len(result)}
 
-        return jsonify({"success": True, "data": result, "total_teams": len(result)})
+        # 相同参数和数据集版本的响应直接返回缓存的字节
+        return cached_json_response(etag, build_payload)
 
     except Exception as e:
         logger.error(f"获取队伍统计数据时出错: {str(e)}")
         return jsonify({"success": False, "message": f"服务器错误: {str(e)}"}), 500
 
 
+@stage_metrics.timed("to_dict")
+def team_statistics_to_dicts(team_statistics, teams, field_names):
+    """按 teams 的顺序选出队伍（为空时全部队伍），只转换需要的字段"""
+    # 过滤掉不需要的队伍
+    if teams:
+        # 保持顺序：先构建 team_no->stat 映射，再按 teams 顺序输出
+        team_stat_map = {
+            str(team_stat.team_no): team_stat for team_stat in team_statistics
+        }
+        team_statistics = [
+            team_stat_map[team_no] for team_no in teams if team_no in team_stat_map
+        ]
+    return [team_stat.to_dict(field_names) for team_stat in team_statistics]
+
+
+def parse_batch_filter(item):
+    """
+    编译批量请求中的一个过滤条件
+
+    格式为 {"name": ..., "tournament_levels": [...], "match_range": "1-7,9",
+    "window": N}，除 name 外均可省略。格式错误时抛出 ValueError
+    """
+    if not isinstance(item, dict):
+        raise ValueError("过滤条件必须是对象")
+    name = item.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("过滤条件缺少名称 name")
+    tournament_levels = item.get("tournament_levels") or []
+    if not isinstance(tournament_levels, list):
+        raise ValueError(f"过滤条件 {name} 的 tournament_levels 必须是列表")
+    match_range = item.get("match_range")
+    if match_range is not None and not isinstance(match_range, str):
+        raise ValueError(f"过滤条件 {name} 的 match_range 必须是字符串")
+    window = item.get("window")
+    if window is not None and (isinstance(window, bool) or not isinstance(window, int)):
+        raise ValueError("window 必须为正整数")
+    return name.strip(), compile_filter(tournament_levels, match_range, window=window)
+
+
+# API端点 - 一次获取多个过滤条件下的队伍统计数据
+@app.route("/api/team-statistics/batch", methods=["POST"])
+def get_team_statistics_batch():
+    """
+    一次获取多个命名过滤条件下的队伍统计数据（如资格赛与淘汰赛对比）
+
+    请求体: {"filters": [{"name": ..., ...}], "teams": [...], "fields": [...]}，
+    teams 和 fields 的含义同 /api/team-statistics，对所有过滤条件生效。
+    未缓存的过滤条件共用同一次按队伍分组，按请求顺序返回各过滤条件的结果
+    """
+    try:
+        if not request.is_json:
+            return jsonify({"success": False, "message": "请求必须是JSON格式"}), 400
+
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({"success": False, "message": "请求体必须是JSON对象"}), 400
+        filter_items = data.get("filters")
+        if not isinstance(filter_items, list) or not filter_items:
+            return jsonify({"success": False, "message": "过滤条件列表不能为空"}), 400
+        if len(filter_items) > TEAM_STATISTICS_BATCH_MAX_FILTERS:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": f"过滤条件最多 {TEAM_STATISTICS_BATCH_MAX_FILTERS} 个",
+                    }
+                ),
+                400,
+            )
+
+        named_filters = []
+        try:
+            for item in filter_items:
+                named_filters.append(parse_batch_filter(item))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        names = [name for name, _ in named_filters]
+        if len(set(names)) != len(names):
+            return jsonify({"success": False, "message": "过滤条件名称不能重复"}), 400
+
+        teams = [str(team_no) for team_no in data.get("teams") or []]
+        fields_value = data.get("fields") or []
+        if isinstance(fields_value, str):
+            fields_value = [fields_value]
+        field_args = [
+            name.strip()
+            for value in fields_value
+            for name in str(value).split(",")
+            if name.strip()
+        ]
+        field_names = None
+        if field_args:
+            field_names, unknown = resolve_attribute_fields(field_args)
+            if unknown:
+                return (
+                    jsonify(
+                        {
+                            "success": False,
+                            "message": f"未知的属性或快捷组: {', '.join(unknown)}",
+                        }
+                    ),
+                    400,
+                )
+
+        results = team_statistics_cache.get_many(
+            [match_filter for _, match_filter in named_filters],
+            None if field_names is None else sections_for_fields(field_names),
+        )
+        variants = []
+        for name, match_filter in named_filters:
+            result = team_statistics_to_dicts(results[match_filter], teams, field_names)
+            variants.append({"name": name, "data": result, "total_teams": len(result)})
+        return jsonify({"success": True, "data": variants})
+
+    except Exception as e:
+        logger.error(f"批量获取队伍统计数据时出错: {str(e)}")
+        return jsonify({"success": False, "message": f"服务器错误: {str(e)}"}), 500
+
+
 # 新增：API端点 - 获取队伍快捷方式
 @app.route("/api/team-shortcuts", methods=["GET"])
 def get_team_shortcuts_api():
@@ -452,11 +1056,18 @@ def update_shortcut_api(old_name, shortcut_type):
 def get_all_teams():
     """获取所有可用队伍"""
     try:
-        match_stats = get_all_match_statistics()
-        teams = list(set(match_stat.team_no for match_stat in match_stats))
-        teams.sort()
-
-        return jsonify({"success": True, "data": teams})
+        etag = make_etag("teams")
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
+        def build_payload():
+            match_stats = get_all_match_statistics()
+            teams = list(set(match_stat.team_no for match_stat in match_stats))
+            teams.sort()
+            return {"success": True, "data": teams}
+
+        return cached_json_response(etag, build_payload)
     except Exception as e:
         logger.error(f"获取队伍列表时出错: {str(e)}")
         return jsonify({"success": False, "message": f"服务器错误: {str(e)}"}), 500
@@ -467,11 +1078,20 @@ def get_all_teams():
 def get_tournament_levels():
     """获取所有可用比赛等级"""
     try:
-        match_stats = get_all_match_statistics()
-        levels = list(set(match_stat.tournament_level for match_stat in match_stats))
-        levels.sort()
+        etag = make_etag("tournament-levels")
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
+        def build_payload():
+            match_stats = get_all_match_statistics()
+            levels = list(
+                set(match_stat.tournament_level for match_stat in match_stats)
+            )
+            levels.sort()
+            return {"success": True, "data": levels}
 
-        return jsonify({"success": True, "data": levels})
+        return cached_json_response(etag, build_payload)
     except Exception as e:
         logger.error(f"获取比赛等级列表时出错: {str(e)}")
         return jsonify({"success": False, "message": f"服务器错误: {str(e)}"}), 500
@@ -497,62 +1117,45 @@ def get_rankings():
     try:
         # 获取查询参数
         attributes = request.args.getlist("attributes")  # 排名属性列表
-        tournament_levels = request.args.getlist("tournament_levels")  # 选择的比赛等级
-        match_nos = request.args.getlist("match_nos")  # 选择的比赛场次
-
-        # 获取所有比赛数据
-        match_stats = get_all_match_statistics()
-
-        # 过滤比赛数据
-        def filter_matches(match_stat):
-            if (
-                tournament_levels
-                and match_stat.tournament_level not in tournament_levels
-            ):
-                return True
-            # 过滤掉不需要的比赛场次
-            if match_nos and str(match_stat.match_no) not in match_nos:
-                return True
-            return False
-
-        # 创建队伍统计数据
-        team_statistics = create_team_statistics_from_matches(
-            match_stats, filter_matches
+        try:
+            match_filter = parse_match_filter()
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        limit = request.args.get("limit")  # 可选，只返回前N名
+        if limit is not None:
+            if not limit.isdigit():
+                return (
+                    jsonify({"success": False, "message": "limit 必须为非负整数"}),
+                    400,
+                )
+            limit = int(limit)
+
+        # 数据没有变化时直接返回304，不再聚合
+        etag = make_etag(
+            "rankings",
+            attributes,
+            match_filter.tournament_levels,
+            match_filter.match_ranges,
+            match_filter.window,
+            limit,
         )
+        response = not_modified(etag)
+        if response is not None:
+            return response
+
+        def build_payload():
+            # 排名表按过滤条件和数据集版本缓存（与 /api/team-statistics 共用队伍统计数据）
+            # 只计算所请求属性所在的统计板块
+            rank_table = team_statistics_cache.get_rank_table(match_filter, attributes)
+            # 按排名排好序的各属性列，只取请求的属性（构建列的耗时记在 rankings 阶段）
+            all_ranking_data = {
+                attribute: rank_table.column(attribute, limit)
+                for attribute in attributes
+            }
+            return {"success": True, "data": all_ranking_data, "attributes": attributes}
 
-        # 提取所有请求属性的排名数据
-        all_ranking_data = {}
-
-        for attribute in attributes:
-            ranking_data = []
-            for team_stat in team_statistics:
-                team_dict = team_stat.to_dict()
-                if attribute in team_dict:
-                    attr_data = team_dict[attribute]
-                    if (
-                        isinstance(attr_data, dict)
-                        and "value" in attr_data
-                        and "rank" in attr_data
-                    ):
-                        ranking_data.append(
-                            {
-                                "team_no": team_stat.team_no,
-                                "value": attr_data["value"],
-                                "rank": attr_data["rank"],
-                                "match_no": attr_data.get("match_no"),
-                                "tournament_level": attr_data.get("tournament_level"),
-                            }
-                        )
-
-            # 按排名排序
-            ranking_data.sort(
-                key=lambda x: x["rank"] if x["rank"] > 0 else float("inf")
-            )
-            all_ranking_data[attribute] = ranking_data
-
-        return jsonify(
-            {"success": True, "data": all_ranking_data, "attributes": attributes}
-        )
+        # 相同参数和数据集版本的响应直接返回缓存的字节
+        return cached_json_response(etag, build_payload)
 
     except Exception as e:
         logger.error(f"获取排名数据时出错: {str(e)}")
@@ -671,7 +1274,10 @@ if __name__ == "__main__":
     logger.info("启动FRC Scouting后端服务...")
     logger.info(f"原始数据目录: {RAW_DATA_DIR}")
     logger.info(f"处理后数据目录: {PROCESSED_DATA_DIR}")
-    perform_initial_statistics()
+    # 初始统计和后台任务只在处理请求的进程中执行
+    if is_serving_process(use_reloader=True):
+        perform_initial_statistics()
+        start_background_jobs()
     # 启动Flask应用
     app.run(host="0.0.0.0", port=5000, debug=True)
     # 开放给公网
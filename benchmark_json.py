@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+JSON 序列化性能测试 - 对 processed 目录中的所有文件测量各JSON实现的解析和序列化吞吐量
+
+用法: python benchmark_json.py [--processed-dir 目录] [--repeat 次数]
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from backend.schema import serialization
+from backend.schema.match_statistics_schema import MatchStatistics
+
+DEFAULT_PROCESSED_DIR = os.path.join(current_dir, "match_records", "processed")
+
+
+def best_of(repeat, func):
+    """执行 repeat 次，返回最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="测量JSON解析和序列化吞吐量")
+    parser.add_argument(
+        "--processed-dir",
+        default=DEFAULT_PROCESSED_DIR,
+        help=f"processed目录 (默认: {DEFAULT_PROCESSED_DIR})",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    filenames = sorted(
+        f for f in os.listdir(args.processed_dir) if f.endswith(".json")
+    )
+    if not filenames:
+        print(f"❌ 目录中没有JSON文件: {args.processed_dir}")
+        sys.exit(1)
+
+    # 先把文件内容读入内存，只测量解析和序列化本身
+    contents = []
+    for filename in filenames:
+        with open(os.path.join(args.processed_dir, filename), "rb") as f:
+            contents.append(f.read())
+    total_mb = sum(len(content) for content in contents) / 1024 / 1024
+    objects = [serialization.loads(content, backend="json") for content in contents]
+
+    print(f"目录: {args.processed_dir}")
+    print(f"文件数: {len(contents)}，总大小: {total_mb:.2f} MB")
+    print(f"当前使用的实现: {serialization.BACKEND}")
+    print("=" * 72)
+    print(
+        f"{'实现':<8}{'解析 文件/秒':>14}{'解析 MB/秒':>12}"
+        f"{'序列化 文件/秒':>16}{'缩进序列化 文件/秒':>20}"
+    )
+
+    for backend in serialization.available_backends():
+        parse_time = best_of(
+            args.repeat,
+            lambda: [serialization.loads(c, backend=backend) for c in contents],
+        )
+        dump_time = best_of(
+            args.repeat,
+            lambda: [serialization.dumps_bytes(o, backend=backend) for o in objects],
+        )
+        indent_time = best_of(
+            args.repeat,
+            lambda: [
+                serialization.dumps_bytes(o, indent=True, backend=backend)
+                for o in objects
+            ],
+        )
+        print(
+            f"{backend:<8}{len(contents) / parse_time:>14.0f}"
+            f"{total_mb / parse_time:>12.1f}{len(contents) / dump_time:>16.0f}"
+            f"{len(contents) / indent_time:>20.0f}"
+        )
+
+    # 包括构建 MatchStatistics 在内的完整加载
+    load_time = best_of(
+        args.repeat,
+        lambda: [
+            MatchStatistics.from_file_data(serialization.loads(c), filename)
+            for c, filename in zip(contents, filenames)
+        ],
+    )
+    print("=" * 72)
+    print(
+        f"解析并构建 MatchStatistics（{serialization.BACKEND}）: "
+        f"{len(contents) / load_time:.0f} 文件/秒"
+    )
+
+
+if __name__ == "__main__":
+    main()
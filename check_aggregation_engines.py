@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+"""
+聚合实现一致性检查 - 在生成的比赛数据上分别用逐场实现、NumPy向量化实现和
+部分聚合实现计算队伍统计数据，逐个字段比较结果
+
+三种实现各自维护每一项统计的计算方式，修改其中一种时需要运行本检查。
+浮点数总和的累加顺序不同，只要求在 --rel-tol 之内相等；其余字段（包括
+int/float 类型）必须完全相同。有差异时退出码为 1。
+
+用法: python check_aggregation_engines.py [--matches 场数] [--teams 队伍数] [--seed 种子]
+"""
+
+import sys
+import os
+import math
+import random
+import argparse
+import tempfile
+from array import array
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from backend.schema.match_statistics_schema import MatchStatistics
+from backend.service.aggregate_team_statistics import (
+    create_team_statistics_from_matches,
+    create_team_statistics_from_partials,
+)
+from backend.service.match_filter import compile_filter
+from backend.service.match_store import MatchStore
+from backend.service.partial_aggregation import PartialAggregateIndex
+from backend.service.vectorized_aggregation import HAS_NUMPY
+
+TOURNAMENT_LEVELS = ["Practice", "Qualification", "Playoff"]
+CLIMB_STATUSES = ["success", "failure", "hit_chain", "park", "touch_chain", ""]
+ALGAE_MASKS = [
+    "auto_mask",
+    "place_net_mask",
+    "shoot_net_mask",
+    "processor_mask",
+    "last_sec_processor_mask",
+    "tactical_mask",
+    "success_mask",
+    "defended_mask",
+]
+CORAL_INTAKE_COUNTS = ["teleop_ground_cnt", "teleop_load_station_cnt"]
+ALGAE_INTAKE_COUNTS = [
+    "auto_reef_cnt",
+    "auto_scrape_cnt",
+    "teleop_scrape_cnt",
+    "teleop_reef_cnt",
+    "teleop_ground_front_cnt",
+    "teleop_ground_middle_cnt",
+    "teleop_ground_back_cnt",
+]
+
+
+def random_mask(rnd, count, probability):
+    """count 个周期中每个以 probability 的概率置位"""
+    return sum(1 << i for i in range(count) if rnd.random() < probability)
+
+
+def random_cycle_times(rnd, count, upper):
+    """周期时间，混入重复值以覆盖中位数和最值的并列情况"""
+    return array(
+        "d", [rnd.choice([1.5, 2.0, 2.5, rnd.random() * upper]) for _ in range(count)]
+    )
+
+
+def generate_match(rnd, team_no, match_no, tournament_level, timestamp):
+    """生成一场随机的比赛统计数据"""
+    match_stat = MatchStatistics(
+        team_no=team_no, match_no=match_no, tournament_level=tournament_level
+    )
+    match_stat.timestamp = timestamp
+    match_stat.leave = rnd.random() < 0.5
+
+    # 珊瑚：每个周期属于一个得分位置，自动阶段为开头的若干个周期
+    coral = match_stat.score_coral
+    coral_count = rnd.randint(0, 20)
+    coral.cycle_times = random_cycle_times(rnd, coral_count, 20)
+    positions = [rnd.randrange(5) for _ in range(coral_count)]
+    masks = ["l1_mask", "l2_mask", "l3_mask", "l4_mask", "stack_l1_mask"]
+    for position, name in enumerate(masks):
+        setattr(
+            coral,
+            name,
+            sum(1 << i for i in range(coral_count) if positions[i] == position),
+        )
+    coral.auto_mask = (1 << rnd.randint(0, min(3, coral_count))) - 1
+    coral.successful_mask = random_mask(rnd, coral_count, 0.7)
+    coral.defended_mask = random_mask(rnd, coral_count, 0.3)
+
+    algae = match_stat.score_algae
+    algae_count = rnd.randint(0, 12)
+    algae.cycle_times = random_cycle_times(rnd, algae_count, 10)
+    for name in ALGAE_MASKS:
+        setattr(algae, name, random_mask(rnd, algae_count, 0.3))
+
+    for name in CORAL_INTAKE_COUNTS:
+        setattr(match_stat.intake_coral, name, rnd.randint(0, 3))
+    for name in ALGAE_INTAKE_COUNTS:
+        setattr(match_stat.intake_algae, name, rnd.randint(0, 3))
+
+    match_stat.defense.cycle_times = random_cycle_times(rnd, rnd.randint(0, 3), 5)
+    match_stat.give_up.cycle_times = random_cycle_times(rnd, rnd.randint(0, 2), 5)
+    match_stat.climb_up.status = rnd.choice(CLIMB_STATUSES)
+    match_stat.climb_up.time = rnd.choice([rnd.randint(0, 150000), 130000.0])
+    match_stat.climb_up.duration = rnd.choice([0, 0.0, 5, rnd.random() * 10])
+    return match_stat
+
+
+def generate_matches(match_count, team_count, seed):
+    """生成 (文件名, 比赛统计数据) 列表，文件名与 processed 目录中的格式相同"""
+    rnd = random.Random(seed)
+    items = []
+    for i in range(match_count):
+        team_no = rnd.randint(1, team_count)
+        match_no = rnd.randint(1, 80)
+        tournament_level = rnd.choice(TOURNAMENT_LEVELS)
+        timestamp = 1752000000000 + i
+        filename = (
+            f"match_record_CHECK_{match_no}_{tournament_level}_"
+            f"{team_no}_{timestamp}.json"
+        )
+        items.append(
+            (
+                filename,
+                generate_match(rnd, team_no, match_no, tournament_level, timestamp),
+            )
+        )
+    return items
+
+
+def compare_values(expected, actual, path, rel_tol, differences):
+    """逐个字段比较，把不一致的字段路径追加到 differences"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in expected.keys() | actual.keys():
+            if key not in expected or key not in actual:
+                differences.append(f"{path}.{key}: 字段缺失")
+            else:
+                compare_values(
+                    expected[key], actual[key], f"{path}.{key}", rel_tol, differences
+                )
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            differences.append(f"{path}: 长度 {len(expected)} != {len(actual)}")
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            compare_values(a, b, f"{path}[{i}]", rel_tol, differences)
+    elif type(expected) is not type(actual):
+        differences.append(f"{path}: 类型 {expected!r} != {actual!r}")
+    elif isinstance(expected, float):
+        if not math.isclose(expected, actual, rel_tol=rel_tol):
+            differences.append(f"{path}: {expected!r} != {actual!r}")
+    elif expected != actual:
+        differences.append(f"{path}: {expected!r} != {actual!r}")
+
+
+def compare_results(expected, actual, rel_tol):
+    """比较两种实现得到的队伍统计数据列表（包括队伍顺序）"""
+    differences = []
+    compare_values(
+        [team_stat.to_dict() for team_stat in expected],
+        [team_stat.to_dict() for team_stat in actual],
+        "teams",
+        rel_tol,
+        differences,
+    )
+    return differences
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="比较三种队伍统计聚合实现的结果")
+    parser.add_argument("--matches", type=int, default=3000, help="生成的比赛场数")
+    parser.add_argument("--teams", type=int, default=60, help="队伍数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    parser.add_argument(
+        "--rel-tol", type=float, default=1e-12, help="浮点数字段的相对误差上限"
+    )
+    args = parser.parse_args()
+
+    filters = [
+        compile_filter(),
+        compile_filter(["Qualification"]),
+        compile_filter(["Qualification", "Playoff"]),
+        compile_filter([], "1-7,9-11,15"),
+        compile_filter(["Playoff"], "3-40"),
+        compile_filter([], None, [], 5),
+        compile_filter(["Qualification"], "10-60", [], 3),
+    ]
+
+    engines = ["逐场", "部分聚合"]
+    if HAS_NUMPY:
+        engines.insert(1, "向量化")
+    else:
+        print("⚠️ 未安装NumPy，跳过向量化实现")
+
+    failed = 0
+    with tempfile.TemporaryDirectory() as processed_dir:
+        store = MatchStore(processed_dir)
+        store.add_many(generate_matches(args.matches, args.teams, args.seed))
+        partials = PartialAggregateIndex(store)
+
+        print(f"比赛数: {args.matches}，队伍数: {args.teams}，随机种子: {args.seed}")
+        print(f"实现: {', '.join(engines)}")
+        print("=" * 72)
+        for match_filter in filters:
+            matches = store.query(match_filter)
+            results = {
+                "逐场": create_team_statistics_from_matches(matches),
+                "部分聚合": create_team_statistics_from_partials(
+                    partials.team_partials(match_filter)
+                ),
+            }
+            if HAS_NUMPY:
+                results["向量化"] = create_team_statistics_from_matches(
+                    matches, vectorized=True
+                )
+
+            differences = []
+            for engine in engines[1:]:
+                differences += [
+                    f"{engine}: {difference}"
+                    for difference in compare_results(
+                        results["逐场"], results[engine], args.rel_tol
+                    )
+                ]
+            status = "✅" if not differences else "❌"
+            print(
+                f"{status} 等级={list(match_filter.tournament_levels)} "
+                f"场次={list(match_filter.match_ranges)} "
+                f"window={match_filter.window}: "
+                f"{len(matches)} 场，{len(results['逐场'])} 支队伍"
+            )
+            for difference in differences[:20]:
+                print(f"    {difference}")
+            if len(differences) > 20:
+                print(f"    ……共 {len(differences)} 处不一致")
+            failed += bool(differences)
+
+    print("=" * 72)
+    if failed:
+        print(f"❌ {failed} 个过滤条件下结果不一致")
+        sys.exit(1)
+    print("✅ 三种实现结果一致")
+
+
+if __name__ == "__main__":
+    main()
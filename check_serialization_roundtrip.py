@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+序列化往返检查 - 用每个已安装的JSON实现写入再读回比赛统计数据，
+确认超过64位的位掩码（65个以上cycle）仍以整数无损恢复
+
+修改 schema/serialization.py 或位掩码字段时需要运行本检查。有差异时退出码为 1。
+
+用法: python check_serialization_roundtrip.py [--cycles cycle数]
+"""
+
+import sys
+import os
+import argparse
+from array import array
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from backend.schema import serialization
+from backend.schema.match_statistics_schema import (
+    MatchStatistics,
+    iter_mask,
+    mask_from_indices,
+    popcount,
+)
+
+FILENAME = "Qualification_12_6907_20250301_1740800000.json"
+
+
+def generate_match(cycles):
+    """生成一场 cycles 个得分cycle、位掩码跨越64位的比赛"""
+    match_stat = MatchStatistics(tournament_level="Qualification", match_no=12)
+    match_stat.team_no = 6907
+    score_coral = match_stat.score_coral
+    score_coral.cycle_times = array("d", (float(i % 7 + 3) for i in range(cycles)))
+    score_coral.faces = [i % 6 for i in range(cycles)]
+    score_coral.l4_mask = mask_from_indices(range(0, cycles, 2))
+    score_coral.l1_mask = mask_from_indices(range(1, cycles, 2))
+    score_coral.auto_mask = mask_from_indices(range(cycles - 3, cycles))
+    match_stat.score_algae.cycle_times = array("d", [4.0] * cycles)
+    match_stat.score_algae.place_net_mask = (1 << cycles) - 1
+    return match_stat
+
+
+def check_backend(backend, expected):
+    """用指定实现往返一次，返回差异描述列表"""
+    differences = []
+    data = serialization.loads(
+        serialization.dumps(expected.to_dict(), backend=backend), backend=backend
+    )
+    try:
+        actual = MatchStatistics.from_file_data(data, FILENAME)
+    except Exception as e:
+        return [f"恢复失败: {str(e)}"]
+
+    for section in ("score_coral", "score_algae"):
+        expected_section = getattr(expected, section)
+        actual_section = getattr(actual, section)
+        for name in expected_section.__dataclass_fields__:
+            if not name.endswith("_mask"):
+                continue
+            mask = getattr(actual_section, name)
+            if type(mask) is not int:
+                differences.append(f"{section}.{name}: 类型 {type(mask).__name__}")
+            elif mask != getattr(expected_section, name):
+                differences.append(f"{section}.{name}: 数值不一致")
+            else:
+                # 集合运算在恢复后的掩码上仍然可用
+                popcount(mask)
+                list(iter_mask(mask))
+    return differences
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="检查超过64位的位掩码能否无损往返")
+    parser.add_argument("--cycles", type=int, default=70, help="每场的cycle数")
+    args = parser.parse_args()
+
+    expected = generate_match(args.cycles)
+    failed = 0
+    print(f"cycle数: {args.cycles}")
+    print("=" * 72)
+    for backend in serialization.available_backends():
+        differences = check_backend(backend, expected)
+        if differences:
+            failed += 1
+            print(f"❌ {backend}")
+            for difference in differences:
+                print(f"    {difference}")
+        else:
+            print(f"✅ {backend}")
+
+    print("=" * 72)
+    if failed:
+        print(f"❌ {failed} 个JSON实现往返后数据不一致")
+        sys.exit(1)
+    print("✅ 所有JSON实现往返一致")
+
+
+if __name__ == "__main__":
+    main()
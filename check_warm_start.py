@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+热启动快照检查 - 保存快照后在原文件名下改写 processed 文件，模拟重启，
+确认受影响的队伍在恢复后被重新计算，结果与不使用快照时完全相同
+
+分别使用 utils.py 中的两种存储配置（压缩快照 / SQLite）检查，二者都要能在重启时
+发现被改写的文件
+
+修改 service/warm_start.py 或 MatchStore.catalog 时需要运行本检查。有差异时退出码为 1。
+
+用法: python check_warm_start.py [--matches 场数] [--teams 队伍数] [--seed 种子]
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from backend.check_aggregation_engines import compare_results, generate_matches
+from backend.schema.match_statistics_schema import MatchStatistics
+from backend.service.match_filter import NO_FILTER
+from backend.service.match_store import MatchStore
+from backend.service.processed_snapshot import ProcessedSnapshot
+from backend.service.sqlite_store import SQLiteMatchIndex
+from backend.service.statistics_cache import TeamStatisticsCache
+from backend.service.warm_start import TeamStatisticsWarmStart
+
+
+def rewrite_score(match_stat):
+    """同一文件重新分析后多出一个L4得分cycle"""
+    coral = match_stat.score_coral
+    coral.l4_mask |= 1 << len(coral.cycle_times)
+    coral.successful_mask |= 1 << len(coral.cycle_times)
+    coral.cycle_times.append(2.0)
+
+
+def rewrite_team(match_stat):
+    """手动修正了文件中的队伍号"""
+    match_stat.team_no += 1
+
+
+SCENARIOS = [
+    ("改写得分数据", rewrite_score),
+    ("修正队伍号", rewrite_team),
+]
+
+
+def snapshot_store(tmp_dir, processed_dir):
+    """默认（file）存储后端：processed 目录 + 压缩快照"""
+    return MatchStore(
+        processed_dir,
+        snapshot=ProcessedSnapshot(
+            os.path.join(tmp_dir, "processed_snapshot.json"),
+            os.path.join(tmp_dir, "processed_snapshot.log"),
+        ),
+    )
+
+
+def sqlite_store(tmp_dir, processed_dir):
+    """sqlite 存储后端"""
+    return MatchStore(
+        processed_dir,
+        index=SQLiteMatchIndex(os.path.join(tmp_dir, "match_statistics.db")),
+    )
+
+
+STORES = [
+    ("压缩快照", snapshot_store),
+    ("SQLite", sqlite_store),
+]
+
+
+def restart(make_store, tmp_dir, processed_dir, warm_start_path):
+    """模拟一次重启：重新加载数据并从快照恢复，等待后台刷新完成"""
+    store = make_store(tmp_dir, processed_dir)
+    store.load()
+    cache = TeamStatisticsCache(store)
+    TeamStatisticsWarmStart(warm_start_path, store, cache).restore()
+    for thread in threading.enumerate():
+        if thread.name == "warm-start-refresh":
+            thread.join()
+    return store, cache
+
+
+def close(store):
+    if store.index is not None:
+        store.index.close()
+
+
+def check_scenario(make_store, matches, rewrite):
+    """在一次 保存快照 -> 改写文件 -> 重启 的流程后比较结果，返回差异列表"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        processed_dir = os.path.join(tmp_dir, "processed")
+        warm_start_path = os.path.join(tmp_dir, "team_statistics_warm_start.json")
+        for filename, match_stat in matches:
+            match_stat.save_to_json_file(os.path.join(processed_dir, filename))
+
+        store, cache = restart(make_store, tmp_dir, processed_dir, warm_start_path)
+        cache.get(NO_FILTER)
+        saved = TeamStatisticsWarmStart(warm_start_path, store, cache).save()
+        close(store)
+        if not saved:
+            return ["热启动快照没有写入"]
+
+        # 在原文件名下改写其中一个文件
+        filename = matches[0][0]
+        filepath = os.path.join(processed_dir, filename)
+        match_stat = MatchStatistics.from_json_file(filepath)
+        rewrite(match_stat)
+        match_stat.save_to_json_file(filepath)
+
+        store, cache = restart(make_store, tmp_dir, processed_dir, warm_start_path)
+        differences = []
+        if store.get(filename) != match_stat:
+            differences.append(f"{filename}: 存储中仍是改写前的数据")
+        # 不使用任何快照，直接读取 processed 目录重新计算
+        fresh_store = MatchStore(processed_dir)
+        expected = TeamStatisticsCache(fresh_store).get(NO_FILTER)
+        differences.extend(compare_results(expected, cache.get(NO_FILTER), 0.0))
+        close(store)
+        return differences
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="检查热启动快照能否发现被改写的文件")
+    parser.add_argument("--matches", type=int, default=200, help="生成的比赛场数")
+    parser.add_argument("--teams", type=int, default=12, help="队伍数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    print(f"比赛数: {args.matches}，队伍数: {args.teams}，随机种子: {args.seed}")
+    print("=" * 72)
+    failed = 0
+    for store_name, make_store in STORES:
+        for name, rewrite in SCENARIOS:
+            matches = generate_matches(args.matches, args.teams, args.seed)
+            differences = check_scenario(make_store, matches, rewrite)
+            if differences:
+                failed += 1
+                print(f"❌ {store_name} / {name}: {len(differences)} 处差异")
+                for difference in differences[:10]:
+                    print(f"    {difference}")
+            else:
+                print(f"✅ {store_name} / {name}")
+
+    print("=" * 72)
+    if failed:
+        print(f"❌ {failed} 种改写后热启动恢复的结果与重新计算不一致")
+        sys.exit(1)
+    print("✅ 所有改写后热启动恢复的结果与重新计算一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+一次性迁移脚本 - 将 match_records/processed 目录中的JSON文件导入SQLite存储后端
+
+导入后设置环境变量 SCOUTING_STORAGE_BACKEND=sqlite 启动服务即可使用SQLite后端
+"""
+
+import sys
+import os
+import argparse
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from backend.service.sqlite_store import SQLiteMatchIndex
+from backend.utils import PROCESSED_DATA_DIR, RAW_DATA_DIR, SQLITE_DB_PATH
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="将processed目录中的比赛统计数据导入SQLite数据库"
+    )
+    parser.add_argument(
+        "--db", default=SQLITE_DB_PATH, help=f"数据库文件路径 (默认: {SQLITE_DB_PATH})"
+    )
+    parser.add_argument(
+        "--processed-dir",
+        default=PROCESSED_DATA_DIR,
+        help=f"processed目录 (默认: {PROCESSED_DATA_DIR})",
+    )
+    parser.add_argument(
+        "--keep-existing",
+        action="store_true",
+        help="保留数据库中已有的记录（默认先清空再导入）",
+    )
+    args = parser.parse_args()
+
+    raw_files = {f for f in os.listdir(RAW_DATA_DIR) if f.endswith(".json")}
+    processed_files = {
+        f for f in os.listdir(args.processed_dir) if f.endswith(".json")
+    }
+    unprocessed = raw_files - processed_files
+    if unprocessed:
+        print(
+            f"⚠️  有 {len(unprocessed)} 个原始文件尚未处理，"
+            "请先启动一次服务完成初始统计后再迁移"
+        )
+
+    index = SQLiteMatchIndex(args.db)
+    count = index.import_processed_dir(
+        args.processed_dir, replace=not args.keep_existing
+    )
+    total = index.count()
+    index.close()
+
+    print(f"✅ 已导入 {count} 条记录，数据库共 {total} 条: {args.db}")
+
+
+if __name__ == "__main__":
+    main()
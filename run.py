@@ -12,7 +12,13 @@ project_root = os.path.dirname(current_dir)
 sys.path.insert(0, project_root)
 
 # 现在导入并运行应用
-from backend.app import app, logger, perform_initial_statistics
+from backend.app import (
+    app,
+    logger,
+    is_serving_process,
+    perform_initial_statistics,
+    start_background_jobs,
+)
 
 if __name__ == "__main__":
     logger.info("启动FRC Scouting数据显示网站...")
@@ -22,8 +28,10 @@ if __name__ == "__main__":
     logger.info(f"- 后端目录: {current_dir}")
     logger.info("=" * 50)
 
-    # 执行初始统计
-    perform_initial_statistics()
+    # 执行初始统计（自动重载器的父进程不处理请求，跳过）
+    if is_serving_process(use_reloader=True):
+        perform_initial_statistics()
+        start_background_jobs()
 
     logger.info("=" * 50)
     logger.info("访问地址:")
@@ -3,17 +3,82 @@ FRC Scouting 周期统计数据结构定义
 定义了 calculate_cycle_statistics 函数的标准返回值格式
 """
 
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, FrozenSet
 from dataclasses import dataclass, asdict, field
-import json
+from array import array
 import os
+import sys
+from backend.schema import serialization
 
+# Python 3.10+ 的数据类使用 __slots__，去掉每个实例的 __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-# why use Set?
-# because we need the set operation | & - +
 
+def _cycle_times() -> "array[float]":
+    """cycle时间以紧凑的 double 数组保存"""
+    return array("d")
 
-@dataclass
+
+def _dict_factory(items) -> Dict[str, Any]:
+    """asdict 使用的字典工厂，把 array 转换为 list 以便序列化"""
+    return {k: v.tolist() if isinstance(v, array) else v for k, v in items}
+
+
+def _intern(value):
+    """驻留比赛等级、赛事代码等大量重复的字符串"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# 各类下标集合以整数位掩码保存：第 i 位为1表示第 i 个cycle属于该集合。
+# 集合运算对应位运算（并 |，交 &，差 & ~），计数用 popcount。
+
+
+# 位掩码中1的个数，即集合大小（Python 3.10 以下没有 int.bit_count）
+popcount = getattr(int, "bit_count", None) or (lambda mask: bin(mask).count("1"))
+
+
+def iter_mask(mask: int):
+    """按升序遍历位掩码中为1的下标"""
+    index = 0
+    while mask:
+        if mask & 1:
+            yield index
+        mask >>= 1
+        index += 1
+
+
+def mask_from_indices(indices) -> int:
+    """由下标集合构造位掩码"""
+    mask = 0
+    for index in indices:
+        mask |= 1 << index
+    return mask
+
+
+def _index_view(mask_name: str) -> property:
+    """位掩码的下标集合视图，兼容原先以 Set[int] 访问的调用方"""
+
+    def getter(self) -> FrozenSet[int]:
+        return frozenset(iter_mask(getattr(self, mask_name)))
+
+    def setter(self, indices) -> None:
+        setattr(self, mask_name, mask_from_indices(indices))
+
+    return property(getter, setter)
+
+
+def _restore_mask(data: Dict[str, Any], name: str) -> int:
+    """读取位掩码字段，兼容旧文件中以下标列表保存的 {name}_index"""
+    mask = data.get(f"{name}_mask")
+    if mask is not None:
+        if type(mask) is not int:
+            # 浮点数等已经丢失了精度，不能再当作位掩码使用
+            raise ValueError(f"{name}_mask 不是整数: {mask!r}")
+        return mask
+    return mask_from_indices(data.get(f"{name}_index", []))
+
+
+@dataclass(**_SLOTS)
 class MatchStatistics:
     """完整比赛的周期统计数据"""
 
@@ -42,64 +107,56 @@ class MatchStatistics:
     climb_up: "ClimbUpStatistics" = field(default_factory=lambda: ClimbUpStatistics())
     leave: bool = False
 
+    def __post_init__(self):
+        self.tournament_level = _intern(self.tournament_level)
+        self.event_code = _intern(self.event_code)
+
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式，处理Set类型的序列化"""
-        result = asdict(self)
-
-        # 递归处理所有Set类型，转换为list
-        def convert_sets_to_lists(obj):
-            if isinstance(obj, dict):
-                return {k: convert_sets_to_lists(v) for k, v in obj.items()}
-            elif isinstance(obj, set):
-                return list(obj)
-            elif isinstance(obj, list):
-                return [convert_sets_to_lists(item) for item in obj]
-            else:
-                return obj
-
-        return convert_sets_to_lists(result)
-
-    def to_json(self) -> str:
+        """转换为字典格式（位掩码以整数保存，cycle时间转换为列表）"""
+        return asdict(self, dict_factory=_dict_factory)
+
+    def to_json(self, indent: bool = False) -> str:
         """转换为JSON字符串"""
-        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+        return serialization.dumps(self.to_dict(), indent=indent)
 
     def save_to_json_file(self, filepath: str) -> None:
         """保存到JSON文件"""
         # 确保目录存在
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(self.to_json())
+        serialization.dump_file(filepath, self.to_dict())
 
     @classmethod
     def from_json_file(cls, filepath: str) -> "MatchStatistics":
         """从JSON文件恢复数据"""
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = serialization.load_file(filepath)
+        return cls.from_file_data(data, os.path.basename(filepath))
+
+    @classmethod
+    def from_file_data(cls, data: Dict[str, Any], filename: str) -> "MatchStatistics":
+        """从已解析的文件内容恢复数据，时间戳和文件名取自文件名"""
         match_statistics = cls._from_dict(data)
-        match_statistics.timestamp = (
-            os.path.splitext(os.path.basename(filepath))[0]
-        ).split("_")[-1]
-        match_statistics.file_name = os.path.basename(filepath)
+        match_statistics.timestamp = (os.path.splitext(filename)[0]).split("_")[-1]
+        match_statistics.file_name = filename
         return match_statistics
 
     @classmethod
     def _from_dict(cls, data: Dict[str, Any]) -> "MatchStatistics":
-        """从字典恢复数据，处理Set类型的反序列化"""
+        """从字典恢复数据，位掩码字段兼容旧文件的下标列表格式"""
 
         # 处理 ScoreCoralStatistics
         score_coral_data = data.get("score_coral", {})
         score_coral = ScoreCoralStatistics(
-            cycle_times=score_coral_data.get("cycle_times", []),
+            cycle_times=array("d", score_coral_data.get("cycle_times", [])),
             faces=score_coral_data.get("faces", []),
-            auto_index=set(score_coral_data.get("auto_index", [])),
-            stack_l1_index=set(score_coral_data.get("stack_l1_index", [])),
-            l1_index=set(score_coral_data.get("l1_index", [])),
-            l2_index=set(score_coral_data.get("l2_index", [])),
-            l3_index=set(score_coral_data.get("l3_index", [])),
-            l4_index=set(score_coral_data.get("l4_index", [])),
-            successful_index=set(score_coral_data.get("successful_index", [])),
-            defended_index=set(score_coral_data.get("defended_index", [])),
+            auto_mask=_restore_mask(score_coral_data, "auto"),
+            stack_l1_mask=_restore_mask(score_coral_data, "stack_l1"),
+            l1_mask=_restore_mask(score_coral_data, "l1"),
+            l2_mask=_restore_mask(score_coral_data, "l2"),
+            l3_mask=_restore_mask(score_coral_data, "l3"),
+            l4_mask=_restore_mask(score_coral_data, "l4"),
+            successful_mask=_restore_mask(score_coral_data, "successful"),
+            defended_mask=_restore_mask(score_coral_data, "defended"),
         )
 
         # 处理 IntakeCoralStatistics
@@ -116,17 +173,17 @@ class MatchStatistics:
         # 处理 ScoreAlgaeStatistics
         score_algae_data = data.get("score_algae", {})
         score_algae = ScoreAlgaeStatistics(
-            cycle_times=score_algae_data.get("cycle_times", []),
-            auto_index=set(score_algae_data.get("auto_index", [])),
-            place_net_index=set(score_algae_data.get("place_net_index", [])),
-            shoot_net_index=set(score_algae_data.get("shoot_net_index", [])),
-            processor_index=set(score_algae_data.get("processor_index", [])),
-            last_sec_processor_index=set(
-                score_algae_data.get("last_sec_processor_index", [])
+            cycle_times=array("d", score_algae_data.get("cycle_times", [])),
+            auto_mask=_restore_mask(score_algae_data, "auto"),
+            place_net_mask=_restore_mask(score_algae_data, "place_net"),
+            shoot_net_mask=_restore_mask(score_algae_data, "shoot_net"),
+            processor_mask=_restore_mask(score_algae_data, "processor"),
+            last_sec_processor_mask=_restore_mask(
+                score_algae_data, "last_sec_processor"
             ),
-            tactical_index=set(score_algae_data.get("tactical_index", [])),
-            success_index=set(score_algae_data.get("success_index", [])),
-            defended_index=set(score_algae_data.get("defended_index", [])),
+            tactical_mask=_restore_mask(score_algae_data, "tactical"),
+            success_mask=_restore_mask(score_algae_data, "success"),
+            defended_mask=_restore_mask(score_algae_data, "defended"),
         )
 
         # 处理 IntakeAlgaeStatistics
@@ -148,7 +205,9 @@ class MatchStatistics:
 
         # 处理 DefenseStatistics
         defense_data = data.get("defense", {})
-        defense = DefenseStatistics(cycle_times=defense_data.get("cycle_times", []))
+        defense = DefenseStatistics(
+            cycle_times=array("d", defense_data.get("cycle_times", []))
+        )
 
         # 处理 FoulStatistics
         foul_data = data.get("foul", {})
@@ -156,7 +215,9 @@ class MatchStatistics:
 
         # 处理 GiveUpStatistics
         give_up_data = data.get("give_up", {})
-        give_up = GiveUpStatistics(cycle_times=give_up_data.get("cycle_times", []))
+        give_up = GiveUpStatistics(
+            cycle_times=array("d", give_up_data.get("cycle_times", []))
+        )
 
         # 处理 ClimbUpStatistics
         climb_up_data = data.get("climb_up", {})
@@ -213,18 +274,28 @@ class MatchStatistics:
         return {task: time / 135.0 for task, time in times.items()}
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ScoreCoralStatistics:
-    cycle_times: List[float] = field(default_factory=list)
+    cycle_times: "array[float]" = field(default_factory=_cycle_times)
     faces: List[int] = field(default_factory=list)
-    auto_index: Set[int] = field(default_factory=set)
-    stack_l1_index: Set[int] = field(default_factory=set)
-    l1_index: Set[int] = field(default_factory=set)
-    l2_index: Set[int] = field(default_factory=set)
-    l3_index: Set[int] = field(default_factory=set)
-    l4_index: Set[int] = field(default_factory=set)
-    successful_index: Set[int] = field(default_factory=set)
-    defended_index: Set[int] = field(default_factory=set)
+    auto_mask: int = 0
+    stack_l1_mask: int = 0
+    l1_mask: int = 0
+    l2_mask: int = 0
+    l3_mask: int = 0
+    l4_mask: int = 0
+    successful_mask: int = 0
+    defended_mask: int = 0
+
+    # 兼容视图：以下标集合的形式访问位掩码
+    auto_index = _index_view("auto_mask")
+    stack_l1_index = _index_view("stack_l1_mask")
+    l1_index = _index_view("l1_mask")
+    l2_index = _index_view("l2_mask")
+    l3_index = _index_view("l3_mask")
+    l4_index = _index_view("l4_mask")
+    successful_index = _index_view("successful_mask")
+    defended_index = _index_view("defended_mask")
 
     def get_avg_cycle_time(self) -> float:
         return (
@@ -232,11 +303,11 @@ class ScoreCoralStatistics:
         )
 
     def get_avg_successful_undefended_cycle_time(self) -> float:
-        successful_undefended_index = (
-            self.successful_index - self.defended_index
-        ) - self.auto_index
+        successful_undefended_mask = (
+            self.successful_mask & ~self.defended_mask & ~self.auto_mask
+        )
         successful_undefended_cycle_time = [
-            self.cycle_times[index] for index in successful_undefended_index
+            self.cycle_times[index] for index in iter_mask(successful_undefended_mask)
         ]
         return (
             sum(successful_undefended_cycle_time)
@@ -247,12 +318,14 @@ class ScoreCoralStatistics:
 
     def get_teleop_total_time(self) -> float:
         """获取手动阶段总时间"""
-        teleop_index = set(range(len(self.cycle_times))) - self.auto_index
-        teleop_cycle_times = [self.cycle_times[index] for index in teleop_index]
+        teleop_mask = ((1 << len(self.cycle_times)) - 1) & ~self.auto_mask
+        teleop_cycle_times = [
+            self.cycle_times[index] for index in iter_mask(teleop_mask)
+        ]
         return sum(teleop_cycle_times)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class IntakeCoralStatistics:
     auto_load_station_cnt: int = 0
     auto_ground_cnt: int = 0
@@ -262,17 +335,27 @@ class IntakeCoralStatistics:
     teleop_fixed_cnt: int = 0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ScoreAlgaeStatistics:
-    cycle_times: List[float] = field(default_factory=list)
-    auto_index: Set[int] = field(default_factory=set)
-    place_net_index: Set[int] = field(default_factory=set)
-    shoot_net_index: Set[int] = field(default_factory=set)
-    processor_index: Set[int] = field(default_factory=set)
-    last_sec_processor_index: Set[int] = field(default_factory=set)
-    tactical_index: Set[int] = field(default_factory=set)
-    success_index: Set[int] = field(default_factory=set)
-    defended_index: Set[int] = field(default_factory=set)
+    cycle_times: "array[float]" = field(default_factory=_cycle_times)
+    auto_mask: int = 0
+    place_net_mask: int = 0
+    shoot_net_mask: int = 0
+    processor_mask: int = 0
+    last_sec_processor_mask: int = 0
+    tactical_mask: int = 0
+    success_mask: int = 0
+    defended_mask: int = 0
+
+    # 兼容视图：以下标集合的形式访问位掩码
+    auto_index = _index_view("auto_mask")
+    place_net_index = _index_view("place_net_mask")
+    shoot_net_index = _index_view("shoot_net_mask")
+    processor_index = _index_view("processor_mask")
+    last_sec_processor_index = _index_view("last_sec_processor_mask")
+    tactical_index = _index_view("tactical_mask")
+    success_index = _index_view("success_mask")
+    defended_index = _index_view("defended_mask")
 
     def get_avg_cycle_time(self) -> float:
         """获取平均周期时间"""
@@ -281,11 +364,11 @@ class ScoreAlgaeStatistics:
         )
 
     def get_avg_successful_undefended_cycle_time(self) -> float:
-        successful_undefended_index = (
-            self.success_index - self.defended_index
-        ) - self.auto_index
+        successful_undefended_mask = (
+            self.success_mask & ~self.defended_mask & ~self.auto_mask
+        )
         successful_undefended_cycle_time = [
-            self.cycle_times[index] for index in successful_undefended_index
+            self.cycle_times[index] for index in iter_mask(successful_undefended_mask)
         ]
         return (
             sum(successful_undefended_cycle_time)
@@ -296,12 +379,14 @@ class ScoreAlgaeStatistics:
 
     def get_teleop_total_time(self) -> float:
         """获取手动阶段总时间"""
-        teleop_index = set(range(len(self.cycle_times))) - self.auto_index
-        teleop_cycle_times = [self.cycle_times[index] for index in teleop_index]
+        teleop_mask = ((1 << len(self.cycle_times)) - 1) & ~self.auto_mask
+        teleop_cycle_times = [
+            self.cycle_times[index] for index in iter_mask(teleop_mask)
+        ]
         return sum(teleop_cycle_times)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class IntakeAlgaeStatistics:
     auto_ground_front_cnt: int = 0
     auto_ground_middle_cnt: int = 0
@@ -315,9 +400,9 @@ class IntakeAlgaeStatistics:
     teleop_scrape_cnt: int = 0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DefenseStatistics:
-    cycle_times: List[float] = field(default_factory=list)
+    cycle_times: "array[float]" = field(default_factory=_cycle_times)
 
     def get_avg_cycle_time(self) -> float:
         """获取平均周期时间"""
@@ -330,14 +415,14 @@ class DefenseStatistics:
         return sum(self.cycle_times)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class FoulStatistics:
     cnt: int = 0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class GiveUpStatistics:
-    cycle_times: List[float] = field(default_factory=list)
+    cycle_times: "array[float]" = field(default_factory=_cycle_times)
 
     def get_avg_cycle_time(self) -> float:
         """获取平均周期时间"""
@@ -350,7 +435,7 @@ class GiveUpStatistics:
         return sum(self.cycle_times)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ClimbUpStatistics:
     time: float = 0.0
     duration: float = 0.0
@@ -0,0 +1,155 @@
+"""
+JSON 序列化层
+
+优先使用已安装的 orjson 或 ujson，均未安装时使用标准库 json。
+可通过环境变量 SCOUTING_JSON_BACKEND（orjson / ujson / json）指定实现。
+所有实现都输出 UTF-8（不转义非ASCII字符）；默认不缩进，供机器读写的文件无需缩进。
+"""
+
+import os
+import re
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _json_dumps(
+    obj: Any, indent: bool, sort_keys: bool, default: Optional[Callable]
+) -> bytes:
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+        default=default,
+    ).encode("utf-8")
+
+
+def _orjson_dumps(
+    obj: Any, indent: bool, sort_keys: bool, default: Optional[Callable]
+) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if default is not None:
+        # 日期和数据类交给调用方的 default 处理，与标准库行为一致
+        option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    try:
+        return orjson.dumps(obj, default=default, option=option)
+    except TypeError:
+        # 超过64位的整数、NaN 之外的特殊情况等，退回标准库
+        return _json_dumps(obj, indent, sort_keys, default)
+
+
+def _ujson_dumps(
+    obj: Any, indent: bool, sort_keys: bool, default: Optional[Callable]
+) -> bytes:
+    try:
+        return ujson.dumps(
+            obj,
+            ensure_ascii=False,
+            indent=2 if indent else 0,
+            sort_keys=sort_keys,
+            default=default,
+        ).encode("utf-8")
+    except (TypeError, OverflowError):
+        return _json_dumps(obj, indent, sort_keys, default)
+
+
+# 可能超出64位的整数字面量（至少20位数字）。orjson 把这类整数解析为浮点数，
+# ujson 则直接报错；超过64位的位掩码只能由标准库无损读回
+_WIDE_INT = re.compile(rb"(?<![\d.])\d{20,}(?![\d.eE])")
+
+
+def _wide_int_safe(loads: Callable) -> Callable:
+    """包装第三方实现的 loads，内容中有超长整数时改用标准库解析"""
+
+    def safe_loads(data) -> Any:
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        if _WIDE_INT.search(raw):
+            return json.loads(raw)
+        return loads(data)
+
+    return safe_loads
+
+
+_BACKENDS: Dict[str, tuple] = {"json": (_json_dumps, json.loads)}
+if ujson is not None:
+    _BACKENDS["ujson"] = (_ujson_dumps, _wide_int_safe(ujson.loads))
+if orjson is not None:
+    _BACKENDS["orjson"] = (_orjson_dumps, _wide_int_safe(orjson.loads))
+
+
+def available_backends() -> List[str]:
+    """已安装的实现，按优先级从低到高"""
+    return list(_BACKENDS)
+
+
+def _select_backend() -> str:
+    name = os.environ.get("SCOUTING_JSON_BACKEND")
+    if name:
+        if name in _BACKENDS:
+            return name
+        logger.warning(f"JSON实现 {name} 不可用，自动选择")
+    for name in ("orjson", "ujson", "json"):
+        if name in _BACKENDS:
+            return name
+
+
+BACKEND = _select_backend()
+_dumps, _loads = _BACKENDS[BACKEND]
+
+
+def dumps_bytes(
+    obj: Any,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Optional[Callable] = None,
+    backend: Optional[str] = None,
+) -> bytes:
+    """序列化为UTF-8编码的字节串"""
+    dumps = _BACKENDS[backend][0] if backend else _dumps
+    return dumps(obj, indent, sort_keys, default)
+
+
+def dumps(
+    obj: Any,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Optional[Callable] = None,
+    backend: Optional[str] = None,
+) -> str:
+    """序列化为字符串"""
+    return dumps_bytes(obj, indent, sort_keys, default, backend).decode("utf-8")
+
+
+def loads(data, backend: Optional[str] = None) -> Any:
+    """从字符串或字节串解析"""
+    return (_BACKENDS[backend][1] if backend else _loads)(data)
+
+
+def load_file(filepath: str) -> Any:
+    """读取并解析JSON文件"""
+    with open(filepath, "rb") as f:
+        return _loads(f.read())
+
+
+def dump_file(filepath: str, obj: Any, indent: bool = False) -> None:
+    """把对象写入JSON文件"""
+    with open(filepath, "wb") as f:
+        f.write(_dumps(obj, indent, False, None))
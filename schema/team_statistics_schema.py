@@ -10,9 +10,9 @@ FRC 2025 Scouting 单个队伍统计数据结构定义
 """
 
 from typing import List, Dict, Any, Optional, Set
-from dataclasses import dataclass, field
-import json
+from dataclasses import dataclass, field, fields, MISSING
 import os
+from backend.schema import serialization
 
 
 @dataclass
@@ -164,300 +164,115 @@ class TeamStatistics:
         field(default_factory=RankValue)
     )
 
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        result = {}
-
-        def convert_field(obj):
-            if isinstance(obj, (RankValue, RankValueMatch)):
-                return obj.__dict__
-            elif isinstance(obj, MatchList):
-                return obj.__dict__
-            elif isinstance(obj, dict):
-                return {k: convert_field(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_field(item) for item in obj]
-            else:
-                return obj
-
-        for field_name, field_value in self.__dict__.items():
-            result[field_name] = convert_field(field_value)
-
-        return result
-
-    def to_json(self) -> str:
+    def to_dict(self, field_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        转换为字典格式（嵌套对象的字典与对象本身共享，调用方不应修改）
+
+        Args:
+            field_names: 只输出这些字段（team_no 总是输出），默认输出全部字段
+        """
+        if field_names is not None:
+            result = {"team_no": self.team_no}
+            for name in field_names:
+                result[name] = _encode_field(getattr(self, name))
+            return result
+        try:
+            return _encode_team_statistics(self)
+        except AttributeError:
+            # 有字段的值不是声明的类型时，逐字段转换
+            return {
+                name: encode(getattr(self, name)) for name, encode in _FIELD_ENCODERS
+            }
+
+    def to_json(self, indent: bool = False) -> str:
         """转换为JSON字符串"""
-        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+        return serialization.dumps(self.to_dict(), indent=indent)
 
     def save_to_json_file(self, filepath: str) -> None:
         """保存到JSON文件"""
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(self.to_json())
+        serialization.dump_file(filepath, self.to_dict())
 
     @classmethod
     def from_json_file(cls, filepath: str) -> "TeamStatistics":
         """从JSON文件恢复数据"""
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = serialization.load_file(filepath)
         return cls._from_dict(data)
 
     @classmethod
     def _from_dict(cls, data: Dict[str, Any]) -> "TeamStatistics":
-        """从字典恢复数据"""
-
-        def restore_field(field_data, field_type):
-            if field_type == RankValue:
-                return RankValue(
-                    value=field_data.get("value", 0.0), rank=field_data.get("rank", -1)
-                )
-            elif field_type == RankValueMatch:
-                return RankValueMatch(
-                    value=field_data.get("value", 0.0),
-                    rank=field_data.get("rank", -1),
-                    match_no=field_data.get("match_no", 0),
-                    tournament_level=field_data.get("tournament_level", ""),
-                )
-            elif field_type == MatchList:
-                return MatchList(
-                    match_nos=field_data.get("match_nos", []),
-                    tournament_levels=field_data.get("tournament_levels", []),
-                )
-            else:
-                return field_data
-
-        # 创建实例
-        instance = cls()
-
-        # 恢复基本字段
-        instance.team_no = data.get("team_no", 0)
-
-        # 恢复基础时间数据
-        instance.cycle_teleop_coral_time_ratio = restore_field(
-            data.get("cycle_teleop_coral_time_ratio", {}), RankValue
-        )
-        instance.cycle_teleop_algae_time_ratio = restore_field(
-            data.get("cycle_teleop_algae_time_ratio", {}), RankValue
-        )
-        instance.cycle_teleop_defense_time_ratio = restore_field(
-            data.get("cycle_teleop_defense_time_ratio", {}), RankValue
-        )
-        instance.cycle_teleop_give_up_time_ratio = restore_field(
-            data.get("cycle_teleop_give_up_time_ratio", {}), RankValue
-        )
-
-        # 恢复爬升相关
-        instance.climb_success_matches = restore_field(
-            data.get("climb_success_matches", {}), MatchList
-        )
-        instance.climb_fail_matches = restore_field(
-            data.get("climb_fail_matches", {}), MatchList
-        )
-        instance.climb_touch_chain_matches = restore_field(
-            data.get("climb_touch_chain_matches", {}), MatchList
-        )
-        instance.climb_success_percentage = restore_field(
-            data.get("climb_success_percentage", {}), RankValue
-        )
-        instance.climb_success_cycle_time_min = restore_field(
-            data.get("climb_success_cycle_time_min", {}), RankValueMatch
-        )
-        instance.climb_approach_time_median = restore_field(
-            data.get("climb_approach_time_median", {}), RankValue
-        )
-        instance.processor_success_max_single_match = restore_field(
-            data.get("processor_success_max_single_match", {}), RankValueMatch
-        )
-
-        # 恢复BPS和EPA
-        instance.bps_value = restore_field(data.get("bps_value", {}), RankValue)
-        instance.epa_value = restore_field(data.get("epa_value", {}), RankValue)
-
-        # 恢复自动阶段数据
-        instance.auto_line_cross_percentage = restore_field(
-            data.get("auto_line_cross_percentage", {}), RankValue
-        )
-        instance.auto_preload_coral_percentage = restore_field(
-            data.get("auto_preload_coral_percentage", {}), RankValue
-        )
-        instance.auto_high_mid_coral_max = restore_field(
-            data.get("auto_high_mid_coral_max", {}), RankValueMatch
-        )
-        instance.auto_high_mid_coral_success_rate = restore_field(
-            data.get("auto_high_mid_coral_success_rate", {}), RankValue
-        )
-        instance.auto_low_slot_coral_max = restore_field(
-            data.get("auto_low_slot_coral_max", {}), RankValueMatch
-        )
-        instance.auto_low_slot_coral_success_rate = restore_field(
-            data.get("auto_low_slot_coral_success_rate", {}), RankValue
-        )
-        instance.auto_net_place_max = restore_field(
-            data.get("auto_net_place_max", {}), RankValueMatch
-        )
-        instance.auto_algae_process_max = restore_field(
-            data.get("auto_algae_process_max", {}), RankValueMatch
-        )
-
-        # 恢复手动筒基础数据
-        instance.coral_source_station_percentage = restore_field(
-            data.get("coral_source_station_percentage", {}), RankValue
-        )
-        instance.coral_source_ground_percentage = restore_field(
-            data.get("coral_source_ground_percentage", {}), RankValue
-        )
-        instance.coral_success_cycle_median = restore_field(
-            data.get("coral_success_cycle_median", {}), RankValue
-        )
-        instance.coral_success_cycle_max = restore_field(
-            data.get("coral_success_cycle_max", {}), RankValueMatch
-        )
-        instance.coral_undefended_cycle_time_median = restore_field(
-            data.get("coral_undefended_cycle_time_median", {}), RankValue
-        )
-
-        # 恢复各级别筒统计
-        instance.high_coral_avg_success = restore_field(
-            data.get("high_coral_avg_success", {}), RankValue
-        )
-        instance.high_coral_success_rate = restore_field(
-            data.get("high_coral_success_rate", {}), RankValue
-        )
-        instance.high_coral_undefended_success_cycle_time_median = restore_field(
-            data.get("high_coral_undefended_success_cycle_time_median", {}), RankValue
-        )
-
-        instance.mid_coral_avg_success = restore_field(
-            data.get("mid_coral_avg_success", {}), RankValue
-        )
-        instance.mid_coral_success_rate = restore_field(
-            data.get("mid_coral_success_rate", {}), RankValue
-        )
-        instance.mid_coral_undefended_success_cycle_time_median = restore_field(
-            data.get("mid_coral_undefended_success_cycle_time_median", {}), RankValue
-        )
-
-        instance.low_coral_avg_success = restore_field(
-            data.get("low_coral_avg_success", {}), RankValue
-        )
-        instance.low_coral_success_rate = restore_field(
-            data.get("low_coral_success_rate", {}), RankValue
-        )
-        instance.low_coral_undefended_success_cycle_time_median = restore_field(
-            data.get("low_coral_undefended_success_cycle_time_median", {}), RankValue
-        )
-
-        instance.slot_coral_avg_success = restore_field(
-            data.get("slot_coral_avg_success", {}), RankValue
-        )
-        instance.slot_coral_success_rate = restore_field(
-            data.get("slot_coral_success_rate", {}), RankValue
-        )
-        instance.slot_coral_undefended_success_cycle_time_median = restore_field(
-            data.get("slot_coral_undefended_success_cycle_time_median", {}), RankValue
-        )
-
-        # 恢复网+洞+背面槽筒统计
-        instance.net_processor_back_slot_avg_success = restore_field(
-            data.get("net_processor_back_slot_avg_success", {}), RankValue
-        )
-        instance.net_processor_back_slot_success_rate = restore_field(
-            data.get("net_processor_back_slot_success_rate", {}), RankValue
-        )
-        instance.net_processor_back_slot_undefended_success_cycle_time_median = (
-            restore_field(
-                data.get(
-                    "net_processor_back_slot_undefended_success_cycle_time_median", {}
-                ),
-                RankValue,
-            )
-        )
-        instance.net_processor_back_coral_undefended_count = restore_field(
-            data.get("net_processor_back_coral_undefended_count", {}), RankValue
-        )
-
-        # 恢复叠筒统计
-        instance.stack_coral_max_single_match = restore_field(
-            data.get("stack_coral_max_single_match", {}), RankValue
-        )
-        instance.stack_coral_success_rate = restore_field(
-            data.get("stack_coral_success_rate", {}), RankValue
-        )
-        instance.stack_coral_undefended_success_cycle_time_median = restore_field(
-            data.get("stack_coral_undefended_success_cycle_time_median", {}), RankValue
-        )
-
-        # 恢复手动球数据
-        instance.algae_success_cycle_median = restore_field(
-            data.get("algae_success_cycle_median", {}), RankValue
-        )
-        instance.algae_success_cycle_max = restore_field(
-            data.get("algae_success_cycle_max", {}), RankValueMatch
-        )
-        instance.avg_scrape_algae_count = restore_field(
-            data.get("avg_scrape_algae_count", {}), RankValue
-        )
-        instance.avg_pickup_algae_count = restore_field(
-            data.get("avg_pickup_algae_count", {}), RankValue
-        )
-
-        # 恢复球来源统计
-        instance.algae_source_coral_percentage = data.get(
-            "algae_source_coral_percentage", 0.0
-        )
-        instance.algae_source_back_percentage = data.get(
-            "algae_source_back_percentage", 0.0
-        )
-        instance.algae_source_mid_percentage = data.get(
-            "algae_source_mid_percentage", 0.0
-        )
-        instance.algae_source_front_percentage = data.get(
-            "algae_source_front_percentage", 0.0
-        )
-
-        # 恢复网投统计
-        instance.net_place_percentage = data.get("net_place_percentage", 0.0)
-        instance.net_shoot_percentage = data.get("net_shoot_percentage", 0.0)
-        instance.net_place_success_rate = restore_field(
-            data.get("net_place_success_rate", {}), RankValue
-        )
-        instance.net_shoot_success_rate = restore_field(
-            data.get("net_shoot_success_rate", {}), RankValue
-        )
-
-        # 恢复战术相关
-        instance.tactical_max_single_match = restore_field(
-            data.get("tactical_max_single_match", {}), RankValueMatch
-        )
-        instance.last_second_processer_matches = restore_field(
-            data.get("last_second_processer_matches", {}), MatchList
-        )
-
-        # 恢复防守抗性
-        instance.coral_defended_percentage = restore_field(
-            data.get("coral_defended_percentage", {}), RankValue
-        )
-        instance.coral_defended_max_single_match = restore_field(
-            data.get("coral_defended_max_single_match", {}), RankValueMatch
-        )
-        instance.defended_success_coral_cycle_time_max = restore_field(
-            data.get("defended_success_coral_cycle_time_max", {}), RankValueMatch
-        )
-        instance.defended_success_coral_cycle_time_median = restore_field(
-            data.get("defended_success_coral_cycle_time_median", {}), RankValue
-        )
-        instance.undefended_success_coral_cycle_time_median = restore_field(
-            data.get("undefended_success_coral_cycle_time_median", {}), RankValue
-        )
-        instance.defended_vs_undefended_success_coral_cycle_time_increase_percentage = restore_field(
-            data.get(
-                "defended_vs_undefended_success_coral_cycle_time_increase_percentage",
-                {},
-            ),
-            RankValue,
-        )
-
-        return instance
+        """从字典恢复数据，缺少的字段保留默认值"""
+        return _decode_team_statistics(data)
+
+
+# 由字段定义在导入时生成的编解码函数，字段增删只需修改上面的数据类定义
+_NESTED_TYPES = (RankValue, RankValueMatch, MatchList)
+
+
+def _build_encoder(cls):
+    """
+    生成 to_dict 的函数体：每个字段一项，嵌套类型直接取其 __dict__，
+    不再在运行时逐字段做类型判断
+    """
+    items = []
+    for f in fields(cls):
+        if f.type in _NESTED_TYPES:
+            items.append(f"{f.name!r}: self.{f.name}.__dict__")
+        else:
+            items.append(f"{f.name!r}: self.{f.name}")
+    source = "def to_dict(self):\n    return {" + ", ".join(items) + "}\n"
+    namespace = {}
+    exec(source, namespace)
+    return namespace["to_dict"]
+
+
+def _encode_field(value):
+    return value.__dict__ if isinstance(value, _NESTED_TYPES) else value
+
+
+def _identity(value):
+    return value
+
+
+def _build_decoder(cls, nested_decoders):
+    """
+    生成 cls 的解码函数：按字段逐个取值，嵌套类型交给对应的解码函数，
+    缺少的字段使用字段默认值；非字典的值（如旧数据中直接存放的数值）原样保留
+    """
+    namespace = {"_cls": cls}
+    args = []
+    for i, f in enumerate(fields(cls)):
+        value = f"data[{f.name!r}]"
+        if f.type in nested_decoders:
+            namespace[f"_decode_{i}"] = nested_decoders[f.type]
+            value = f"_decode_{i}({value})"
+        if f.default is not MISSING:
+            namespace[f"_default_{i}"] = f.default
+            args.append(f"{f.name}={value} if {f.name!r} in data else _default_{i}")
+        elif f.default_factory is not MISSING:
+            namespace[f"_factory_{i}"] = f.default_factory
+            args.append(f"{f.name}={value} if {f.name!r} in data else _factory_{i}()")
+        else:
+            args.append(f"{f.name}={value}")
+    source = (
+        "def decode(data):\n"
+        "    if not isinstance(data, dict):\n"
+        "        return data\n"
+        "    return _cls(" + ", ".join(args) + ")\n"
+    )
+    exec(source, namespace)
+    return namespace["decode"]
+
+
+_NESTED_DECODERS = {
+    nested_cls: _build_decoder(nested_cls, {}) for nested_cls in _NESTED_TYPES
+}
+_encode_team_statistics = _build_encoder(TeamStatistics)
+_decode_team_statistics = _build_decoder(TeamStatistics, _NESTED_DECODERS)
+_FIELD_ENCODERS = [
+    (f.name, _encode_field if f.type in _NESTED_TYPES else _identity)
+    for f in fields(TeamStatistics)
+]
 
 
 # 辅助函数用于创建和管理统计数据
@@ -2,11 +2,12 @@
 从比赛统计数据聚合队伍统计数据的功能模块
 """
 
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, FrozenSet, Iterable
 from collections import defaultdict
 from dataclasses import fields
+import copy
 import statistics
-from backend.schema.match_statistics_schema import MatchStatistics
+from backend.schema.match_statistics_schema import MatchStatistics, popcount, iter_mask
 from backend.schema.team_statistics_schema import (
     TeamStatistics,
     RankValue,
@@ -15,10 +16,118 @@ from backend.schema.team_statistics_schema import (
     create_team_statistics,
     calculate_rank_data,
 )
+from backend.service.vectorized_aggregation import (
+    calculate_teams_statistics_vectorized,
+    calculate_all_ranks_vectorized,
+)
+from backend.service.partial_aggregation import StatisticsPartial
+from backend.service.metrics import stage_metrics
+
+# 各统计板块（对应下面的 _calculate_* 函数）计算出的字段，
+# 只需要部分字段时据此只计算相关的板块
+SECTION_FIELDS: Dict[str, List[str]] = {
+    "time_ratios": [
+        "cycle_teleop_coral_time_ratio",
+        "cycle_teleop_algae_time_ratio",
+        "cycle_teleop_defense_time_ratio",
+        "cycle_teleop_give_up_time_ratio",
+    ],
+    "climb": [
+        "climb_success_matches",
+        "climb_fail_matches",
+        "climb_touch_chain_matches",
+        "climb_park_time_median",
+        "climb_success_percentage",
+        "climb_success_cycle_time_min",
+    ],
+    "bps_epa_ppg": [
+        "bps_value",
+        "epa_value",
+        "ppg_avg",
+        "ppg_max_single_match",
+    ],
+    "auto": [
+        "auto_line_cross_percentage",
+        "auto_high_mid_coral_success_rate",
+        "auto_low_slot_coral_success_rate",
+        "auto_high_mid_coral_max",
+        "auto_low_slot_coral_max",
+        "auto_net_place_max",
+        "auto_algae_process_max",
+        "auto_preload_coral_percentage",
+    ],
+    "manual_coral": [
+        "l1_teleop_success_count_avg",
+        "l1_teleop_success_percentage",
+        "l1_teleop_undefended_success_cycle_time_median",
+        "l2_teleop_success_count_avg",
+        "l2_teleop_success_percentage",
+        "l2_teleop_undefended_success_cycle_time_median",
+        "l3_teleop_success_count_avg",
+        "l3_teleop_success_percentage",
+        "l3_teleop_undefended_success_cycle_time_median",
+        "l4_teleop_success_count_avg",
+        "l4_teleop_success_percentage",
+        "l4_teleop_undefended_success_cycle_time_median",
+        "stack_l1_teleop_success_count_avg",
+        "stack_l1_teleop_success_percentage",
+        "stack_l1_teleop_undefended_success_cycle_time_median",
+        "total_teleop_success_count_avg",
+        "total_teleop_undefended_success_cycle_time_median",
+        "total_teleop_success_percentage",
+        "coral_source_ground_percentage",
+        "coral_source_station_percentage",
+    ],
+    "manual_algae": [
+        "processor_success_max_single_match",
+        "avg_scrape_algae_count",
+        "avg_pickup_algae_count",
+        "algae_success_cycle_count_median",
+        "algae_success_cycle_count_max",
+        "algae_source_front_percentage",
+        "algae_source_mid_percentage",
+        "algae_source_back_percentage",
+        "algae_source_reef_percentage",
+        "net_place_percentage",
+        "net_shoot_percentage",
+        "net_place_success_rate",
+        "net_shoot_success_rate",
+        "net_success_undefended_cycle_time_median",
+        "tactical_max_single_match",
+        "last_second_processer_matches",
+    ],
+    "defense_resistance": [
+        "coral_defended_percentage",
+        "coral_defended_max_single_match",
+        "defended_success_coral_cycle_time_max",
+        "defended_success_coral_cycle_time_median",
+        "undefended_success_coral_cycle_time_median",
+        "defended_vs_undefended_success_coral_cycle_time_increase_percentage",
+    ],
+}
+ALL_SECTIONS = frozenset(SECTION_FIELDS)
+FIELD_SECTIONS = {
+    name: section for section, names in SECTION_FIELDS.items() for name in names
+}
+_FIELD_FACTORIES = {f.name: f.default_factory for f in fields(TeamStatistics)}
+# 需要排名的字段（排名直接写入字段对象）
+_RANKED_FIELDS = [
+    f.name for f in fields(TeamStatistics) if f.type in (RankValue, RankValueMatch)
+]
+
+
+def sections_for_fields(field_names: Iterable[str]) -> FrozenSet[str]:
+    """计算这些字段所需的统计板块"""
+    return frozenset(
+        FIELD_SECTIONS[name] for name in field_names if name in FIELD_SECTIONS
+    )
 
 
 def create_team_statistics_from_matches(
-    match_stats: List[MatchStatistics], filter_func: Optional[callable] = None
+    match_stats: List[MatchStatistics],
+    filter_func: Optional[callable] = None,
+    vectorized: bool = False,
+    sections: Optional[Iterable[str]] = None,
 ) -> List[TeamStatistics]:
     """
     从比赛统计数据列表创建队伍统计数据列表
@@ -26,6 +135,8 @@ def create_team_statistics_from_matches(
     Args:
         match_stats: 比赛统计数据列表
         filter_func: 可选的过滤函数，返回True的比赛将被过滤掉
+        vectorized: 是否使用NumPy向量化实现（结果相同；未安装NumPy时自动使用逐场实现）
+        sections: 只计算并排名这些统计板块，默认全部计算；其余字段保持默认值
 
     Returns:
         队伍统计数据列表
@@ -38,48 +149,252 @@ def create_team_statistics_from_matches(
 
         teams_matches[match_stat.team_no].append(match_stat)
 
+    return create_team_statistics_from_groups(teams_matches, vectorized, sections)
+
+
+def create_team_statistics_from_groups(
+    teams_matches: Dict[int, List[MatchStatistics]],
+    vectorized: bool = False,
+    sections: Optional[Iterable[str]] = None,
+) -> List[TeamStatistics]:
+    """
+    从按队伍分好组的比赛统计数据创建队伍统计数据列表
+
+    Args:
+        teams_matches: 队伍号 -> 该队伍的比赛，结果按此顺序排列
+        vectorized: 是否使用NumPy向量化实现
+        sections: 只计算并排名这些统计板块，默认全部计算
+
+    Returns:
+        队伍统计数据列表
+    """
     # 为每个队伍创建统计数据
-    team_statistics = []
-    for team_no, matches in teams_matches.items():
-        team_stat = _calculate_single_team_statistics(team_no, matches)
-        team_statistics.append(team_stat)
+    team_statistics = None
+    if vectorized and sections is None:
+        with stage_metrics.stage("team_statistics"):
+            team_statistics = calculate_teams_statistics_vectorized(teams_matches)
+    if team_statistics is None:
+        team_statistics = []
+        for team_no, matches in teams_matches.items():
+            team_stat = _calculate_single_team_statistics(team_no, matches, sections)
+            team_statistics.append(team_stat)
 
     # 计算所有排名
+    _calculate_all_rankings(team_statistics, sections)
+
+    return team_statistics
+
+
+def create_team_statistics_from_partials(
+    team_partials: Dict[int, StatisticsPartial],
+) -> List[TeamStatistics]:
+    """
+    从合并好的部分聚合创建队伍统计数据列表（见 partial_aggregation）
+
+    Args:
+        team_partials: 队伍号 -> 该队伍过滤后全部比赛合并的统计量，按结果顺序排列
+
+    Returns:
+        计算了全部统计板块并排名的队伍统计数据列表
+    """
+    with stage_metrics.stage("team_statistics"):
+        team_statistics = [
+            partial.to_team_statistics(team_no)
+            for team_no, partial in team_partials.items()
+        ]
     _calculate_all_rankings(team_statistics)
 
     return team_statistics
 
 
+def update_team_statistics(
+    team_statistics: List[TeamStatistics],
+    teams_matches: Dict[int, List[MatchStatistics]],
+    sections: Optional[Iterable[str]] = None,
+    team_order: Optional[Iterable[int]] = None,
+) -> List[TeamStatistics]:
+    """
+    增量更新队伍统计数据：只重新计算发生变化的队伍，其余队伍复用已有的数值，最后重新排名
+
+    原有的列表和对象不会被修改（它们可能正被其他请求读取）：复用的队伍浅复制一份，
+    将被重新排名的字段换成复制的对象
+
+    Args:
+        team_statistics: 现有的队伍统计数据列表
+        teams_matches: 发生变化的队伍号 -> 该队伍过滤后的全部比赛（为空表示该队伍已无比赛）
+        sections: 现有数据中已计算的统计板块，默认全部
+        team_order: 全量计算时的队伍顺序（各队伍在过滤后的比赛中首次出现的先后），
+            结果按此排列；默认保持原有顺序，新出现的队伍追加到末尾
+
+    Returns:
+        新的队伍统计数据列表
+    """
+    updated = {}
+    for team_no, matches in teams_matches.items():
+        if matches:
+            updated[team_no] = _calculate_single_team_statistics(
+                team_no, matches, sections
+            )
+
+    return _merge_updated_teams(
+        team_statistics, teams_matches.keys(), updated, sections, team_order
+    )
+
+
+def update_team_statistics_from_partials(
+    team_statistics: List[TeamStatistics],
+    team_nos: Iterable[int],
+    team_partials: Dict[int, StatisticsPartial],
+    team_order: Optional[Iterable[int]] = None,
+) -> List[TeamStatistics]:
+    """
+    增量更新队伍统计数据（合并部分聚合的版本，见 update_team_statistics）
+
+    Args:
+        team_statistics: 现有的队伍统计数据列表（计算了全部统计板块）
+        team_nos: 发生变化的队伍号
+        team_partials: 发生变化的队伍号 -> 重新合并的统计量（缺少表示该队伍已无比赛）
+        team_order: 全量计算时的队伍顺序，结果按此排列
+
+    Returns:
+        新的队伍统计数据列表
+    """
+    with stage_metrics.stage("team_statistics"):
+        updated = {
+            team_no: partial.to_team_statistics(team_no)
+            for team_no, partial in team_partials.items()
+        }
+    return _merge_updated_teams(team_statistics, team_nos, updated, None, team_order)
+
+
+def _merge_updated_teams(
+    team_statistics: List[TeamStatistics],
+    team_nos: Iterable[int],
+    updated: Dict[int, TeamStatistics],
+    sections: Optional[Iterable[str]] = None,
+    team_order: Optional[Iterable[int]] = None,
+) -> List[TeamStatistics]:
+    """
+    用重新计算的队伍替换发生变化的队伍（updated 中缺少的队伍被移除），重新排名
+
+    给出 team_order 时按其排列，使结果的队伍顺序与全量计算相同、与变更历史无关
+    （并列的排名按队伍顺序排列）
+    """
+    team_nos = set(team_nos)
+    updated = dict(updated)
+    ranked_sections = ALL_SECTIONS if sections is None else frozenset(sections)
+    result = []
+    for team_stat in team_statistics:
+        if team_stat.team_no not in team_nos:
+            result.append(_copy_for_ranking(team_stat, ranked_sections))
+        elif team_stat.team_no in updated:
+            result.append(updated.pop(team_stat.team_no))
+    # 新出现的队伍追加到末尾
+    result.extend(updated.values())
+    if team_order is not None:
+        position = {team_no: i for i, team_no in enumerate(team_order)}
+        result.sort(
+            key=lambda team_stat: position.get(team_stat.team_no, len(position))
+        )
+
+    _calculate_all_rankings(result, sections)
+
+    return result
+
+
+def _copy_for_ranking(
+    team_stat: TeamStatistics, sections: FrozenSet[str]
+) -> TeamStatistics:
+    """浅复制一支队伍，并复制这些板块中需要排名的字段对象，排名不会写回原对象"""
+    team_stat = copy.copy(team_stat)
+    for name in _RANKED_FIELDS:
+        if FIELD_SECTIONS.get(name) in sections:
+            setattr(team_stat, name, copy.copy(getattr(team_stat, name)))
+    return team_stat
+
+
+def add_team_statistics_sections(
+    team_statistics: List[TeamStatistics],
+    teams_matches: Dict[int, List[MatchStatistics]],
+    sections: Iterable[str],
+) -> List[TeamStatistics]:
+    """
+    在已有的队伍统计数据上补算其他统计板块并排名，返回新的列表
+
+    原有对象不会被修改：每支队伍浅复制一份，新板块的字段换成新对象后再计算和排名。
+    已有板块的字段对象与原列表共享且只被读取；之后的增量更新
+    （update_team_statistics）重新排名前会再复制它们
+
+    Args:
+        team_statistics: 现有的队伍统计数据列表
+        teams_matches: 队伍号 -> 该队伍过滤后的全部比赛
+        sections: 需要补算的统计板块
+    """
+    sections = frozenset(sections)
+    result = []
+    for team_stat in team_statistics:
+        team_stat = copy.copy(team_stat)
+        for section in sections:
+            for name in SECTION_FIELDS[section]:
+                setattr(team_stat, name, _FIELD_FACTORIES[name]())
+        _calculate_single_team_statistics(
+            team_stat.team_no,
+            teams_matches.get(team_stat.team_no, []),
+            sections,
+            team_stat,
+        )
+        result.append(team_stat)
+
+    _calculate_all_rankings(result, sections)
+
+    return result
+
+
+@stage_metrics.timed("team_statistics")
 def _calculate_single_team_statistics(
-    team_no: int, matches: List[MatchStatistics]
+    team_no: int,
+    matches: List[MatchStatistics],
+    sections: Optional[Iterable[str]] = None,
+    team_stat: Optional[TeamStatistics] = None,
 ) -> TeamStatistics:
-    """为单个队伍创建统计数据"""
-    team_stat = create_team_statistics(team_no)
+    """为单个队伍创建统计数据，sections 为 None 时计算全部板块"""
+    if team_stat is None:
+        team_stat = create_team_statistics(team_no)
     if team_no == 2910:
         print(1)
     if not matches:
         return team_stat
 
+    if sections is None:
+        sections = ALL_SECTIONS
+
     # 1. 计算时间占比数据
-    _calculate_time_ratios(team_stat, matches)
+    if "time_ratios" in sections:
+        _calculate_time_ratios(team_stat, matches)
 
     # 2. 计算爬升统计
-    _calculate_climb_statistics(team_stat, matches)
+    if "climb" in sections:
+        _calculate_climb_statistics(team_stat, matches)
 
     # 3. 计算BPS和EPA (目前先设为0，需要具体实现)
-    _calculate_bps_epa_ppg(team_stat, matches)
+    if "bps_epa_ppg" in sections:
+        _calculate_bps_epa_ppg(team_stat, matches)
 
     # 4. 计算自动阶段统计
-    _calculate_auto_statistics(team_stat, matches)
+    if "auto" in sections:
+        _calculate_auto_statistics(team_stat, matches)
 
     # 5. 计算手动筒统计
-    _calculate_manual_coral_statistics(team_stat, matches)
+    if "manual_coral" in sections:
+        _calculate_manual_coral_statistics(team_stat, matches)
 
     # 6. 计算手动球统计
-    _calculate_manual_algae_statistics(team_stat, matches)
+    if "manual_algae" in sections:
+        _calculate_manual_algae_statistics(team_stat, matches)
 
     # 7. 计算防守抗性统计
-    _calculate_defense_resistance_statistics(team_stat, matches)
+    if "defense_resistance" in sections:
+        _calculate_defense_resistance_statistics(team_stat, matches)
 
     return team_stat
 
@@ -190,63 +505,70 @@ def _calculate_bps_epa_ppg(
     total_epas = 0
     ppg = []
     for match in matches:
-        total_branches += len(
-            match.score_coral.successful_index
+        total_branches += popcount(
+            match.score_coral.successful_mask
             & (
-                match.score_coral.l2_index
-                | match.score_coral.l3_index
-                | match.score_coral.l4_index
+                match.score_coral.l2_mask
+                | match.score_coral.l3_mask
+                | match.score_coral.l4_mask
             )
         )
         total_branch_time += sum(
             match.score_coral.cycle_times[index]
-            for index in (
-                match.score_coral.l2_index
-                | match.score_coral.l3_index
-                | match.score_coral.l4_index
+            for index in iter_mask(
+                match.score_coral.l2_mask
+                | match.score_coral.l3_mask
+                | match.score_coral.l4_mask
             )
         )
         # 自动： leave*3 高中筒*2 低筒*1
         total_epas += match.leave * 3
         total_epas += (
-            len(
-                match.score_coral.successful_index
-                & match.score_coral.auto_index
-                & (match.score_coral.l3_index | match.score_coral.l4_index)
+            popcount(
+                match.score_coral.successful_mask
+                & match.score_coral.auto_mask
+                & (match.score_coral.l3_mask | match.score_coral.l4_mask)
             )
             * 2
-            + len(
-                match.score_coral.successful_index
-                & match.score_coral.auto_index
+            + popcount(
+                match.score_coral.successful_mask
+                & match.score_coral.auto_mask
                 & (
-                    match.score_coral.l1_index
-                    | match.score_coral.l2_index
-                    | match.score_coral.stack_l1_index
+                    match.score_coral.l1_mask
+                    | match.score_coral.l2_mask
+                    | match.score_coral.stack_l1_mask
                 )
             )
             * 1
         )
         # 手动： 槽筒*2
         total_epas += (
-            len(
+            popcount(
                 (
-                    match.score_coral.successful_index
-                    & (match.score_coral.stack_l1_index | match.score_coral.l1_index)
+                    match.score_coral.successful_mask
+                    & (match.score_coral.stack_l1_mask | match.score_coral.l1_mask)
                 )
-                - match.score_coral.auto_index
+                & ~match.score_coral.auto_mask
             )
             * 2
         )
         # 藻类： 处理器*2 网*4 处理器*2 压哨*2
         total_epas += (
-            len(match.score_algae.success_index & match.score_algae.processor_index) * 2
-            + len(match.score_algae.success_index & match.score_algae.place_net_index)
+            popcount(
+                match.score_algae.success_mask & match.score_algae.processor_mask
+            )
+            * 2
+            + popcount(
+                match.score_algae.success_mask & match.score_algae.place_net_mask
+            )
             * 4
-            + len(match.score_algae.success_index & match.score_algae.shoot_net_index)
+            + popcount(
+                match.score_algae.success_mask & match.score_algae.shoot_net_mask
+            )
             * 4
-            + len(
-                match.score_algae.success_index
-                & match.score_algae.last_sec_processor_index
+            + popcount(
+                match.score_algae.success_mask
+                & match.score_algae.last_sec_processor_mask
             )
             * 2
         )
@@ -255,46 +577,49 @@ def _calculate_bps_epa_ppg(
         points = 0
         points += 3 if match.leave else 0
         points += (
-            len(
-                match.score_coral.successful_index
-                & (match.score_coral.l1_index | match.score_coral.stack_l1_index)
+            popcount(
+                match.score_coral.successful_mask
+                & (match.score_coral.l1_mask | match.score_coral.stack_l1_mask)
             )
             * 2
-        ) + len(
-            match.score_coral.successful_index
-            & (match.score_coral.l1_index | match.score_coral.stack_l1_index)
-            & match.score_coral.auto_index
+        ) + popcount(
+            match.score_coral.successful_mask
+            & (match.score_coral.l1_mask | match.score_coral.stack_l1_mask)
+            & match.score_coral.auto_mask
         )
         points += (
-            len(match.score_coral.successful_index & match.score_coral.l2_index) * 3
-        ) + len(
-            match.score_coral.successful_index
-            & match.score_coral.l2_index
-            & match.score_coral.auto_index
+            popcount(match.score_coral.successful_mask & match.score_coral.l2_mask) * 3
+        ) + popcount(
+            match.score_coral.successful_mask
+            & match.score_coral.l2_mask
+            & match.score_coral.auto_mask
         )
         points += (
-            len(match.score_coral.successful_index & match.score_coral.l3_index) * 4
-        ) + len(
-            match.score_coral.successful_index
-            & match.score_coral.l3_index
-            & match.score_coral.auto_index
+            popcount(match.score_coral.successful_mask & match.score_coral.l3_mask) * 4
+        ) + popcount(
+            match.score_coral.successful_mask
+            & match.score_coral.l3_mask
+            & match.score_coral.auto_mask
         ) * 2
         points += (
-            len(match.score_coral.successful_index & match.score_coral.l4_index) * 5
-        ) + len(
-            match.score_coral.successful_index
-            & match.score_coral.l4_index
-            & match.score_coral.auto_index
+            popcount(match.score_coral.successful_mask & match.score_coral.l4_mask) * 5
+        ) + popcount(
+            match.score_coral.successful_mask
+            & match.score_coral.l4_mask
+            & match.score_coral.auto_mask
         ) * 2
         points += (
-            len(match.score_algae.success_index & match.score_algae.processor_index) * 6
+            popcount(
+                match.score_algae.success_mask & match.score_algae.processor_mask
+            )
+            * 6
         )
         points += (
-            len(
-                match.score_algae.success_index
+            popcount(
+                match.score_algae.success_mask
                 & (
-                    match.score_algae.place_net_index
-                    | match.score_algae.shoot_net_index
+                    match.score_algae.place_net_mask
+                    | match.score_algae.shoot_net_mask
                 )
             )
             * 4
@@ -338,18 +663,18 @@ def _calculate_auto_statistics(
         leave_cnt += 1 if match.leave else 0
         preload_coral_count += (
             1
-            if 0 in (match.score_coral.successful_index & match.score_coral.auto_index)
+            if match.score_coral.successful_mask & match.score_coral.auto_mask & 1
             else 0
         )
         # 自动高中筒统计
-        success_high_mid_count = len(
-            match.score_coral.successful_index
-            & match.score_coral.auto_index
-            & (match.score_coral.l3_index | match.score_coral.l4_index)
+        success_high_mid_count = popcount(
+            match.score_coral.successful_mask
+            & match.score_coral.auto_mask
+            & (match.score_coral.l3_mask | match.score_coral.l4_mask)
         )
-        total_high_mid_cnt += len(
-            match.score_coral.auto_index
-            & (match.score_coral.l3_index | match.score_coral.l4_index)
+        total_high_mid_cnt += popcount(
+            match.score_coral.auto_mask
+            & (match.score_coral.l3_mask | match.score_coral.l4_mask)
         )
         total_success_high_mid_cnt += success_high_mid_count
         if success_high_mid_count > 0:
@@ -358,18 +683,18 @@ def _calculate_auto_statistics(
             )
 
         # 自动低筒槽筒统计
-        success_low_slot_count = len(
-            match.score_coral.successful_index
-            & match.score_coral.auto_index
+        success_low_slot_count = popcount(
+            match.score_coral.successful_mask
+            & match.score_coral.auto_mask
             & (
-                match.score_coral.stack_l1_index
-                | match.score_coral.l1_index
-                | match.score_coral.l2_index
+                match.score_coral.stack_l1_mask
+                | match.score_coral.l1_mask
+                | match.score_coral.l2_mask
             )
         )
-        total_low_slot_cnt += len(
-            match.score_coral.auto_index
-            & (match.score_coral.l1_index | match.score_coral.stack_l1_index)
+        total_low_slot_cnt += popcount(
+            match.score_coral.auto_mask
+            & (match.score_coral.l1_mask | match.score_coral.stack_l1_mask)
         )
         total_success_low_slot_cnt += success_low_slot_count
         if success_low_slot_count > 0:
@@ -378,14 +703,14 @@ def _calculate_auto_statistics(
             )
 
         # 自动网投统计
-        success_net_place_count = len(
-            match.score_algae.success_index
-            & match.score_algae.auto_index
-            & (match.score_algae.place_net_index | match.score_algae.shoot_net_index)
+        success_net_place_count = popcount(
+            match.score_algae.success_mask
+            & match.score_algae.auto_mask
+            & (match.score_algae.place_net_mask | match.score_algae.shoot_net_mask)
         )
-        total_net_place_cnt += len(
-            match.score_algae.auto_index
-            & (match.score_algae.place_net_index | match.score_algae.shoot_net_index)
+        total_net_place_cnt += popcount(
+            match.score_algae.auto_mask
+            & (match.score_algae.place_net_mask | match.score_algae.shoot_net_mask)
         )
         total_success_net_place_cnt += success_net_place_count
         if success_net_place_count > 0:
@@ -477,50 +802,50 @@ def _calculate_manual_coral_statistics(
         coral_source_ground_cnt += match.intake_coral.teleop_ground_cnt
         coral_source_loading_station_cnt += match.intake_coral.teleop_load_station_cnt
         l1_success_counts.append(
-            len(
-                match.score_coral.successful_index
-                & match.score_coral.l1_index - match.score_coral.auto_index
+            popcount(
+                match.score_coral.successful_mask
+                & match.score_coral.l1_mask & ~match.score_coral.auto_mask
             )
         )
         l1_attempt_counts.append(
-            len(match.score_coral.l1_index - match.score_coral.auto_index)
+            popcount(match.score_coral.l1_mask & ~match.score_coral.auto_mask)
         )
 
         l2_success_counts.append(
-            len(
-                match.score_coral.successful_index
-                & match.score_coral.l2_index - match.score_coral.auto_index
+            popcount(
+                match.score_coral.successful_mask
+                & match.score_coral.l2_mask & ~match.score_coral.auto_mask
             )
         )
         l2_attempt_counts.append(
-            len(match.score_coral.l2_index - match.score_coral.auto_index)
+            popcount(match.score_coral.l2_mask & ~match.score_coral.auto_mask)
         )
         l3_success_counts.append(
-            len(
-                match.score_coral.successful_index
-                & match.score_coral.l3_index - match.score_coral.auto_index
+            popcount(
+                match.score_coral.successful_mask
+                & match.score_coral.l3_mask & ~match.score_coral.auto_mask
             )
         )
         l3_attempt_counts.append(
-            len(match.score_coral.l3_index - match.score_coral.auto_index)
+            popcount(match.score_coral.l3_mask & ~match.score_coral.auto_mask)
         )
         l4_success_counts.append(
-            len(
-                match.score_coral.successful_index
-                & match.score_coral.l4_index - match.score_coral.auto_index
+            popcount(
+                match.score_coral.successful_mask
+                & match.score_coral.l4_mask & ~match.score_coral.auto_mask
             )
         )
         l4_attempt_counts.append(
-            len(match.score_coral.l4_index - match.score_coral.auto_index)
+            popcount(match.score_coral.l4_mask & ~match.score_coral.auto_mask)
         )
         stack_l1_success_counts.append(
-            len(
-                match.score_coral.successful_index
-                & match.score_coral.stack_l1_index - match.score_coral.auto_index
+            popcount(
+                match.score_coral.successful_mask
+                & match.score_coral.stack_l1_mask & ~match.score_coral.auto_mask
             )
         )
         stack_l1_attempt_counts.append(
-            len(match.score_coral.stack_l1_index - match.score_coral.auto_index)
+            popcount(match.score_coral.stack_l1_mask & ~match.score_coral.auto_mask)
         )
         match_nos.append(match.match_no)
         tournament_levels.append(match.tournament_level)
@@ -529,55 +854,55 @@ def _calculate_manual_coral_statistics(
         l1_undefended_cycle_times.append(
             [
                 match.score_coral.cycle_times[index]
-                for index in (
-                    match.score_coral.successful_index
-                    & match.score_coral.l1_index
-                    - match.score_coral.auto_index
-                    - match.score_coral.defended_index
+                for index in iter_mask(
+                    match.score_coral.successful_mask
+                    & match.score_coral.l1_mask
+                    & ~match.score_coral.auto_mask
+                    & ~match.score_coral.defended_mask
                 )
             ]
         )
         l2_undefended_cycle_times.append(
             [
                 match.score_coral.cycle_times[index]
-                for index in (
-                    match.score_coral.successful_index
-                    & match.score_coral.l2_index
-                    - match.score_coral.auto_index
-                    - match.score_coral.defended_index
+                for index in iter_mask(
+                    match.score_coral.successful_mask
+                    & match.score_coral.l2_mask
+                    & ~match.score_coral.auto_mask
+                    & ~match.score_coral.defended_mask
                 )
             ]
         )
         l3_undefended_cycle_times.append(
             [
                 match.score_coral.cycle_times[index]
-                for index in (
-                    match.score_coral.successful_index
-                    & match.score_coral.l3_index
-                    - match.score_coral.auto_index
-                    - match.score_coral.defended_index
+                for index in iter_mask(
+                    match.score_coral.successful_mask
+                    & match.score_coral.l3_mask
+                    & ~match.score_coral.auto_mask
+                    & ~match.score_coral.defended_mask
                 )
             ]
         )
         l4_undefended_cycle_times.append(
             [
                 match.score_coral.cycle_times[index]
-                for index in (
-                    match.score_coral.successful_index
-                    & match.score_coral.l4_index
-                    - match.score_coral.auto_index
-                    - match.score_coral.defended_index
+                for index in iter_mask(
+                    match.score_coral.successful_mask
+                    & match.score_coral.l4_mask
+                    & ~match.score_coral.auto_mask
+                    & ~match.score_coral.defended_mask
                 )
             ]
         )
         stack_l1_undefended_cycle_times.append(
             [
                 match.score_coral.cycle_times[index]
-                for index in (
-                    match.score_coral.successful_index
-                    & match.score_coral.stack_l1_index
-                    - match.score_coral.auto_index
-                    - match.score_coral.defended_index
+                for index in iter_mask(
+                    match.score_coral.successful_mask
+                    & match.score_coral.stack_l1_mask
+                    & ~match.score_coral.auto_mask
+                    & ~match.score_coral.defended_mask
                 )
             ]
         )
@@ -708,7 +1033,7 @@ def _calculate_manual_coral_statistics(
         if (coral_source_loading_station_cnt + coral_source_ground_cnt)
         else 0
     )
-    team_stat.coral_source_station_percentage = (
+    team_stat.coral_source_station_percentage.value = (
         coral_source_loading_station_cnt
         / (coral_source_loading_station_cnt + coral_source_ground_cnt)
         if (coral_source_loading_station_cnt + coral_source_ground_cnt)
@@ -741,39 +1066,39 @@ def _calculate_manual_algae_statistics(
         scrape_cnt.append(match.intake_algae.teleop_scrape_cnt)
         pickup_cnt.append(match.intake_algae.teleop_reef_cnt)
         cycle_success_cnt.append(
-            len(match.score_algae.success_index - match.score_algae.auto_index)
+            popcount(match.score_algae.success_mask & ~match.score_algae.auto_mask)
         )
         front_cnt += match.intake_algae.teleop_ground_front_cnt
         middle_cnt += match.intake_algae.teleop_ground_middle_cnt
         back_cnt += match.intake_algae.teleop_ground_back_cnt
         reef_cnt += match.intake_algae.teleop_reef_cnt
-        shoot_net_cnt += len(match.score_algae.shoot_net_index)
-        place_net_cnt += len(match.score_algae.place_net_index)
-        shoot_net_success_cnt += len(
-            match.score_algae.success_index & match.score_algae.shoot_net_index
+        shoot_net_cnt += popcount(match.score_algae.shoot_net_mask)
+        place_net_cnt += popcount(match.score_algae.place_net_mask)
+        shoot_net_success_cnt += popcount(
+            match.score_algae.success_mask & match.score_algae.shoot_net_mask
         )
-        place_net_success_cnt += len(
-            match.score_algae.success_index & match.score_algae.place_net_index
+        place_net_success_cnt += popcount(
+            match.score_algae.success_mask & match.score_algae.place_net_mask
         )
         net_success_undefended_cycle_times.append(
             [
                 match.score_algae.cycle_times[index]
-                for index in (
-                    match.score_algae.success_index
+                for index in iter_mask(
+                    match.score_algae.success_mask
                     & (
-                        match.score_algae.place_net_index
-                        | match.score_algae.shoot_net_index
+                        match.score_algae.place_net_mask
+                        | match.score_algae.shoot_net_mask
                     )
-                    - match.score_algae.defended_index
+                    & ~match.score_algae.defended_mask
                 )
             ]
         )
-        tactical_cnt.append(len(match.score_algae.tactical_index))
-        if match.score_algae.last_sec_processor_index & match.score_algae.success_index:
+        tactical_cnt.append(popcount(match.score_algae.tactical_mask))
+        if match.score_algae.last_sec_processor_mask & match.score_algae.success_mask:
             last_second_processor_matchnos.append(match.match_no)
             last_second_processor_tournament_levels.append(match.tournament_level)
-        if len(match.score_algae.processor_index) > max_processor_cnt:
-            max_processor_cnt = len(match.score_algae.processor_index)
+        if popcount(match.score_algae.processor_mask) > max_processor_cnt:
+            max_processor_cnt = popcount(match.score_algae.processor_mask)
             max_processor_matchnos = match.match_no
             max_processor_tournament_levels = match.tournament_level
     # 展平嵌套列表
@@ -862,27 +1187,28 @@ def _calculate_defense_resistance_statistics(
 
     for match in matches:
         # 计算手动阶段的筒统计
-        teleop_indices = (
-            set(range(len(match.score_coral.cycle_times)))
-            - match.score_coral.auto_index
-        )
-        teleop_success_indices = teleop_indices & match.score_coral.successful_index
-        teleop_defended_indices = teleop_indices & match.score_coral.defended_index
-        teleop_undefended_indices = teleop_indices - match.score_coral.defended_index
-
-        total_successful_coral_cycles += len(teleop_success_indices)
-        defended_coral_cycles += len(teleop_defended_indices)
-        undefended_coral_cycles += len(teleop_undefended_indices)
-        defended_count = len(teleop_defended_indices)
+        teleop_mask = (
+            (1 << len(match.score_coral.cycle_times)) - 1
+        ) & ~match.score_coral.auto_mask
+        teleop_success_mask = teleop_mask & match.score_coral.successful_mask
+        teleop_defended_mask = teleop_mask & match.score_coral.defended_mask
+        teleop_undefended_mask = teleop_mask & ~match.score_coral.defended_mask
+
+        total_successful_coral_cycles += popcount(teleop_success_mask)
+        defended_coral_cycles += popcount(teleop_defended_mask)
+        undefended_coral_cycles += popcount(teleop_undefended_mask)
+        defended_count = popcount(teleop_defended_mask)
 
         defended_counts_by_match.append(defended_count)
 
         # 修复：收集cycle时间时，附带比赛信息
-        for idx in teleop_defended_indices & match.score_coral.successful_index:
+        for idx in iter_mask(teleop_defended_mask & match.score_coral.successful_mask):
             cycle_time = match.score_coral.cycle_times[idx]
             defended_cycle_times_with_match.append((cycle_time, match))
 
-        for idx in teleop_undefended_indices & match.score_coral.successful_index:
+        for idx in iter_mask(
+            teleop_undefended_mask & match.score_coral.successful_mask
+        ):
             undefended_cycle_times.append(match.score_coral.cycle_times[idx])
 
     # 计算被防守百分比
@@ -959,8 +1285,12 @@ def _calculate_defense_resistance_statistics(
         )
 
 
-def _calculate_all_rankings(team_statistics: List[TeamStatistics]) -> None:
-    """计算所有需要排名的字段"""
+@stage_metrics.timed("rankings")
+def _calculate_all_rankings(
+    team_statistics: List[TeamStatistics], sections: Optional[Iterable[str]] = None
+) -> None:
+    """计算所有需要排名的字段，指定 sections 时只排名这些统计板块的字段"""
+    sections = ALL_SECTIONS if sections is None else frozenset(sections)
     # 需要排名的字段列表 (字段名, 是否降序)
     ranking_fields_dict = defaultdict(bool)
     ranking_fields_dict.update(
@@ -1031,12 +1361,22 @@ def _calculate_all_rankings(team_statistics: List[TeamStatistics]) -> None:
             "auto_preload_coral_percentage": True,
         }
     )
+    # 优先一次性计算所有字段的排名
+    rank_fields = {
+        field.name: ranking_fields_dict[field.name]
+        for field in fields(TeamStatistics)
+        if field.type in [RankValue, RankValueMatch]
+        and FIELD_SECTIONS.get(field.name) in sections
+    }
+    if calculate_all_ranks_vectorized(team_statistics, rank_fields):
+        return
+
     # 计算每个字段的排名
     for field in fields(TeamStatistics):
         try:
 
             field_name = field.name
-            if field.type in [RankValue, RankValueMatch]:
+            if field_name in rank_fields:
                 descending = ranking_fields_dict[field_name]
                 calculate_rank_data(team_statistics, field_name, descending)
 
@@ -147,77 +147,48 @@ def process_cycle_statistics(
         if time_slice.get("type") == "score coral":
             match_statistics.score_coral.cycle_times.append(time_slice.get("duration"))
             match_statistics.score_coral.faces.append(time_slice.get("face"))
+            # 当前cycle在位掩码中对应的位
+            cycle_bit = 1 << (len(match_statistics.score_coral.cycle_times) - 1)
             if time_slice.get("success"):
-                match_statistics.score_coral.successful_index.add(
-                    len(match_statistics.score_coral.cycle_times) - 1
-                )
+                match_statistics.score_coral.successful_mask |= cycle_bit
             if time_slice.get("defended"):
-                match_statistics.score_coral.defended_index.add(
-                    len(match_statistics.score_coral.cycle_times) - 1
-                )
+                match_statistics.score_coral.defended_mask |= cycle_bit
             if time_slice.get("score coral type") == "L1":
-                match_statistics.score_coral.l1_index.add(
-                    len(match_statistics.score_coral.cycle_times) - 1
-                )
+                match_statistics.score_coral.l1_mask |= cycle_bit
             elif time_slice.get("score coral type") == "L2":
-                match_statistics.score_coral.l2_index.add(
-                    len(match_statistics.score_coral.cycle_times) - 1
-                )
+                match_statistics.score_coral.l2_mask |= cycle_bit
             elif time_slice.get("score coral type") == "L3":
-                match_statistics.score_coral.l3_index.add(
-                    len(match_statistics.score_coral.cycle_times) - 1
-                )
+                match_statistics.score_coral.l3_mask |= cycle_bit
             elif time_slice.get("score coral type") == "L4":
-                match_statistics.score_coral.l4_index.add(
-                    len(match_statistics.score_coral.cycle_times) - 1
-                )
+                match_statistics.score_coral.l4_mask |= cycle_bit
             elif time_slice.get("score coral type") == "Stack L1":
-                match_statistics.score_coral.stack_l1_index.add(
-                    len(match_statistics.score_coral.cycle_times) - 1
-                )
+                match_statistics.score_coral.stack_l1_mask |= cycle_bit
             else:
                 raise ValueError(
                     f"Unknown score coral type: {time_slice.get('score coral type')}"
                 )
             if time_slice.get("timestamp") < 15000:
-                match_statistics.score_coral.auto_index.add(
-                    len(match_statistics.score_coral.cycle_times) - 1
-                )
+                match_statistics.score_coral.auto_mask |= cycle_bit
 
         elif time_slice.get("type") == "score algae":
             match_statistics.score_algae.cycle_times.append(time_slice.get("duration"))
+            cycle_bit = 1 << (len(match_statistics.score_algae.cycle_times) - 1)
             if time_slice.get("success"):
-                match_statistics.score_algae.success_index.add(
-                    len(match_statistics.score_algae.cycle_times) - 1
-                )
+                match_statistics.score_algae.success_mask |= cycle_bit
             if time_slice.get("defended"):
-                match_statistics.score_algae.defended_index.add(
-                    len(match_statistics.score_algae.cycle_times) - 1
-                )
+                match_statistics.score_algae.defended_mask |= cycle_bit
             if time_slice.get("timestamp") < 15000:
-                match_statistics.score_algae.auto_index.add(
-                    len(match_statistics.score_algae.cycle_times) - 1
-                )
+                match_statistics.score_algae.auto_mask |= cycle_bit
             if time_slice.get("score algae type") == "net":
-                match_statistics.score_algae.place_net_index.add(
-                    len(match_statistics.score_algae.cycle_times) - 1
-                )
+                match_statistics.score_algae.place_net_mask |= cycle_bit
             elif time_slice.get("score algae type") == "shooting":
-                match_statistics.score_algae.shoot_net_index.add(
-                    len(match_statistics.score_algae.cycle_times) - 1
-                )
+                match_statistics.score_algae.shoot_net_mask |= cycle_bit
             elif time_slice.get("score algae type") == "processor":
-                match_statistics.score_algae.processor_index.add(
-                    len(match_statistics.score_algae.cycle_times) - 1
-                )
+                match_statistics.score_algae.processor_mask |= cycle_bit
                 if time_slice.get("timestamp") > 144000:
-                    match_statistics.score_algae.last_sec_processor_index.add(
-                        len(match_statistics.score_algae.cycle_times) - 1
-                    )
+                    match_statistics.score_algae.last_sec_processor_mask |= cycle_bit
             elif time_slice.get("score algae type") == "tactical":
-                match_statistics.score_algae.tactical_index.add(
-                    len(match_statistics.score_algae.cycle_times) - 1
-                )
+                match_statistics.score_algae.tactical_mask |= cycle_bit
             else:
                 raise ValueError(
                     f"Unknown score algae type: {time_slice.get('score algae type')}"
@@ -0,0 +1,107 @@
+"""
+启动时补算尚未处理的原始比赛记录
+
+用集合差找出 raw 目录中有、processed 目录中没有的文件，
+再把单文件分析分发到进程池中并行执行。每个文件独立处理，
+单个文件出错只记录日志，不影响其余文件。
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+from backend.schema import serialization
+from backend.service.analyze_single_file import (
+    calculate_single_match_record_statistics,
+)
+
+logger = logging.getLogger(__name__)
+
+# 待处理文件少于该数量时直接在当前进程处理，省去启动进程池的开销
+MIN_FILES_FOR_POOL = 16
+
+
+def find_unprocessed_files(raw_dir: str, processed_dir: str) -> List[str]:
+    """返回 raw 目录中尚未生成处理后文件的文件名（按文件名排序）"""
+    raw_files = {f for f in os.listdir(raw_dir) if f.endswith(".json")}
+    processed_files = {f for f in os.listdir(processed_dir) if f.endswith(".json")}
+    return sorted(raw_files - processed_files)
+
+
+def process_raw_file(raw_dir: str, processed_dir: str, filename: str) -> Optional[str]:
+    """
+    分析单个原始文件并写入处理后文件
+
+    Returns:
+        出错时返回错误信息，成功返回None
+    """
+    try:
+        data = serialization.load_file(os.path.join(raw_dir, filename))
+        match_statistics = calculate_single_match_record_statistics(data)
+        match_statistics.save_to_json_file(os.path.join(processed_dir, filename))
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def backfill_processed_files(
+    raw_dir: str, processed_dir: str, max_workers: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    补算所有尚未处理的原始文件
+
+    Args:
+        raw_dir: 原始数据目录
+        processed_dir: 处理后数据目录
+        max_workers: 进程数，默认为CPU核数
+
+    Returns:
+        (成功数, 失败数)
+    """
+    filenames = find_unprocessed_files(raw_dir, processed_dir)
+    total = len(filenames)
+    if total == 0:
+        return 0, 0
+
+    max_workers = max_workers or os.cpu_count() or 1
+    logger.info(f"发现 {total} 个未处理的比赛记录，开始补算")
+    start = time.time()
+    succeeded = 0
+    failed = 0
+    # 大约每完成10%输出一次进度
+    report_every = max(1, total // 10)
+
+    def on_result(filename: str, error: Optional[str]) -> None:
+        nonlocal succeeded, failed
+        if error is None:
+            succeeded += 1
+        else:
+            failed += 1
+            logger.error(f"处理比赛记录 {filename} 时出错: {error}")
+        done = succeeded + failed
+        if done % report_every == 0 or done == total:
+            logger.info(f"补算进度: {done}/{total} ({done * 100 // total}%)")
+
+    if max_workers <= 1 or total < MIN_FILES_FOR_POOL:
+        for filename in filenames:
+            on_result(filename, process_raw_file(raw_dir, processed_dir, filename))
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, total)) as executor:
+            futures = {
+                executor.submit(process_raw_file, raw_dir, processed_dir, f): f
+                for f in filenames
+            }
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    error = future.result()
+                except Exception as e:
+                    # 子进程异常退出等情况
+                    error = str(e)
+                on_result(filename, error)
+
+    logger.info(
+        f"补算完成: 成功 {succeeded} 个，失败 {failed} 个，耗时 {time.time() - start:.2f} 秒"
+    )
+    return succeeded, failed
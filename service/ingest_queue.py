@@ -0,0 +1,148 @@
+"""
+比赛记录的异步分析队列
+
+上传接口只负责校验并落盘原始文件，分析和写入处理后文件交给后台工作线程，
+请求无需等待分析完成即可返回。队列有容量上限，满时由调用方自行同步处理。
+"""
+
+import time
+import uuid
+import queue
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestJob:
+    """一条后台分析任务"""
+
+    job_id: str
+    filename: str
+    payload: Any = field(default=None, repr=False)
+    status: str = "queued"  # queued / processing / done / failed
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式（不包含原始数据）"""
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class IngestQueue:
+    """有界队列 + 后台工作线程"""
+
+    def __init__(
+        self,
+        process_func: Callable[[IngestJob], None],
+        max_size: int = 256,
+        workers: int = 1,
+        max_retained_jobs: int = 1000,
+    ):
+        self.process_func = process_func
+        self.max_size = max_size
+        self.workers = workers
+        self.max_retained_jobs = max_retained_jobs
+        self._queue: "queue.Queue[IngestJob]" = queue.Queue(maxsize=max_size)
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.last_wait_seconds = 0.0
+        self.last_processing_seconds = 0.0
+
+    def submit(self, filename: str, payload: Any) -> Optional[IngestJob]:
+        """提交任务，队列已满时返回None"""
+        self._ensure_started()
+        job = IngestJob(job_id=uuid.uuid4().hex, filename=filename, payload=payload)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.job_id, None)
+            return None
+        with self._lock:
+            while len(self._jobs) > self.max_retained_jobs:
+                self._jobs.popitem(last=False)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestJob]:
+        """按任务ID获取任务"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """队列深度与处理延迟"""
+        now = time.time()
+        with self._lock:
+            pending = [job for job in self._jobs.values() if job.status == "queued"]
+            processing = sum(
+                1 for job in self._jobs.values() if job.status == "processing"
+            )
+            oldest_pending = min((job.submitted_at for job in pending), default=None)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_size": self.max_size,
+                "processing": processing,
+                "completed": self.completed,
+                "failed": self.failed,
+                "oldest_pending_seconds": (
+                    now - oldest_pending if oldest_pending is not None else 0.0
+                ),
+                "last_wait_seconds": self.last_wait_seconds,
+                "last_processing_seconds": self.last_processing_seconds,
+            }
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker, name=f"ingest-worker-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            job.status = "processing"
+            job.started_at = time.time()
+            try:
+                self.process_func(job)
+                job.status = "done"
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                logger.error(f"后台分析比赛记录 {job.filename} 失败: {str(e)}")
+            finally:
+                job.finished_at = time.time()
+                job.payload = None
+                with self._lock:
+                    if job.status == "done":
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    self.last_wait_seconds = job.started_at - job.submitted_at
+                    self.last_processing_seconds = job.finished_at - job.started_at
+                self._queue.task_done()
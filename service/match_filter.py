@@ -0,0 +1,205 @@
+"""
+比赛过滤条件的编译
+
+把比赛等级列表、场次范围表达式（如 "1-7,9-11,15"）和可选的最近场次窗口
+编译为不可变的 MatchFilter，其中场次范围合并为有序、互不重叠的区间。
+MatchFilter 可哈希，在各级缓存中直接用作键；MatchStore 按它为当前数据集
+预先计算布尔掩码，过滤时只需按掩码取出比赛。
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, FrozenSet, Iterable, List, Optional, Tuple
+
+# 闭区间 (起始场次, 结束场次)
+MatchRange = Tuple[int, int]
+
+# 比赛等级的先后（未知等级排在最前），文件列表和最近场次窗口都按此排序
+TOURNAMENT_LEVEL_ORDER = {"Practice": 1, "Qualification": 2, "Playoff": 3}
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def match_order_key(tournament_level: str, match_no: Any, timestamp: Any) -> tuple:
+    """比赛的先后顺序：比赛等级、场次号、时间戳"""
+    return (
+        TOURNAMENT_LEVEL_ORDER.get(tournament_level, 0),
+        _to_int(match_no),
+        _to_int(timestamp),
+    )
+
+
+def _recency_key(match_stat) -> tuple:
+    return match_order_key(
+        match_stat.tournament_level, match_stat.match_no, match_stat.timestamp
+    )
+
+
+def _parse_match_no(text: str, part: str) -> int:
+    if not text.isdecimal():
+        raise ValueError(f"无效的场次范围: {part}")
+    return int(text)
+
+
+def _merge_ranges(ranges: Iterable[MatchRange]) -> Tuple[MatchRange, ...]:
+    """排序并合并重叠或相邻的区间"""
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return tuple((start, end) for start, end in merged)
+
+
+def parse_match_ranges(expression: str) -> Tuple[MatchRange, ...]:
+    """
+    解析场次范围表达式，如 "1-7,9-11,15" -> ((1, 7), (9, 11), (15, 15))
+
+    空白和空项被忽略，格式错误时抛出 ValueError
+    """
+    ranges = []
+    for part in expression.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        start = _parse_match_no(start.strip(), part)
+        end = _parse_match_no(end.strip(), part) if sep else start
+        if start > end:
+            raise ValueError(f"场次范围的起点大于终点: {part}")
+        ranges.append((start, end))
+    return _merge_ranges(ranges)
+
+
+def format_match_ranges(ranges: Iterable[MatchRange]) -> str:
+    """区间格式化为范围表达式，parse_match_ranges 的逆操作"""
+    return ",".join(
+        str(start) if start == end else f"{start}-{end}" for start, end in ranges
+    )
+
+
+@dataclass(frozen=True)
+class MatchFilter:
+    """
+    编译后的过滤条件，空的等级或场次范围表示不按该项过滤
+
+    window 不为 None 时，每支队伍只取满足等级和场次范围的比赛中最近的 window 场
+    """
+
+    tournament_levels: Tuple[str, ...] = ()
+    match_ranges: Tuple[MatchRange, ...] = ()
+    window: Optional[int] = None
+    _level_set: FrozenSet[str] = field(
+        init=False, repr=False, compare=False, default=frozenset()
+    )
+    _range_starts: Tuple[int, ...] = field(
+        init=False, repr=False, compare=False, default=()
+    )
+
+    def __post_init__(self):
+        object.__setattr__(self, "_level_set", frozenset(self.tournament_levels))
+        object.__setattr__(
+            self, "_range_starts", tuple(start for start, _ in self.match_ranges)
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        """是否不过滤任何比赛"""
+        return (
+            not self.tournament_levels
+            and not self.match_ranges
+            and self.window is None
+        )
+
+    @property
+    def match_range_expression(self) -> str:
+        return format_match_ranges(self.match_ranges)
+
+    def includes_match_no(self, match_no: Any) -> bool:
+        """
+        场次号是否在场次范围内（没有场次范围时总是成立）
+
+        上传记录中的场次号可能是字符串，按整数比较；无法转换为整数的场次号
+        不在任何范围内，与 SQLite 索引中保存为 NULL 的行为一致
+        """
+        if not self.match_ranges:
+            return True
+        try:
+            match_no = int(match_no)
+        except (TypeError, ValueError):
+            return False
+        index = bisect_right(self._range_starts, match_no) - 1
+        return index >= 0 and match_no <= self.match_ranges[index][1]
+
+    def includes(self, match_stat) -> bool:
+        """比赛是否满足等级和场次范围条件（不考虑 window）"""
+        if self._level_set and match_stat.tournament_level not in self._level_set:
+            return False
+        return self.includes_match_no(match_stat.match_no)
+
+    def select(self, matches: List[Any]) -> List[Any]:
+        """
+        选出满足过滤条件的比赛，保持原顺序
+
+        有 window 时按队伍分组，每支队伍只保留按比赛等级、场次号排序后最近的
+        window 场，因此只需传入相关队伍的全部比赛
+        """
+        selected = [match_stat for match_stat in matches if self.includes(match_stat)]
+        if self.window is None:
+            return selected
+        return recent_matches(selected, self.window)
+
+    def mask(self, matches: List[Any]) -> bytes:
+        """与 matches 等长的布尔掩码，选中的比赛为 1"""
+        if self.window is None:
+            return bytes(self.includes(match_stat) for match_stat in matches)
+        selected = {id(match_stat) for match_stat in self.select(matches)}
+        return bytes(id(match_stat) in selected for match_stat in matches)
+
+
+def recent_matches(matches: List[Any], window: int) -> List[Any]:
+    """每支队伍最近的 window 场比赛，保持原顺序"""
+    teams_matches = defaultdict(list)
+    for match_stat in matches:
+        teams_matches[match_stat.team_no].append(match_stat)
+    kept = set()
+    for team_matches in teams_matches.values():
+        if len(team_matches) > window:
+            team_matches = sorted(team_matches, key=_recency_key)[-window:]
+        kept.update(id(match_stat) for match_stat in team_matches)
+    return [match_stat for match_stat in matches if id(match_stat) in kept]
+
+
+NO_FILTER = MatchFilter()
+
+
+def compile_filter(
+    tournament_levels: Iterable[str] = (),
+    match_range: Optional[str] = None,
+    match_nos: Iterable[Any] = (),
+    window: Optional[int] = None,
+) -> MatchFilter:
+    """
+    由请求参数编译过滤条件
+
+    match_range 为范围表达式；match_nos 为单个场次号的列表（旧的参数形式），
+    两者可同时给出，取并集；window 为每支队伍最近的场次数。
+    格式错误时抛出 ValueError
+    """
+    if window is not None and window < 1:
+        raise ValueError("window 必须为正整数")
+    levels = tuple(sorted({str(level).strip() for level in tournament_levels} - {""}))
+    ranges = list(parse_match_ranges(match_range)) if match_range else []
+    for match_no in match_nos:
+        text = str(match_no).strip()
+        if text:
+            match_no = _parse_match_no(text, text)
+            ranges.append((match_no, match_no))
+    return MatchFilter(levels, _merge_ranges(ranges), window)
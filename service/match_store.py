@@ -0,0 +1,333 @@
+"""
+常驻内存的比赛统计数据存储
+
+启动时从 processed 目录加载一次所有 MatchStatistics，之后上传、移入回收站、
+从回收站恢复等操作都在内存中原地更新，读接口不再访问磁盘。
+可选地挂接 SQLite 存储后端，此时数据同步写入数据库；否则可挂接压缩快照，
+启动时从单个快照文件顺序读取，而不是逐个打开小文件（每个文件只需一次 stat，
+修改时间或大小与快照记录不一致的文件重新读取）。
+过滤查询按编译后的 MatchFilter 在当前数据集上预先计算布尔掩码并缓存，
+同一过滤条件之后的查询只需按掩码取出比赛，数据变化后掩码随之失效。
+挂接 SQLite 时，掩码中的比赛等级和场次区间条件以索引查询执行。
+"""
+
+import os
+import hashlib
+import threading
+import logging
+from itertools import compress
+from typing import Callable, Dict, List, Optional, Tuple
+from backend.schema import serialization
+from backend.schema.match_statistics_schema import MatchStatistics
+from backend.service.sqlite_store import SQLiteMatchIndex
+from backend.service.processed_snapshot import FileStat, ProcessedSnapshot, file_stat
+from backend.service.match_filter import MatchFilter, recent_matches
+from backend.service.metrics import stage_metrics
+
+logger = logging.getLogger(__name__)
+
+# 变更监听器: (旧版本号, 新版本号, 变更涉及的比赛统计数据；None 表示整体重新加载)
+StoreListener = Callable[[int, int, Optional[List[MatchStatistics]]], None]
+
+# 每个数据集版本最多缓存的过滤掩码数
+MAX_FILTER_MASKS = 64
+
+
+def content_hash(match_statistics: MatchStatistics) -> str:
+    """比赛统计数据内容的哈希（与JSON实现无关），同名文件被改写后随之变化"""
+    data = serialization.dumps_bytes(
+        match_statistics.to_dict(), sort_keys=True, backend="json"
+    )
+    return hashlib.sha1(data).hexdigest()
+
+
+class MatchStore:
+    """进程级的比赛统计数据存储，以文件名为键"""
+
+    def __init__(
+        self,
+        processed_dir: str,
+        index: Optional[SQLiteMatchIndex] = None,
+        snapshot: Optional[ProcessedSnapshot] = None,
+    ):
+        self.processed_dir = processed_dir
+        self.index = index
+        self.snapshot = snapshot
+        self._matches: Dict[str, MatchStatistics] = {}
+        self._sorted_matches: Optional[List[MatchStatistics]] = None
+        # 当前版本下各过滤条件在 get_all 顺序上的布尔掩码
+        self._filter_masks: Dict[MatchFilter, bytes] = {}
+        # 文件名 -> 内容哈希，按需计算，数据变化时丢弃
+        self._content_hashes: Dict[str, str] = {}
+        # 挂接快照时，文件名 -> 读取或写入该记录时的文件状态，压缩快照时一并保存
+        self._file_stats: Dict[str, Optional[FileStat]] = {}
+        self._loaded = False
+        self._version = 0
+        self._listeners: List[StoreListener] = []
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        """数据集版本号，每次增删都会递增"""
+        return self._version
+
+    def subscribe(self, listener: StoreListener) -> None:
+        """注册变更监听器，监听器在存储锁内按变更顺序被调用"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    @stage_metrics.timed("load")
+    def load(self) -> None:
+        """加载所有比赛统计数据（覆盖当前内容）"""
+        file_stats = {}
+        if self.index is not None:
+            # 先与 processed 目录对齐（首次启用时相当于整体导入）
+            self.index.sync_with_dir(self.processed_dir)
+            matches = self.index.load_all()
+        elif self.snapshot is not None:
+            matches, file_stats = self._load_from_snapshot()
+        else:
+            processed_files = sorted(
+                f for f in os.listdir(self.processed_dir) if f.endswith(".json")
+            )
+            matches = {}
+            for filename in processed_files:
+                match_stat = self._read_file(filename)
+                if match_stat is not None:
+                    matches[filename] = match_stat
+
+        with self._lock:
+            self._matches = matches
+            self._content_hashes = {}
+            self._file_stats = file_stats
+            self._loaded = True
+            self._changed(None)
+        logger.info(f"已加载 {len(matches)} 条比赛统计数据到内存")
+
+    def _load_from_snapshot(
+        self,
+    ) -> Tuple[Dict[str, MatchStatistics], Dict[str, Optional[FileStat]]]:
+        """
+        从压缩快照加载，并与 processed 目录对齐
+
+        快照中的记录只在对应文件的修改时间和大小与记录时一致时使用，
+        其余文件（快照中没有或已被改写）单独读取
+
+        Returns:
+            (文件名 -> MatchStatistics, 文件名 -> 文件状态)
+        """
+        snapshot_data, snapshot_stats = self.snapshot.load()
+        processed_files = sorted(
+            f for f in os.listdir(self.processed_dir) if f.endswith(".json")
+        )
+        matches = {}
+        file_stats = {}
+        missing_count = 0
+        changed_count = 0
+        for filename in processed_files:
+            # 先取状态再读取，读取期间被改写的文件下次启动时会再次读取
+            stat = file_stat(os.path.join(self.processed_dir, filename))
+            data = snapshot_data.get(filename)
+            if data is not None and stat is not None:
+                if snapshot_stats.get(filename) == stat:
+                    try:
+                        matches[filename] = MatchStatistics.from_file_data(
+                            data, filename
+                        )
+                        file_stats[filename] = stat
+                        continue
+                    except Exception as e:
+                        logger.error(f"读取快照记录 {filename} 时出错: {str(e)}")
+                changed_count += 1
+            else:
+                missing_count += 1
+            # 快照中没有或已被改写的文件单独读取
+            match_stat = self._read_file(filename)
+            if match_stat is not None:
+                matches[filename] = match_stat
+                file_stats[filename] = stat
+
+        stale_count = len(snapshot_data.keys() - set(processed_files))
+        if missing_count or changed_count or stale_count:
+            logger.info(
+                f"快照与processed目录不一致（缺少 {missing_count} 条，"
+                f"改写 {changed_count} 条，多余 {stale_count} 条），重新压缩快照"
+            )
+            self.snapshot.compact(matches, file_stats)
+        return matches, file_stats
+
+    def compact_snapshot(self) -> None:
+        """把追加日志压缩进快照文件，没有新日志时跳过"""
+        if self.snapshot is None or self.snapshot.pending == 0:
+            return
+        with self._lock:
+            matches = dict(self._matches)
+            file_stats = dict(self._file_stats)
+            log_position = self.snapshot.pending
+        self.snapshot.compact(matches, file_stats, log_position)
+
+    def ensure_loaded(self) -> None:
+        """首次访问时加载数据"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load()
+
+    def get_all(self) -> List[MatchStatistics]:
+        """获取所有比赛统计数据，按文件名排序（调用方不应修改返回的列表）"""
+        self.ensure_loaded()
+        with self._lock:
+            if self._sorted_matches is None:
+                self._sorted_matches = [
+                    self._matches[filename] for filename in sorted(self._matches)
+                ]
+            return self._sorted_matches
+
+    def items(self) -> List[Tuple[str, MatchStatistics]]:
+        """所有 (文件名, 比赛统计数据)，顺序与 get_all 一致"""
+        return self.versioned_items()[1]
+
+    def versioned_items(self) -> Tuple[int, List[Tuple[str, MatchStatistics]]]:
+        """当前数据集版本号及该版本下的 items()"""
+        self.ensure_loaded()
+        with self._lock:
+            return self._version, [
+                (filename, self._matches[filename])
+                for filename in sorted(self._matches)
+            ]
+
+    @stage_metrics.timed("filter")
+    def query(self, match_filter: MatchFilter) -> List[MatchStatistics]:
+        """获取满足过滤条件的比赛统计数据，顺序与 get_all 一致"""
+        self.ensure_loaded()
+        with self._lock:
+            matches = self.get_all()
+            if match_filter.is_empty:
+                return list(matches)
+            mask = self._filter_masks.get(match_filter)
+            if mask is None:
+                mask = self._build_mask(match_filter, matches)
+                if len(self._filter_masks) >= MAX_FILTER_MASKS:
+                    self._filter_masks.clear()
+                self._filter_masks[match_filter] = mask
+            return list(compress(matches, mask))
+
+    def _build_mask(
+        self, match_filter: MatchFilter, matches: List[MatchStatistics]
+    ) -> bytes:
+        """过滤条件在 get_all 顺序上的布尔掩码（调用方需持有锁）"""
+        if self.index is None or (
+            not match_filter.tournament_levels and not match_filter.match_ranges
+        ):
+            return match_filter.mask(matches)
+        # 比赛等级和场次区间以索引查询执行，window 再在查询结果上选择
+        hits = set(
+            self.index.query_filenames(
+                match_filter.tournament_levels, match_filter.match_ranges
+            )
+        )
+        selected = [
+            match_stat
+            for filename, match_stat in zip(sorted(self._matches), matches)
+            if filename in hits
+        ]
+        if match_filter.window is not None:
+            selected = recent_matches(selected, match_filter.window)
+        selected_ids = {id(match_stat) for match_stat in selected}
+        return bytes(id(match_stat) in selected_ids for match_stat in matches)
+
+    def get_team_matches(self, team_no: int) -> List[MatchStatistics]:
+        """获取指定队伍的所有比赛统计数据，顺序与 get_all 一致"""
+        return [
+            match_stat for match_stat in self.get_all() if match_stat.team_no == team_no
+        ]
+
+    def get(self, filename: str) -> Optional[MatchStatistics]:
+        """按文件名获取比赛统计数据"""
+        self.ensure_loaded()
+        with self._lock:
+            return self._matches.get(filename)
+
+    def catalog(self) -> Tuple[int, Dict[str, List]]:
+        """当前数据集版本及文件目录（文件名 -> [队伍号, 内容哈希]）"""
+        self.ensure_loaded()
+        with self._lock:
+            catalog = {}
+            for filename, match_stat in self._matches.items():
+                digest = self._content_hashes.get(filename)
+                if digest is None:
+                    digest = self._content_hashes[filename] = content_hash(match_stat)
+                catalog[filename] = [match_stat.team_no, digest]
+            return self._version, catalog
+
+    def add(self, filename: str, match_statistics: MatchStatistics) -> None:
+        """添加或替换一条比赛统计数据"""
+        self.add_many([(filename, match_statistics)])
+
+    def add_many(self, items: List[Tuple[str, MatchStatistics]]) -> None:
+        """批量添加或替换比赛统计数据，版本号只递增一次"""
+        if not items:
+            return
+        self.ensure_loaded()
+        with self._lock:
+            changed = []
+            for filename, match_statistics in items:
+                if self.index is not None or self.snapshot is not None:
+                    # 文件已由调用方写入，记录其当前状态
+                    stat = file_stat(os.path.join(self.processed_dir, filename))
+                if self.index is not None:
+                    self.index.upsert(filename, match_statistics, stat)
+                elif self.snapshot is not None:
+                    self.snapshot.append_add(filename, match_statistics, stat)
+                    self._file_stats[filename] = stat
+                old_match_stat = self._matches.get(filename)
+                self._matches[filename] = match_statistics
+                self._content_hashes.pop(filename, None)
+                changed.append(match_statistics)
+                if old_match_stat is not None:
+                    changed.append(old_match_stat)
+            self._changed(changed)
+
+    def add_from_file(self, filename: str) -> Optional[MatchStatistics]:
+        """从 processed 目录读取指定文件并加入存储"""
+        match_stat = self._read_file(filename)
+        if match_stat is not None:
+            self.add(filename, match_stat)
+        return match_stat
+
+    def remove(self, filename: str) -> Optional[MatchStatistics]:
+        """移除一条比赛统计数据，不存在时忽略"""
+        self.ensure_loaded()
+        with self._lock:
+            match_stat = self._matches.pop(filename, None)
+            self._content_hashes.pop(filename, None)
+            self._file_stats.pop(filename, None)
+            if self.index is not None:
+                self.index.delete(filename)
+            elif self.snapshot is not None and match_stat is not None:
+                self.snapshot.append_remove(filename)
+            if match_stat is not None:
+                self._changed([match_stat])
+            return match_stat
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def _changed(self, changed: Optional[List[MatchStatistics]]) -> None:
+        self._sorted_matches = None
+        self._filter_masks = {}
+        old_version = self._version
+        self._version += 1
+        for listener in self._listeners:
+            try:
+                listener(old_version, self._version, changed)
+            except Exception as e:
+                logger.error(f"比赛数据变更监听器执行失败: {str(e)}")
+
+    def _read_file(self, filename: str) -> Optional[MatchStatistics]:
+        filepath = os.path.join(self.processed_dir, filename)
+        try:
+            return MatchStatistics.from_json_file(filepath)
+        except Exception as e:
+            logger.error(f"读取文件 {filename} 时出错: {str(e)}")
+            return None
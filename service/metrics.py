@@ -0,0 +1,188 @@
+"""
+分阶段的耗时统计
+
+每个请求（或后台任务）开始时在当前线程上开启一次采集，热路径上的各个阶段
+（加载、过滤、单支队伍统计、排名、转换字典、序列化、写文件、分析等）把耗时
+累加到这次采集中，结束时每个阶段记一个样本。每个 (接口, 阶段) 保留最近
+window_size 个样本用于计算滚动分位数，另外累计总次数和总耗时。
+没有开启采集的线程上，每个阶段只多一次线程局部变量的查找。
+"""
+
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# 输出的分位数
+QUANTILES = (0.5, 0.9, 0.99)
+
+# 整个请求（或后台任务）的耗时记为这个阶段
+TOTAL_STAGE = "total"
+
+
+def _percentile(sorted_values: List[float], quantile: float) -> float:
+    """最近秩法的分位数"""
+    index = max(math.ceil(quantile * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Collection:
+    """一次请求中各阶段累计的耗时"""
+
+    __slots__ = ("endpoint", "started", "durations")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = defaultdict(float)
+
+
+class StageMetrics:
+    """按 (接口, 阶段) 记录耗时的滚动窗口"""
+
+    def __init__(self, window_size: int = 1024):
+        self.window_size = window_size
+        self._local = threading.local()
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._sums: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def begin(self, endpoint: str) -> None:
+        """在当前线程上开始一次采集"""
+        self._local.collection = _Collection(endpoint)
+
+    def finish(self) -> Optional[Dict[str, float]]:
+        """结束当前线程的采集并记录样本，返回各阶段耗时（秒）；没有采集时返回None"""
+        collection = getattr(self._local, "collection", None)
+        if collection is None:
+            return None
+        self._local.collection = None
+        durations = dict(collection.durations)
+        durations[TOTAL_STAGE] = time.perf_counter() - collection.started
+        with self._lock:
+            for stage, seconds in durations.items():
+                self._record(collection.endpoint, stage, seconds)
+        return durations
+
+    @contextmanager
+    def collect(self, endpoint: str):
+        """在 with 块内采集（用于后台任务）"""
+        self.begin(endpoint)
+        try:
+            yield
+        finally:
+            self.finish()
+
+    @contextmanager
+    def stage(self, name: str):
+        """把 with 块的耗时累加到当前采集的 name 阶段"""
+        collection = getattr(self._local, "collection", None)
+        if collection is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            collection.durations[name] += time.perf_counter() - started
+
+    def timed(self, name: str) -> Callable:
+        """装饰器：把函数每次调用的耗时累加到当前采集的 name 阶段"""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                collection = getattr(self._local, "collection", None)
+                if collection is None:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    collection.durations[name] += time.perf_counter() - started
+
+            return wrapper
+
+        return decorator
+
+    def record(self, endpoint: str, stage: str, seconds: float) -> None:
+        """直接记录一个样本"""
+        with self._lock:
+            self._record(endpoint, stage, seconds)
+
+    def _record(self, endpoint: str, stage: str, seconds: float) -> None:
+        key = (endpoint, stage)
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window_size)
+        samples.append(seconds)
+        self._counts[key] += 1
+        self._sums[key] += seconds
+
+    def _summaries(self) -> List[Tuple[str, str, int, float, List[float]]]:
+        """(接口, 阶段, 总次数, 总耗时, 排好序的窗口样本)，按接口和阶段排序"""
+        with self._lock:
+            items = [
+                (key, self._counts[key], self._sums[key], list(samples))
+                for key, samples in self._samples.items()
+            ]
+        return [
+            (endpoint, stage, count, total, sorted(samples))
+            for (endpoint, stage), count, total, samples in sorted(items)
+        ]
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """接口 -> 阶段 -> 次数、总耗时和窗口内的分位数（毫秒）"""
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for endpoint, stage, count, total, samples in self._summaries():
+            summary = {
+                "count": count,
+                "sum_ms": total * 1000,
+                "window": len(samples),
+            }
+            for quantile in QUANTILES:
+                summary[f"p{quantile * 100:g}_ms"] = (
+                    _percentile(samples, quantile) * 1000
+                )
+            summary["max_ms"] = samples[-1] * 1000
+            result.setdefault(endpoint, {})[stage] = summary
+        return result
+
+    def to_prometheus(self, name: str = "scouting_stage_duration_seconds") -> str:
+        """Prometheus 文本格式（summary 类型，分位数按最近的窗口计算）"""
+        lines = [
+            f"# HELP {name} 各接口各阶段的耗时（分位数按最近 {self.window_size} 次计算）",
+            f"# TYPE {name} summary",
+        ]
+        for endpoint, stage, count, total, samples in self._summaries():
+            labels = (
+                f'endpoint="{_escape_label(endpoint)}",'
+                f'stage="{_escape_label(stage)}"'
+            )
+            for quantile in QUANTILES:
+                lines.append(
+                    f'{name}{{{labels},quantile="{quantile:g}"}} '
+                    f"{_percentile(samples, quantile):.9g}"
+                )
+            lines.append(f"{name}_sum{{{labels}}} {total:.9g}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """清空所有样本"""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._sums.clear()
+
+
+# 进程内共用的耗时统计，服务层各模块的热路径直接记录到这里
+stage_metrics = StageMetrics()
@@ -0,0 +1,708 @@
+"""
+可合并的队伍统计部分聚合
+
+每场比赛先提取一份可合并的充分统计量（StatisticsPartial）：计数、总和、
+排好序的周期时间（合并后中位数仍然精确），以及带场次的最值。同一队伍同一
+比赛等级的各场预先合并为一份，任意 (比赛等级, 场次范围) 过滤条件下的队伍
+统计只需合并少量部分聚合再换算为 TeamStatistics 字段，不必对原始比赛逐场
+重跑各个统计板块。
+
+与逐场实现的差异：浮点数总和（各项时间、BPS 的周期时间总和）按部分聚合
+分组相加，跨比赛等级合并时的累加顺序与逐场累加不同，结果可能在最后一位
+（1 ulp）上有出入；整数计数、平均值、中位数、最值及其场次都与逐场实现一致。
+"""
+
+import statistics
+import threading
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+from backend.schema.match_statistics_schema import MatchStatistics, popcount, iter_mask
+from backend.schema.team_statistics_schema import (
+    TeamStatistics,
+    create_team_statistics,
+)
+from backend.service.match_filter import MatchFilter, match_order_key
+
+# 带场次的最值: (值, 顺序键, 场次号, 比赛等级)，值相同时取顺序键小（先出现）的
+Extremum = Tuple[float, str, int, str]
+# 场次列表的一项: (顺序键, 场次号, 比赛等级)
+MatchEntry = Tuple[str, int, str]
+
+_CORAL_LEVELS = ("l1", "l2", "l3", "l4", "stack_l1")
+
+# 直接相加的计数和总和
+_SUMS = (
+    "count",
+    "branches",
+    "branch_time",
+    "epas",
+    "ppg_sum",
+    "leave",
+    "preload",
+    "auto_high_mid_success",
+    "auto_high_mid_total",
+    "auto_low_slot_success",
+    "auto_low_slot_total",
+    "coral_ground",
+    "coral_station",
+    "scrape",
+    "pickup",
+    "algae_front",
+    "algae_middle",
+    "algae_back",
+    "algae_reef",
+    "shoot_net",
+    "place_net",
+    "shoot_net_success",
+    "place_net_success",
+    "coral_teleop_success",
+    "coral_defended",
+    "coral_undefended",
+) + tuple(f"{level}_success" for level in _CORAL_LEVELS) + tuple(
+    f"{level}_attempts" for level in _CORAL_LEVELS
+)
+# 从 0.0 开始逐项累加的浮点数总和
+_FLOAT_SUMS = ("coral_time", "algae_time", "defense_time", "give_up_time")
+# 排好序的数值列表，用于中位数
+_SORTED_VALUES = (
+    "park_times",
+    "algae_cycle_counts",
+    "net_undefended_times",
+    "defended_times",
+    "undefended_times",
+) + tuple(f"{level}_undefended_times" for level in _CORAL_LEVELS)
+# 按比赛顺序排列的场次列表
+_MATCH_LISTS = (
+    "climb_success",
+    "climb_fail",
+    "climb_touch_chain",
+    "last_second_processor",
+)
+_MAXIMA = (
+    "ppg_max",
+    "auto_high_mid_max",
+    "auto_low_slot_max",
+    "auto_net_place_max",
+    "auto_algae_process_max",
+    "algae_cycle_max",
+    "tactical_max",
+    "processor_max",
+    "defended_count_max",
+    "defended_time_max",
+)
+_MINIMA = ("climb_time_min",)
+
+
+def _first_max(a: Optional[Extremum], b: Optional[Extremum]) -> Optional[Extremum]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if b[0] > a[0] or (b[0] == a[0] and b[1] < a[1]):
+        return b
+    return a
+
+
+def _first_min(a: Optional[Extremum], b: Optional[Extremum]) -> Optional[Extremum]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if b[0] < a[0] or (b[0] == a[0] and b[1] < a[1]):
+        return b
+    return a
+
+
+def _mean(total: int, count: int):
+    """整数数据的平均值，与 statistics.mean 一致（能整除时返回 int）"""
+    return total // count if total % count == 0 else total / count
+
+
+def _set_extremum(field_obj, extremum: Extremum) -> None:
+    field_obj.value, _, field_obj.match_no, field_obj.tournament_level = extremum
+
+
+class StatisticsPartial:
+    """一场或多场比赛（同一队伍）的可合并统计量"""
+
+    __slots__ = (
+        ("first_order",)
+        + _SUMS
+        + _FLOAT_SUMS
+        + _SORTED_VALUES
+        + _MATCH_LISTS
+        + _MAXIMA
+        + _MINIMA
+    )
+
+    def __init__(self):
+        # 所含比赛中最小的顺序键，决定队伍在结果中的先后
+        self.first_order: Optional[str] = None
+        for name in _SUMS:
+            setattr(self, name, 0)
+        for name in _FLOAT_SUMS:
+            setattr(self, name, 0.0)
+        for name in _SORTED_VALUES + _MATCH_LISTS:
+            setattr(self, name, [])
+        for name in _MAXIMA + _MINIMA:
+            setattr(self, name, None)
+
+    @classmethod
+    def from_match(cls, match: MatchStatistics, order: str) -> "StatisticsPartial":
+        """
+        提取单场比赛的统计量
+
+        order 为比赛的顺序键（与 MatchStore.get_all 的顺序一致），
+        值相同的最值取顺序在前的比赛，与逐场实现的 max()/index() 相同
+        """
+        p = cls()
+        p.first_order = order
+        p.count = 1
+        coral = match.score_coral
+        algae = match.score_algae
+        entry = (order, match.match_no, match.tournament_level)
+
+        def extremum(value) -> Extremum:
+            return (value, order, match.match_no, match.tournament_level)
+
+        # 时间占比
+        p.coral_time = match.get_coral_teleop_time()
+        p.algae_time = match.get_algae_teleop_time()
+        p.defense_time = match.get_defense_total_time()
+        p.give_up_time = match.get_give_up_total_time()
+
+        # 爬升
+        status = match.climb_up.status
+        if status in ["success", "fail", "touch_chain", "park"]:
+            p.park_times = [match.climb_up.time / 1000]
+        if status == "success":
+            p.climb_success = [entry]
+            duration = match.climb_up.duration
+            p.climb_time_min = extremum(duration if duration > 0 else 151)
+        elif status == "failure":
+            p.climb_fail = [entry]
+        elif status == "hit_chain":
+            p.climb_touch_chain = [entry]
+
+        # BPS、EPA、PPG
+        branch_mask = coral.l2_mask | coral.l3_mask | coral.l4_mask
+        p.branches = popcount(coral.successful_mask & branch_mask)
+        p.branch_time = sum(
+            coral.cycle_times[index] for index in iter_mask(branch_mask)
+        )
+        success_auto = coral.successful_mask & coral.auto_mask
+        low_masks = coral.l1_mask | coral.stack_l1_mask
+        p.epas = (
+            match.leave * 3
+            + popcount(success_auto & (coral.l3_mask | coral.l4_mask)) * 2
+            + popcount(success_auto & (low_masks | coral.l2_mask))
+            + popcount(coral.successful_mask & low_masks & ~coral.auto_mask) * 2
+            + popcount(algae.success_mask & algae.processor_mask) * 2
+            + popcount(algae.success_mask & algae.place_net_mask) * 4
+            + popcount(algae.success_mask & algae.shoot_net_mask) * 4
+            + popcount(algae.success_mask & algae.last_sec_processor_mask) * 2
+            + (10 if status == "success" else 0)
+        )
+        points = 3 if match.leave else 0
+        points += popcount(coral.successful_mask & low_masks) * 2 + popcount(
+            success_auto & low_masks
+        )
+        points += popcount(coral.successful_mask & coral.l2_mask) * 3 + popcount(
+            success_auto & coral.l2_mask
+        )
+        points += (
+            popcount(coral.successful_mask & coral.l3_mask) * 4
+            + popcount(success_auto & coral.l3_mask) * 2
+        )
+        points += (
+            popcount(coral.successful_mask & coral.l4_mask) * 5
+            + popcount(success_auto & coral.l4_mask) * 2
+        )
+        points += popcount(algae.success_mask & algae.processor_mask) * 6
+        points += (
+            popcount(algae.success_mask & (algae.place_net_mask | algae.shoot_net_mask))
+            * 4
+        )
+        points += 12 if status == "success" else 0
+        points += 2 if status == "park" else 0
+        p.ppg_sum = points
+        p.ppg_max = extremum(points)
+
+        # 自动阶段
+        p.leave = 1 if match.leave else 0
+        p.preload = 1 if success_auto & 1 else 0
+        high_mid_mask = coral.auto_mask & (coral.l3_mask | coral.l4_mask)
+        p.auto_high_mid_success = popcount(coral.successful_mask & high_mid_mask)
+        p.auto_high_mid_total = popcount(high_mid_mask)
+        if p.auto_high_mid_success > 0:
+            p.auto_high_mid_max = extremum(p.auto_high_mid_success)
+        p.auto_low_slot_success = popcount(success_auto & (low_masks | coral.l2_mask))
+        p.auto_low_slot_total = popcount(coral.auto_mask & low_masks)
+        if p.auto_low_slot_success > 0:
+            p.auto_low_slot_max = extremum(p.auto_low_slot_success)
+        net_mask = algae.place_net_mask | algae.shoot_net_mask
+        auto_net_place = popcount(algae.success_mask & algae.auto_mask & net_mask)
+        if auto_net_place > 0:
+            p.auto_net_place_max = extremum(auto_net_place)
+        algae_process = (
+            match.intake_algae.auto_reef_cnt + match.intake_algae.auto_scrape_cnt
+        )
+        if algae_process > 0:
+            p.auto_algae_process_max = extremum(algae_process)
+
+        # 手动筒
+        p.coral_ground = match.intake_coral.teleop_ground_cnt
+        p.coral_station = match.intake_coral.teleop_load_station_cnt
+        for level in _CORAL_LEVELS:
+            teleop_mask = getattr(coral, f"{level}_mask") & ~coral.auto_mask
+            success_mask = coral.successful_mask & teleop_mask
+            setattr(p, f"{level}_success", popcount(success_mask))
+            setattr(p, f"{level}_attempts", popcount(teleop_mask))
+            setattr(
+                p,
+                f"{level}_undefended_times",
+                sorted(
+                    coral.cycle_times[index]
+                    for index in iter_mask(
+                        success_mask & ~coral.defended_mask
+                    )
+                ),
+            )
+
+        # 手动球
+        p.scrape = match.intake_algae.teleop_scrape_cnt
+        p.pickup = match.intake_algae.teleop_reef_cnt
+        cycle_success = popcount(algae.success_mask & ~algae.auto_mask)
+        p.algae_cycle_counts = [cycle_success]
+        p.algae_cycle_max = extremum(cycle_success)
+        p.algae_front = match.intake_algae.teleop_ground_front_cnt
+        p.algae_middle = match.intake_algae.teleop_ground_middle_cnt
+        p.algae_back = match.intake_algae.teleop_ground_back_cnt
+        p.algae_reef = match.intake_algae.teleop_reef_cnt
+        p.shoot_net = popcount(algae.shoot_net_mask)
+        p.place_net = popcount(algae.place_net_mask)
+        p.shoot_net_success = popcount(algae.success_mask & algae.shoot_net_mask)
+        p.place_net_success = popcount(algae.success_mask & algae.place_net_mask)
+        p.net_undefended_times = sorted(
+            algae.cycle_times[index]
+            for index in iter_mask(algae.success_mask & net_mask & ~algae.defended_mask)
+        )
+        p.tactical_max = extremum(popcount(algae.tactical_mask))
+        if algae.last_sec_processor_mask & algae.success_mask:
+            p.last_second_processor = [entry]
+        processor_count = popcount(algae.processor_mask)
+        if processor_count > 0:
+            p.processor_max = extremum(processor_count)
+
+        # 防守抗性
+        teleop_mask = ((1 << len(coral.cycle_times)) - 1) & ~coral.auto_mask
+        defended_mask = teleop_mask & coral.defended_mask
+        p.coral_teleop_success = popcount(teleop_mask & coral.successful_mask)
+        p.coral_defended = popcount(defended_mask)
+        p.coral_undefended = popcount(teleop_mask & ~coral.defended_mask)
+        p.defended_count_max = extremum(p.coral_defended)
+        defended_times = [
+            coral.cycle_times[index]
+            for index in iter_mask(defended_mask & coral.successful_mask)
+        ]
+        if defended_times:
+            p.defended_time_max = extremum(max(defended_times))
+        p.defended_times = sorted(defended_times)
+        p.undefended_times = sorted(
+            coral.cycle_times[index]
+            for index in iter_mask(
+                teleop_mask & ~coral.defended_mask & coral.successful_mask
+            )
+        )
+        return p
+
+    @classmethod
+    def combine(cls, partials: List["StatisticsPartial"]) -> "StatisticsPartial":
+        """
+        合并多份统计量，返回新的对象
+
+        浮点数总和按 partials 的顺序逐项累加；partials 均为单场且按比赛顺序
+        排列时与逐场实现的累加顺序相同
+        """
+        result = cls()
+        for p in partials:
+            for name in _SUMS + _FLOAT_SUMS:
+                setattr(result, name, getattr(result, name) + getattr(p, name))
+            for name in _MAXIMA:
+                value = _first_max(getattr(result, name), getattr(p, name))
+                setattr(result, name, value)
+            for name in _MINIMA:
+                value = _first_min(getattr(result, name), getattr(p, name))
+                setattr(result, name, value)
+            if result.first_order is None or p.first_order < result.first_order:
+                result.first_order = p.first_order
+        for name in _SORTED_VALUES + _MATCH_LISTS:
+            setattr(
+                result,
+                name,
+                sorted(chain.from_iterable(getattr(p, name) for p in partials)),
+            )
+        return result
+
+    def to_team_statistics(self, team_no: int) -> TeamStatistics:
+        """换算为队伍统计数据（不含排名），与逐场实现的各统计板块结果相同"""
+        team_stat = create_team_statistics(team_no)
+        n = self.count
+        if n == 0:
+            return team_stat
+
+        # 1. 时间占比
+        team_stat.cycle_teleop_coral_time_ratio.value = (self.coral_time / n) / 135.0
+        team_stat.cycle_teleop_algae_time_ratio.value = (self.algae_time / n) / 135.0
+        team_stat.cycle_teleop_defense_time_ratio.value = (
+            self.defense_time / n
+        ) / 135.0
+        team_stat.cycle_teleop_give_up_time_ratio.value = (
+            self.give_up_time / n
+        ) / 135.0
+
+        # 2. 爬升
+        for field_obj, entries in (
+            (team_stat.climb_success_matches, self.climb_success),
+            (team_stat.climb_fail_matches, self.climb_fail),
+            (team_stat.climb_touch_chain_matches, self.climb_touch_chain),
+        ):
+            field_obj.match_nos = [match_no for _, match_no, _ in entries]
+            field_obj.tournament_levels = [level for _, _, level in entries]
+        team_stat.climb_park_time_median.value = (
+            statistics.median(self.park_times) if self.park_times else 150.0
+        )
+        total_attempts = (
+            len(self.climb_success) + len(self.climb_fail) + len(self.climb_touch_chain)
+        )
+        team_stat.climb_success_percentage.value = (
+            len(self.climb_success) / total_attempts if total_attempts > 0 else 0.0
+        )
+        if self.climb_time_min is not None:
+            _set_extremum(team_stat.climb_success_cycle_time_min, self.climb_time_min)
+        else:
+            team_stat.climb_success_cycle_time_min.value = 151.0
+
+        # 3. BPS、EPA、PPG
+        team_stat.bps_value.value = (
+            self.branches / self.branch_time * 100 if self.branch_time > 0 else 0
+        )
+        team_stat.epa_value.value = self.epas / n
+        team_stat.ppg_avg.value = _mean(self.ppg_sum, n)
+        _set_extremum(team_stat.ppg_max_single_match, self.ppg_max)
+
+        # 4. 自动阶段
+        team_stat.auto_line_cross_percentage.value = self.leave / n
+        team_stat.auto_high_mid_coral_success_rate.value = (
+            self.auto_high_mid_success / self.auto_high_mid_total
+            if self.auto_high_mid_total > 0
+            else 0.0
+        )
+        team_stat.auto_low_slot_coral_success_rate.value = (
+            self.auto_low_slot_success / self.auto_low_slot_total
+            if self.auto_low_slot_total > 0
+            else 0.0
+        )
+        for field_obj, extremum in (
+            (team_stat.auto_high_mid_coral_max, self.auto_high_mid_max),
+            (team_stat.auto_low_slot_coral_max, self.auto_low_slot_max),
+            (team_stat.auto_net_place_max, self.auto_net_place_max),
+            (team_stat.auto_algae_process_max, self.auto_algae_process_max),
+        ):
+            if extremum is not None:
+                _set_extremum(field_obj, extremum)
+        team_stat.auto_preload_coral_percentage.value = self.preload / n
+
+        # 5. 手动筒
+        total_success = 0
+        total_attempts = 0
+        for level in _CORAL_LEVELS:
+            success = getattr(self, f"{level}_success")
+            attempts = getattr(self, f"{level}_attempts")
+            times = getattr(self, f"{level}_undefended_times")
+            total_success += success
+            total_attempts += attempts
+            mean_success = _mean(success, n)
+            mean_attempts = _mean(attempts, n)
+            getattr(team_stat, f"{level}_teleop_success_count_avg").value = (
+                mean_success
+            )
+            getattr(team_stat, f"{level}_teleop_success_percentage").value = (
+                mean_success / mean_attempts
+                if mean_attempts > 0
+                else (0.0 if level == "l3" else 0)
+            )
+            getattr(
+                team_stat, f"{level}_teleop_undefended_success_cycle_time_median"
+            ).value = (statistics.median(times) if times else 9999.0)
+        all_times = sorted(
+            chain.from_iterable(
+                getattr(self, f"{level}_undefended_times") for level in _CORAL_LEVELS
+            )
+        )
+        mean_success = _mean(total_success, n)
+        mean_attempts = _mean(total_attempts, n)
+        team_stat.total_teleop_success_count_avg.value = mean_success
+        team_stat.total_teleop_undefended_success_cycle_time_median.value = (
+            statistics.median(all_times) if all_times else 9999.0
+        )
+        team_stat.total_teleop_success_percentage.value = (
+            mean_success / mean_attempts if mean_attempts > 0 else 0
+        )
+        coral_sources = self.coral_station + self.coral_ground
+        team_stat.coral_source_ground_percentage.value = (
+            self.coral_ground / coral_sources if coral_sources else 0
+        )
+        team_stat.coral_source_station_percentage.value = (
+            self.coral_station / coral_sources if coral_sources else 0.0
+        )
+
+        # 6. 手动球
+        if self.processor_max is not None:
+            _set_extremum(
+                team_stat.processor_success_max_single_match, self.processor_max
+            )
+        else:
+            team_stat.processor_success_max_single_match.value = 0
+        team_stat.avg_scrape_algae_count.value = _mean(self.scrape, n)
+        team_stat.avg_pickup_algae_count.value = _mean(self.pickup, n)
+        team_stat.algae_success_cycle_count_median.value = statistics.median(
+            self.algae_cycle_counts
+        )
+        _set_extremum(team_stat.algae_success_cycle_count_max, self.algae_cycle_max)
+        algae_sources = (
+            self.algae_front + self.algae_middle + self.algae_back + self.algae_reef
+        )
+        if algae_sources > 0:
+            team_stat.algae_source_front_percentage.value = (
+                self.algae_front / algae_sources
+            )
+            team_stat.algae_source_mid_percentage.value = (
+                self.algae_middle / algae_sources
+            )
+            team_stat.algae_source_back_percentage.value = (
+                self.algae_back / algae_sources
+            )
+            team_stat.algae_source_reef_percentage.value = (
+                self.algae_reef / algae_sources
+            )
+        else:
+            team_stat.algae_source_front_percentage.value = 0.0
+            team_stat.algae_source_mid_percentage.value = 0.0
+            team_stat.algae_source_back_percentage.value = 0.0
+            team_stat.algae_source_reef_percentage.value = 0.0
+        net_attempts = self.place_net + self.shoot_net
+        if net_attempts > 0:
+            team_stat.net_place_percentage.value = self.place_net / net_attempts
+            team_stat.net_shoot_percentage.value = self.shoot_net / net_attempts
+        else:
+            team_stat.net_place_percentage.value = 0.0
+            team_stat.net_shoot_percentage.value = 0.0
+        team_stat.net_place_success_rate.value = (
+            self.place_net_success / self.place_net if self.place_net > 0 else 0.0
+        )
+        team_stat.net_shoot_success_rate.value = (
+            self.shoot_net_success / self.shoot_net if self.shoot_net > 0 else 0.0
+        )
+        team_stat.net_success_undefended_cycle_time_median.value = (
+            statistics.median(self.net_undefended_times)
+            if self.net_undefended_times
+            else 9999.0
+        )
+        _set_extremum(team_stat.tactical_max_single_match, self.tactical_max)
+        team_stat.last_second_processer_matches.match_nos = [
+            match_no for _, match_no, _ in self.last_second_processor
+        ]
+        team_stat.last_second_processer_matches.tournament_levels = [
+            level for _, _, level in self.last_second_processor
+        ]
+
+        # 7. 防守抗性
+        if self.coral_teleop_success > 0:
+            team_stat.coral_defended_percentage.value = self.coral_defended / (
+                self.coral_defended + self.coral_undefended
+            )
+        else:
+            team_stat.coral_defended_percentage.value = 0.0
+        _set_extremum(
+            team_stat.coral_defended_max_single_match, self.defended_count_max
+        )
+        if self.defended_time_max is not None:
+            _set_extremum(
+                team_stat.defended_success_coral_cycle_time_max, self.defended_time_max
+            )
+            defended_median = statistics.median(self.defended_times)
+            team_stat.defended_success_coral_cycle_time_median.value = defended_median
+        else:
+            team_stat.defended_success_coral_cycle_time_max.value = 9999.0
+            team_stat.defended_success_coral_cycle_time_median.value = 9999.0
+        if self.undefended_times:
+            undefended_median = statistics.median(self.undefended_times)
+            team_stat.undefended_success_coral_cycle_time_median.value = (
+                undefended_median
+            )
+        else:
+            team_stat.undefended_success_coral_cycle_time_median.value = 9999.0
+        increase = getattr(
+            team_stat,
+            "defended_vs_undefended_success_coral_cycle_time_increase_percentage",
+        )
+        if self.defended_time_max is not None and self.undefended_times:
+            increase.value = (
+                (defended_median - undefended_median) / undefended_median
+                if undefended_median > 0
+                else 0.0
+            )
+        else:
+            increase.value = 0.0
+
+        return team_stat
+
+
+def _recent_entries(
+    entries: List[Tuple[str, MatchStatistics]], window: int
+) -> List[Tuple[str, MatchStatistics]]:
+    """一支队伍最近的 window 场（与 MatchFilter.select 的选择相同）"""
+    if len(entries) <= window:
+        return entries
+    entries = sorted(entries, key=lambda entry: entry[0])
+    entries.sort(
+        key=lambda entry: match_order_key(
+            entry[1].tournament_level, entry[1].match_no, entry[1].timestamp
+        )
+    )
+    return entries[-window:]
+
+
+class PartialAggregateIndex:
+    """
+    比赛数据存储上的部分聚合索引
+
+    单场的统计量按文件名缓存（比赛对象未变时复用），同一队伍同一比赛等级的
+    合并结果在该等级的比赛未变时复用，数据变化后只有受影响的部分需要重新提取
+    """
+
+    def __init__(self, match_store):
+        self.match_store = match_store
+        self._match_partials: Dict[str, Tuple[MatchStatistics, StatisticsPartial]] = {}
+        # (队伍号, 比赛等级) -> (合并时的比赛对象, 合并结果)
+        self._level_partials: Dict[
+            Tuple[int, str], Tuple[Tuple[MatchStatistics, ...], StatisticsPartial]
+        ] = {}
+        # 当前版本的分组: 队伍号 -> 比赛等级 -> [(文件名, 比赛)]
+        self._groups: Dict[int, Dict[str, List[Tuple[str, MatchStatistics]]]] = {}
+        self._groups_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def team_partials(
+        self, match_filter: MatchFilter, team_nos: Optional[Iterable[int]] = None
+    ) -> Dict[int, StatisticsPartial]:
+        """
+        合并出过滤条件下各队伍的统计量，队伍顺序与按 get_all 顺序逐场分组时相同
+
+        没有场次范围和 window 时每支队伍只需合并各比赛等级的预合并结果，
+        否则合并选中的各场的统计量。指定 team_nos 时只合并这些队伍
+        （没有选中比赛的队伍不在结果中）
+        """
+        groups = self._current_groups()
+        if team_nos is not None:
+            groups = {
+                team_no: groups[team_no] for team_no in team_nos if team_no in groups
+            }
+        with self._lock:
+            levels = set(match_filter.tournament_levels)
+            per_level = not match_filter.match_ranges and match_filter.window is None
+            result = {}
+            for team_no, team_levels in groups.items():
+                if per_level:
+                    partials = [
+                        self._level_partial(team_no, level, entries)
+                        for level, entries in team_levels.items()
+                        if not levels or level in levels
+                    ]
+                else:
+                    selected = [
+                        (filename, match_stat)
+                        for level, entries in team_levels.items()
+                        if not levels or level in levels
+                        for filename, match_stat in entries
+                        if match_filter.includes_match_no(match_stat.match_no)
+                    ]
+                    if match_filter.window is not None:
+                        selected = _recent_entries(selected, match_filter.window)
+                    partials = [
+                        self._match_partial(filename, match_stat)
+                        for filename, match_stat in selected
+                    ]
+                if partials:
+                    # 按比赛顺序合并（均为单场时浮点数总和与逐场实现完全相同）
+                    partials.sort(key=lambda partial: partial.first_order)
+                    result[team_no] = StatisticsPartial.combine(partials)
+        return dict(sorted(result.items(), key=lambda item: item[1].first_order))
+
+    def _current_groups(self):
+        """
+        按当前数据集版本分组，版本未变时直接复用
+
+        读取比赛数据时不持有本索引的锁：数据变更监听器在存储锁内调用本索引，
+        两把锁只能按先存储后索引的顺序获取
+        """
+        with self._lock:
+            if self._groups_version == self.match_store.version:
+                return self._groups
+        version, items = self.match_store.versioned_items()
+        groups = defaultdict(lambda: defaultdict(list))
+        for filename, match_stat in items:
+            groups[match_stat.team_no][match_stat.tournament_level].append(
+                (filename, match_stat)
+            )
+        with self._lock:
+            if self._groups_version is not None and self._groups_version > version:
+                # 其他线程已经按更新的版本分组
+                return groups
+            filenames = {filename for filename, _ in items}
+            # 释放已删除的比赛和队伍/等级
+            self._match_partials = {
+                filename: value
+                for filename, value in self._match_partials.items()
+                if filename in filenames
+            }
+            self._level_partials = {
+                key: value
+                for key, value in self._level_partials.items()
+                if key[0] in groups and key[1] in groups[key[0]]
+            }
+            self._groups = groups
+            self._groups_version = version
+        return groups
+
+    def _match_partial(
+        self, filename: str, match_stat: MatchStatistics
+    ) -> StatisticsPartial:
+        cached = self._match_partials.get(filename)
+        if cached is not None and cached[0] is match_stat:
+            return cached[1]
+        partial = StatisticsPartial.from_match(match_stat, filename)
+        self._match_partials[filename] = (match_stat, partial)
+        return partial
+
+    def _level_partial(
+        self, team_no: int, level: str, entries: List[Tuple[str, MatchStatistics]]
+    ) -> StatisticsPartial:
+        matches = tuple(match_stat for _, match_stat in entries)
+        cached = self._level_partials.get((team_no, level))
+        if (
+            cached is not None
+            and len(cached[0]) == len(matches)
+            and all(a is b for a, b in zip(cached[0], matches))
+        ):
+            return cached[1]
+        partial = StatisticsPartial.combine(
+            [
+                self._match_partial(filename, match_stat)
+                for filename, match_stat in entries
+            ]
+        )
+        self._level_partials[(team_no, level)] = (matches, partial)
+        return partial
@@ -0,0 +1,163 @@
+"""
+处理后比赛数据的压缩快照
+
+把 processed 目录中的所有 MatchStatistics 合并成一个带版本号的快照文件，
+快照之后新增或移除的记录追加到一个小的日志文件（每行一条JSON）。
+启动时只需顺序读取快照和日志，不必逐个打开成千上万个小文件。
+processed 目录的逐文件布局保持不变，快照只是它的加速副本：每条记录同时保存
+写入时文件的修改时间和大小，与当前文件不一致（被原地改写）时重新读取该文件。
+"""
+
+import os
+import datetime
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from backend.schema.match_statistics_schema import MatchStatistics
+from backend.schema import serialization
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+# 文件状态: [st_mtime_ns, st_size]
+FileStat = List[int]
+
+
+def file_stat(filepath: str) -> Optional[FileStat]:
+    """文件的修改时间（纳秒）和大小，文件不存在时返回None"""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ProcessedSnapshot:
+    """快照文件 + 追加日志"""
+
+    def __init__(self, snapshot_path: str, log_path: str):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        # 自上次压缩以来追加的日志行
+        self._log_lines = []
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """尚未压缩进快照的日志条数"""
+        return len(self._log_lines)
+
+    def load(
+        self,
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Optional[FileStat]]]:
+        """
+        读取快照并重放日志
+
+        Returns:
+            (文件名 -> MatchStatistics字典数据, 文件名 -> 记录写入时的文件状态)
+        """
+        matches = {}
+        file_stats = {}
+        if os.path.exists(self.snapshot_path):
+            try:
+                snapshot = serialization.load_file(self.snapshot_path)
+                if snapshot.get("format_version") == SNAPSHOT_FORMAT_VERSION:
+                    matches = snapshot.get("matches", {})
+                    file_stats = snapshot.get("file_stats", {})
+                else:
+                    logger.warning(
+                        f"快照格式版本不匹配，忽略快照: {snapshot.get('format_version')}"
+                    )
+            except Exception as e:
+                logger.error(f"读取快照 {self.snapshot_path} 时出错: {str(e)}")
+
+        log_lines = []
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = serialization.loads(line)
+                    except ValueError:
+                        # 写入中断导致的半行，丢弃
+                        continue
+                    if entry.get("op") == "add":
+                        matches[entry["filename"]] = entry["data"]
+                        file_stats[entry["filename"]] = entry.get("file_stat")
+                    elif entry.get("op") == "remove":
+                        matches.pop(entry["filename"], None)
+                        file_stats.pop(entry["filename"], None)
+                    log_lines.append(line)
+
+        with self._lock:
+            self._log_lines = log_lines
+        return matches, file_stats
+
+    def append_add(
+        self,
+        filename: str,
+        match_statistics: MatchStatistics,
+        stat: Optional[FileStat] = None,
+    ) -> None:
+        """记录新增（或替换）一条比赛数据及其对应文件的状态"""
+        self._append(
+            {
+                "op": "add",
+                "filename": filename,
+                "data": match_statistics.to_dict(),
+                "file_stat": stat,
+            }
+        )
+
+    def append_remove(self, filename: str) -> None:
+        """记录移除一条比赛数据"""
+        self._append({"op": "remove", "filename": filename})
+
+    def compact(
+        self,
+        matches: Dict[str, MatchStatistics],
+        file_stats: Dict[str, Optional[FileStat]],
+        log_position: Optional[int] = None,
+    ) -> None:
+        """
+        把 matches 写成新的快照，并截断日志
+
+        Args:
+            matches: 文件名 -> MatchStatistics
+            file_stats: 文件名 -> 读取或写入该记录时的文件状态
+            log_position: matches 已包含的日志条数，其后追加的日志会保留；默认为全部
+        """
+        payload = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "created_at": datetime.datetime.now().isoformat(),
+            "count": len(matches),
+            "matches": {
+                filename: match_stat.to_dict()
+                for filename, match_stat in sorted(matches.items())
+            },
+            "file_stats": {filename: file_stats.get(filename) for filename in matches},
+        }
+        self._write_atomic(self.snapshot_path, serialization.dumps(payload))
+
+        with self._lock:
+            if log_position is None:
+                log_position = len(self._log_lines)
+            remaining = self._log_lines[log_position:]
+            self._write_atomic(self.log_path, "".join(remaining))
+            self._log_lines = remaining
+        logger.info(f"已压缩 {len(matches)} 条比赛数据到快照 {self.snapshot_path}")
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        line = serialization.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._log_lines.append(line)
+
+    @staticmethod
+    def _write_atomic(path: str, content: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
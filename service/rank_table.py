@@ -0,0 +1,71 @@
+"""
+按列组织的排名表
+
+对一组队伍统计数据（一个过滤条件 + 数据集版本）只构建一次：每个可排名的
+属性对应一列按排名排好序的记录，在第一次被请求时构建。/api/rankings 只需
+取出所请求属性的列并按需截取前N名，不再为每个属性把每支队伍的全部统计数据
+转换一遍字典。
+"""
+
+from dataclasses import fields
+from typing import Any, Dict, List, Optional
+from backend.schema.team_statistics_schema import (
+    TeamStatistics,
+    RankValue,
+    RankValueMatch,
+)
+from backend.service.metrics import stage_metrics
+
+# 可排名的属性
+RANKED_ATTRIBUTES = [
+    field.name
+    for field in fields(TeamStatistics)
+    if field.type in [RankValue, RankValueMatch]
+]
+_RANKED_ATTRIBUTE_SET = frozenset(RANKED_ATTRIBUTES)
+
+
+def _rank_sort_key(row: Dict[str, Any]) -> float:
+    # 未排名（rank <= 0）的排在最后
+    return row["rank"] if row["rank"] > 0 else float("inf")
+
+
+class RankTable:
+    """一组队伍统计数据的排名表，各列在第一次被请求时构建，之后只读"""
+
+    def __init__(self, team_statistics: List[TeamStatistics]):
+        # 保留来源列表，用于判断排名表是否仍对应缓存中的数据
+        self.team_statistics = team_statistics
+        self._columns: Dict[str, List[Dict[str, Any]]] = {}
+
+    def column(self, attribute: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        获取属性按排名排序的记录，未知属性返回空列表
+
+        返回的记录在多个请求之间共享，调用方不应修改
+        """
+        if attribute not in _RANKED_ATTRIBUTE_SET:
+            return []
+        column = self._columns.get(attribute)
+        if column is None:
+            column = self._build_column(attribute)
+            # 并发构建同一列时结果相同，保留任意一份即可
+            self._columns[attribute] = column
+        return column if limit is None else column[:limit]
+
+    @stage_metrics.timed("rankings")
+    def _build_column(self, attribute: str) -> List[Dict[str, Any]]:
+        column = []
+        for team_stat in self.team_statistics:
+            field_obj = getattr(team_stat, attribute)
+            column.append(
+                {
+                    "team_no": team_stat.team_no,
+                    "value": field_obj.value,
+                    "rank": field_obj.rank,
+                    "match_no": getattr(field_obj, "match_no", None),
+                    "tournament_level": getattr(field_obj, "tournament_level", None),
+                }
+            )
+        column.sort(key=_rank_sort_key)
+        return column
@@ -0,0 +1,99 @@
+"""
+预序列化的响应缓存
+
+按 (接口, 规范化参数, 数据集版本) 缓存已经编码好的 JSON 字节，以及一份
+gzip 压缩后的副本，命中时按客户端的 Accept-Encoding 直接返回其中之一，
+不再重复转换字典和序列化。总字节数有上限，超出时淘汰最久未使用的响应。
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """一份缓存的响应"""
+
+    body: bytes
+    # 响应太小不值得压缩时为None
+    gzip_body: Optional[bytes] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + (len(self.gzip_body) if self.gzip_body else 0)
+
+
+class ResponseCache:
+    """以总字节数为上限的LRU响应缓存"""
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        min_compress_size: int = 1024,
+        compress_level: int = 6,
+    ):
+        self.max_bytes = max_bytes
+        self.min_compress_size = min_compress_size
+        self.compress_level = compress_level
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """获取缓存的响应，未命中返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> CachedResponse:
+        """缓存响应字节（同时生成gzip副本），返回缓存项"""
+        gzip_body = None
+        if len(body) >= self.min_compress_size:
+            gzip_body = gzip.compress(body, compresslevel=self.compress_level, mtime=0)
+        entry = CachedResponse(body, gzip_body)
+        if entry.size > self.max_bytes:
+            # 单个响应超过上限时不缓存
+            return entry
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return entry
+
+    def clear(self, *args) -> None:
+        """清空缓存（可直接作为比赛数据变更的监听函数）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,246 @@
+"""
+基于 SQLite 的比赛统计数据存储后端（可选）
+
+processed 目录中的 MatchStatistics 同步写入一张带索引的表，
+MatchStore 为比赛等级和场次区间条件计算过滤掩码时，通过 query_filenames
+以索引查询的方式执行。
+JSON 文件仍然保留，供文件管理页面使用；每行记录对应文件写入时的修改时间和大小，
+与目录对齐时据此重新导入被原地改写的文件。
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from typing import Dict, List, Iterable, Optional, Tuple
+from backend.schema.match_statistics_schema import MatchStatistics
+from backend.schema import serialization
+from backend.service.processed_snapshot import FileStat, file_stat
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_statistics (
+    filename TEXT PRIMARY KEY,
+    event_code TEXT,
+    team_no INTEGER,
+    tournament_level TEXT,
+    match_no INTEGER,
+    timestamp INTEGER,
+    data TEXT NOT NULL,
+    file_mtime_ns INTEGER,
+    file_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_match_statistics_event_code
+    ON match_statistics (event_code);
+CREATE INDEX IF NOT EXISTS idx_match_statistics_team_no
+    ON match_statistics (team_no);
+CREATE INDEX IF NOT EXISTS idx_match_statistics_tournament_level
+    ON match_statistics (tournament_level, match_no);
+CREATE INDEX IF NOT EXISTS idx_match_statistics_match_no
+    ON match_statistics (match_no);
+"""
+
+
+_COLUMNS = (
+    "filename, event_code, team_no, tournament_level, match_no, timestamp, data, "
+    "file_mtime_ns, file_size"
+)
+_UPSERT = (
+    f"INSERT OR REPLACE INTO match_statistics ({_COLUMNS}) "
+    f"VALUES ({', '.join('?' * 9)})"
+)
+
+# 旧版本的库缺少的列，打开时补上（值为NULL的行在下次对齐时重新导入）
+_ADDED_COLUMNS = {"file_mtime_ns": "INTEGER", "file_size": "INTEGER"}
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SQLiteMatchIndex:
+    """MatchStatistics 的 SQLite 存储，所有操作共用一个连接并加锁串行化"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        existing = {
+            row[1]
+            for row in self._conn.execute("PRAGMA table_info(match_statistics)")
+        }
+        for column, column_type in _ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(
+                    f"ALTER TABLE match_statistics ADD COLUMN {column} {column_type}"
+                )
+        self._lock = threading.Lock()
+
+    def count(self) -> int:
+        """记录条数"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM match_statistics"
+            ).fetchone()[0]
+
+    def upsert(
+        self,
+        filename: str,
+        match_statistics: MatchStatistics,
+        stat: Optional[FileStat] = None,
+    ) -> None:
+        """写入或替换一条比赛统计数据，stat 为对应文件的状态"""
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT, self._row(filename, match_statistics, stat))
+
+    def delete(self, filename: str) -> None:
+        """删除一条比赛统计数据"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM match_statistics WHERE filename = ?", (filename,)
+            )
+
+    def load_all(self) -> Dict[str, MatchStatistics]:
+        """读取全部比赛统计数据，文件名 -> MatchStatistics"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, data FROM match_statistics ORDER BY filename"
+            ).fetchall()
+        matches = {}
+        for filename, data in rows:
+            try:
+                matches[filename] = MatchStatistics.from_file_data(
+                    serialization.loads(data), filename
+                )
+            except Exception as e:
+                logger.error(f"读取数据库记录 {filename} 时出错: {str(e)}")
+        return matches
+
+    def query_filenames(
+        self,
+        tournament_levels: Iterable[str],
+        match_ranges: Iterable[Tuple[int, int]],
+    ) -> List[str]:
+        """按比赛等级和场次区间（闭区间）过滤，返回按文件名排序的文件名列表"""
+        tournament_levels = list(tournament_levels)
+        match_ranges = list(match_ranges)
+        clauses = []
+        params = []
+        if tournament_levels:
+            clauses.append(
+                f"tournament_level IN ({', '.join('?' * len(tournament_levels))})"
+            )
+            params.extend(tournament_levels)
+        if match_ranges:
+            clauses.append(
+                "("
+                + " OR ".join("match_no BETWEEN ? AND ?" for _ in match_ranges)
+                + ")"
+            )
+            for start, end in match_ranges:
+                params.extend((start, end))
+
+        sql = "SELECT filename FROM match_statistics"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY filename"
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def filenames(self) -> List[str]:
+        """库中所有文件名"""
+        with self._lock:
+            rows = self._conn.execute("SELECT filename FROM match_statistics")
+            return [row[0] for row in rows]
+
+    def file_stats(self) -> Dict[str, Optional[FileStat]]:
+        """库中所有文件名 -> 写入时的文件状态（旧版本写入的行为None）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, file_mtime_ns, file_size FROM match_statistics"
+            )
+            return {
+                filename: None if mtime_ns is None else [mtime_ns, size]
+                for filename, mtime_ns, size in rows
+            }
+
+    def import_processed_dir(
+        self,
+        processed_dir: str,
+        filenames: Optional[Iterable[str]] = None,
+        replace: bool = False,
+    ) -> int:
+        """从 processed 目录导入JSON文件（默认导入全部），返回导入条数"""
+        if filenames is None:
+            filenames = [f for f in os.listdir(processed_dir) if f.endswith(".json")]
+        rows = []
+        for filename in sorted(filenames):
+            filepath = os.path.join(processed_dir, filename)
+            try:
+                # 先取状态再读取，读取期间被改写的文件下次对齐时会再次导入
+                stat = file_stat(filepath)
+                match_stat = MatchStatistics.from_json_file(filepath)
+                rows.append(self._row(filename, match_stat, stat))
+            except Exception as e:
+                logger.error(f"导入文件 {filename} 时出错: {str(e)}")
+
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM match_statistics")
+            self._conn.executemany(_UPSERT, rows)
+        if rows:
+            logger.info(f"已导入 {len(rows)} 条比赛统计数据到 {self.db_path}")
+        return len(rows)
+
+    def sync_with_dir(self, processed_dir: str) -> None:
+        """
+        与 processed 目录对齐：导入库中缺少的文件和修改时间或大小与记录不一致
+        （被原地改写）的文件，删除目录中已不存在的记录
+        """
+        dir_files = {f for f in os.listdir(processed_dir) if f.endswith(".json")}
+        db_stats = self.file_stats()
+        outdated = {
+            filename
+            for filename in dir_files
+            if filename not in db_stats
+            or db_stats[filename] != file_stat(os.path.join(processed_dir, filename))
+        }
+        if outdated:
+            self.import_processed_dir(processed_dir, outdated)
+        removed = db_stats.keys() - dir_files
+        if removed:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "DELETE FROM match_statistics WHERE filename = ?",
+                    [(filename,) for filename in removed],
+                )
+            logger.info(f"已从 {self.db_path} 删除 {len(removed)} 条失效记录")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row(
+        filename: str,
+        match_statistics: MatchStatistics,
+        stat: Optional[FileStat] = None,
+    ) -> tuple:
+        mtime_ns, size = stat if stat is not None else (None, None)
+        return (
+            filename,
+            match_statistics.event_code,
+            _to_int(match_statistics.team_no),
+            match_statistics.tournament_level,
+            _to_int(match_statistics.match_no),
+            _to_int(match_statistics.timestamp),
+            serialization.dumps(match_statistics.to_dict()),
+            mtime_ns,
+            size,
+        )
@@ -0,0 +1,449 @@
+"""
+按过滤条件缓存聚合后的队伍统计数据
+
+缓存键为编译后的过滤条件（MatchFilter）加上数据集版本号，
+数据集每次上传、移入回收站或恢复都会使版本号递增。当前版本的缓存项会
+随比赛数据变更增量更新（只重新计算受影响的队伍），其余旧版本缓存直接丢弃。
+"""
+
+import threading
+from collections import OrderedDict, defaultdict
+from typing import List, Tuple, Dict, Any, Iterable, Optional, FrozenSet
+from backend.schema.match_statistics_schema import MatchStatistics
+from backend.schema.team_statistics_schema import TeamStatistics
+from backend.service.aggregate_team_statistics import (
+    ALL_SECTIONS,
+    create_team_statistics_from_matches,
+    create_team_statistics_from_groups,
+    create_team_statistics_from_partials,
+    update_team_statistics,
+    update_team_statistics_from_partials,
+    add_team_statistics_sections,
+    sections_for_fields,
+)
+from backend.service.rank_table import RankTable
+from backend.service.partial_aggregation import PartialAggregateIndex
+from backend.service.match_store import MatchStore
+from backend.service.match_filter import MatchFilter, NO_FILTER
+from backend.service.metrics import stage_metrics
+
+# 部分计算的缓存项：(队伍统计数据, 已计算的统计板块)
+PartialEntry = Tuple[List[TeamStatistics], FrozenSet[str]]
+
+
+class TeamStatisticsCache:
+    """带LRU容量上限的队伍统计数据缓存"""
+
+    def __init__(
+        self,
+        match_store: MatchStore,
+        max_entries: int = 16,
+        vectorized: bool = False,
+        partial_aggregation: bool = False,
+    ):
+        self.match_store = match_store
+        self.max_entries = max_entries
+        # 全量聚合时是否使用NumPy向量化实现
+        self.vectorized = vectorized
+        # 启用时未命中的过滤条件由按 (队伍, 比赛等级, 场次) 预先提取的部分聚合合并得到
+        self.partials = (
+            PartialAggregateIndex(match_store) if partial_aggregation else None
+        )
+        self._entries: "OrderedDict[Tuple[MatchFilter, int], List[TeamStatistics]]" = (
+            OrderedDict()
+        )
+        # 只计算了部分统计板块的缓存项 -> (队伍统计数据, 已计算的板块)
+        self._partial_entries: "OrderedDict[Tuple[MatchFilter, int], PartialEntry]" = (
+            OrderedDict()
+        )
+        # 各过滤条件的排名表，随对应的队伍统计数据一起失效
+        self._rank_tables: Dict[MatchFilter, RankTable] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.incremental_updates = 0
+        self.section_computations = 0
+        # 数据集版本不变而缓存结果被替换（热启动后台刷新）的次数，与版本号一起标识响应内容
+        self.generation = 0
+        match_store.subscribe(self._on_store_changed)
+
+    def get(self, match_filter: MatchFilter) -> List[TeamStatistics]:
+        """
+        获取指定过滤条件下的队伍统计数据，未命中时聚合计算并缓存
+
+        返回的列表和其中的对象在多个请求之间共享，调用方不应修改
+        """
+        version = self.match_store.version
+        key = (match_filter, version)
+
+        with self._lock:
+            team_statistics = self._entries.get(key)
+            if team_statistics is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return team_statistics
+            self.misses += 1
+
+        if self.partials is not None:
+            # 合并部分聚合即是在计算各队伍的统计数据
+            with stage_metrics.stage("team_statistics"):
+                team_partials = self.partials.team_partials(match_filter)
+            team_statistics = create_team_statistics_from_partials(team_partials)
+        else:
+            match_stats = self.match_store.query(match_filter)
+            team_statistics = create_team_statistics_from_matches(
+                match_stats, vectorized=self.vectorized
+            )
+
+        with self._lock:
+            self._store(key, team_statistics, ALL_SECTIONS)
+
+        return team_statistics
+
+    def get_sections(
+        self, match_filter: MatchFilter, sections: Iterable[str]
+    ) -> List[TeamStatistics]:
+        """
+        获取至少计算了指定统计板块的队伍统计数据
+
+        已有完整缓存项时直接返回；否则只计算缺少的板块，结果按过滤条件和
+        数据集版本缓存，之后的请求只需补算新的板块。未计算板块的字段保持默认值，
+        调用方只应读取所请求板块的字段
+        """
+        sections = frozenset(sections)
+        if sections >= ALL_SECTIONS or self.partials is not None:
+            # 合并部分聚合时各板块一并得到，不再单独计算
+            return self.get(match_filter)
+
+        version = self.match_store.version
+        key = (match_filter, version)
+
+        with self._lock:
+            team_statistics = self._entries.get(key)
+            if team_statistics is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return team_statistics
+            partial = self._partial_entries.get(key)
+            if partial is not None and sections <= partial[1]:
+                self._partial_entries.move_to_end(key)
+                self.hits += 1
+                return partial[0]
+            self.misses += 1
+
+        match_stats = self.match_store.query(match_filter)
+        if partial is None:
+            computed = sections
+            team_statistics = create_team_statistics_from_matches(
+                match_stats, sections=sections
+            )
+        else:
+            computed = partial[1] | sections
+            teams_matches = defaultdict(list)
+            for match_stat in match_stats:
+                teams_matches[match_stat.team_no].append(match_stat)
+            team_statistics = add_team_statistics_sections(
+                partial[0], teams_matches, sections - partial[1]
+            )
+        self.section_computations += 1
+
+        with self._lock:
+            self._store(key, team_statistics, computed)
+
+        return team_statistics
+
+    def get_many(
+        self,
+        match_filters: Iterable[MatchFilter],
+        sections: Optional[Iterable[str]] = None,
+    ) -> Dict[MatchFilter, List[TeamStatistics]]:
+        """
+        一次获取多个过滤条件下的队伍统计数据，sections 的含义同 get_sections
+
+        没有任何缓存的过滤条件共用同一次按队伍分组：比赛数据只遍历一次，
+        各过滤条件只在每支队伍自己的比赛中选择。结果与逐个调用 get_sections 相同
+        """
+        sections = ALL_SECTIONS if sections is None else frozenset(sections)
+        match_filters = list(dict.fromkeys(match_filters))
+        version = self.match_store.version
+
+        cold = []
+        if self.partials is None:
+            with self._lock:
+                cold = [
+                    match_filter
+                    for match_filter in match_filters
+                    if (match_filter, version) not in self._entries
+                    and (match_filter, version) not in self._partial_entries
+                ]
+                self.misses += len(cold)
+
+        result = {}
+        if cold:
+            computed = None if sections >= ALL_SECTIONS else sections
+            for match_filter, team_statistics in self._compute_grouped(
+                cold, computed
+            ).items():
+                result[match_filter] = team_statistics
+                with self._lock:
+                    self._store((match_filter, version), team_statistics, sections)
+            if computed is not None:
+                self.section_computations += 1
+        # 已有缓存（或合并部分聚合）的过滤条件按单个请求处理
+        for match_filter in match_filters:
+            if match_filter not in result:
+                result[match_filter] = self.get_sections(match_filter, sections)
+        return result
+
+    def _compute_grouped(
+        self, match_filters: List[MatchFilter], sections: Optional[FrozenSet[str]]
+    ) -> Dict[MatchFilter, List[TeamStatistics]]:
+        """按队伍分组一次，分别计算各过滤条件下的队伍统计数据"""
+        match_stats = self.match_store.query(NO_FILTER)
+        with stage_metrics.stage("filter"):
+            position = {id(match_stat): i for i, match_stat in enumerate(match_stats)}
+            teams_matches = defaultdict(list)
+            for match_stat in match_stats:
+                teams_matches[match_stat.team_no].append(match_stat)
+
+        results = {}
+        for match_filter in match_filters:
+            with stage_metrics.stage("filter"):
+                selected = {}
+                for team_no, matches in teams_matches.items():
+                    team_matches = match_filter.select(matches)
+                    if team_matches:
+                        selected[team_no] = team_matches
+                # 队伍顺序与按过滤后的比赛逐场分组时相同
+                selected = dict(
+                    sorted(
+                        selected.items(), key=lambda item: position[id(item[1][0])]
+                    )
+                )
+            results[match_filter] = create_team_statistics_from_groups(
+                selected,
+                vectorized=self.vectorized and sections is None,
+                sections=sections,
+            )
+        return results
+
+    def _store(
+        self,
+        key: Tuple[MatchFilter, int],
+        team_statistics: List[TeamStatistics],
+        computed: FrozenSet[str],
+    ) -> None:
+        """缓存计算结果并丢弃旧版本的缓存项（调用方需持有锁）"""
+        version = key[1]
+        if computed >= ALL_SECTIONS:
+            # 旧版本的缓存不会再被命中；所有板块都已计算时转为完整缓存项
+            for stale_key in [k for k in self._entries if k[1] < version]:
+                del self._entries[stale_key]
+            self._partial_entries.pop(key, None)
+            self._entries[key] = team_statistics
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            for stale_key in [k for k in self._partial_entries if k[1] < version]:
+                del self._partial_entries[stale_key]
+            self._partial_entries[key] = (team_statistics, computed)
+            self._partial_entries.move_to_end(key)
+            while len(self._partial_entries) > self.max_entries:
+                self._partial_entries.popitem(last=False)
+
+    def get_rank_table(
+        self, match_filter: MatchFilter, attributes: Optional[Iterable[str]] = None
+    ) -> RankTable:
+        """
+        获取指定过滤条件下的排名表，每组队伍统计数据只构建一次
+
+        指定 attributes 时只需计算这些属性所在的统计板块
+        """
+        if attributes is None:
+            team_statistics = self.get(match_filter)
+        else:
+            team_statistics = self.get_sections(
+                match_filter, sections_for_fields(attributes)
+            )
+        with self._lock:
+            rank_table = self._rank_tables.get(match_filter)
+            if rank_table is not None and rank_table.team_statistics is team_statistics:
+                return rank_table
+
+        rank_table = RankTable(team_statistics)
+        with self._lock:
+            self._rank_tables[match_filter] = rank_table
+            # 只保留仍在缓存中的过滤条件
+            cached_filters = {key[0] for key in self._entries}
+            cached_filters.update(key[0] for key in self._partial_entries)
+            for stale_key in [k for k in self._rank_tables if k not in cached_filters]:
+                del self._rank_tables[stale_key]
+        return rank_table
+
+    def _on_store_changed(
+        self,
+        old_version: int,
+        new_version: int,
+        changed_matches: Optional[List[MatchStatistics]],
+    ) -> None:
+        """比赛数据变更时，增量更新当前版本的缓存项并迁移到新版本"""
+        with self._lock:
+            current = [
+                (key[0], team_statistics)
+                for key, team_statistics in self._entries.items()
+                if key[1] == old_version
+            ]
+            partial = [
+                (key[0], team_statistics, sections)
+                for key, (team_statistics, sections) in self._partial_entries.items()
+                if key[1] == old_version
+            ]
+            self._entries.clear()
+            self._partial_entries.clear()
+            if changed_matches is None:
+                return
+
+            for match_filter, team_statistics in current:
+                self._entries[(match_filter, new_version)] = self._apply_changes(
+                    match_filter, team_statistics, changed_matches
+                )
+            for match_filter, team_statistics, sections in partial:
+                self._partial_entries[(match_filter, new_version)] = (
+                    self._apply_changes(
+                        match_filter, team_statistics, changed_matches, sections
+                    ),
+                    sections,
+                )
+
+    def _apply_changes(
+        self,
+        match_filter: MatchFilter,
+        team_statistics: List[TeamStatistics],
+        changed_matches: List[MatchStatistics],
+        sections: Optional[FrozenSet[str]] = None,
+    ) -> List[TeamStatistics]:
+        """
+        只重新计算受变更影响的队伍（仅已计算的板块）
+
+        有 window 时新比赛使该队伍的窗口向后滑动，只需按窗口内的比赛重新计算
+        这一支队伍
+        """
+        team_nos = {
+            match_stat.team_no
+            for match_stat in changed_matches
+            if match_filter.includes(match_stat)
+        }
+        if not team_nos:
+            return team_statistics
+        self.incremental_updates += 1
+        return self.recompute_teams(match_filter, team_statistics, team_nos, sections)
+
+    def recompute_teams(
+        self,
+        match_filter: MatchFilter,
+        team_statistics: List[TeamStatistics],
+        team_nos: Iterable[int],
+        sections: Optional[FrozenSet[str]] = None,
+    ) -> List[TeamStatistics]:
+        """
+        按当前数据重新计算指定队伍，返回新的列表（原列表和对象不会被修改）
+
+        与未命中时的计算方式相同：启用部分聚合时由这些队伍重新合并的统计量生成，
+        队伍按各自在过滤后的比赛中首次出现的先后排列，
+        因此同一数据集的结果（包括队伍顺序）与缓存的历史无关
+        """
+        team_order = dict.fromkeys(
+            match_stat.team_no for match_stat in self.match_store.query(match_filter)
+        )
+        if self.partials is not None and sections is None:
+            team_partials = self.partials.team_partials(match_filter, team_nos)
+            return update_team_statistics_from_partials(
+                team_statistics, team_nos, team_partials, team_order
+            )
+        teams_matches = {
+            team_no: match_filter.select(self.match_store.get_team_matches(team_no))
+            for team_no in team_nos
+        }
+        return update_team_statistics(
+            team_statistics, teams_matches, sections, team_order
+        )
+
+    def current_entries(self) -> Dict[MatchFilter, List[TeamStatistics]]:
+        """当前数据集版本下的所有缓存项，过滤条件 -> 队伍统计数据"""
+        version = self.match_store.version
+        with self._lock:
+            return {
+                key[0]: team_statistics
+                for key, team_statistics in self._entries.items()
+                if key[1] == version
+            }
+
+    def seed(
+        self,
+        match_filter: MatchFilter,
+        team_statistics: List[TeamStatistics],
+        version: int,
+    ) -> bool:
+        """
+        放入预先计算好的缓存项（如启动时从磁盘恢复的结果）
+
+        version 必须仍是当前数据集版本，否则不放入并返回False
+        """
+        with self._lock:
+            if version != self.match_store.version:
+                return False
+            self._entries[(match_filter, version)] = team_statistics
+            self._entries.move_to_end((match_filter, version))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def replace(
+        self,
+        match_filter: MatchFilter,
+        expected: List[TeamStatistics],
+        team_statistics: List[TeamStatistics],
+        version: int,
+    ) -> bool:
+        """
+        仅当缓存项仍是 expected 且版本未变时替换为 team_statistics
+
+        替换失败时（期间数据已变更）移除该过滤条件的缓存项，下次请求重新计算
+        """
+        key = (match_filter, version)
+        with self._lock:
+            if (
+                version == self.match_store.version
+                and self._entries.get(key) is expected
+            ):
+                self._entries[key] = team_statistics
+                self.generation += 1
+                return True
+            for stale_key in [k for k in self._entries if k[0] == match_filter]:
+                del self._entries[stale_key]
+            return False
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._partial_entries.clear()
+            self._rank_tables.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "incremental_updates": self.incremental_updates,
+                "partial_entries": len(self._partial_entries),
+                "section_computations": self.section_computations,
+                "rank_tables": len(self._rank_tables),
+                "dataset_version": self.match_store.version,
+            }
@@ -0,0 +1,781 @@
+"""
+基于 NumPy 的向量化队伍统计聚合
+
+先把所有比赛一次性展开为 比赛×特征 的位掩码矩阵、计数矩阵，以及周期级的
+时间数组（每个周期记录所属比赛和序号），之后各项统计都是按队伍分组的
+求和、中位数和带场次的最值，不再逐场逐项计算。
+
+结果与 aggregate_team_statistics 中的逐场实现完全一致：
+- 浮点数总和用 np.bincount 按原实现的顺序逐项累加（不使用成对求和）
+- 平均值和中位数最后在 Python 中按 statistics 模块的规则取值，保留 int/float 类型
+- 最值取第一次出现的场次，与 max()/list.index() 的结果相同
+
+未安装 NumPy，或某场比赛的周期数超过63个（位掩码放不进 uint64）时返回 None，
+由调用方改用逐场实现。
+"""
+
+import sys
+from array import array
+from operator import attrgetter
+from typing import Dict, List, Optional
+from backend.schema.match_statistics_schema import MatchStatistics, iter_mask
+from backend.schema.team_statistics_schema import (
+    TeamStatistics,
+    create_team_statistics,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Python 3.12 起内置 sum() 对浮点数使用补偿求和，单场的时间总和只能仍由 sum() 计算
+_SEQUENTIAL_FLOAT_SUM = sys.version_info < (3, 12)
+
+# 单场周期数上限，保证 (1 << 周期数) - 1 不超出 uint64
+_MAX_CYCLES = 63
+
+# 位掩码矩阵的列
+(
+    _C_AUTO,
+    _C_STACK_L1,
+    _C_L1,
+    _C_L2,
+    _C_L3,
+    _C_L4,
+    _C_SUCCESS,
+    _C_DEFENDED,
+    _A_AUTO,
+    _A_PLACE_NET,
+    _A_SHOOT_NET,
+    _A_PROCESSOR,
+    _A_LAST_SEC_PROCESSOR,
+    _A_TACTICAL,
+    _A_SUCCESS,
+    _A_DEFENDED,
+) = range(16)
+
+# 计数矩阵的列
+(
+    _LEAVE,
+    _CORAL_GROUND,
+    _CORAL_LOAD_STATION,
+    _ALGAE_AUTO_PROCESS,
+    _ALGAE_SCRAPE,
+    _ALGAE_REEF,
+    _ALGAE_FRONT,
+    _ALGAE_MIDDLE,
+    _ALGAE_BACK,
+    _CORAL_CYCLES,
+    _ALGAE_CYCLES,
+) = range(11)
+
+if np is not None and hasattr(np, "bitwise_count"):
+
+    def _popcount(values):
+        return np.bitwise_count(values).astype(np.int64)
+
+elif np is not None:
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], np.int64)
+
+    def _popcount(values):
+        values = np.ascontiguousarray(values, dtype=np.uint64)
+        return _BYTE_POPCOUNT[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def _mean(total: int, count: int):
+    """整数数据的平均值，与 statistics.mean 一致（能整除时返回 int）"""
+    return total // count if total % count == 0 else total / count
+
+
+def _grouped_medians(groups, values, n_groups: int) -> list:
+    """每组的中位数，与 statistics.median 一致，空组为 None"""
+    sorted_values = values[np.lexsort((values, groups))].tolist()
+    result = []
+    start = 0
+    for count in np.bincount(groups, minlength=n_groups).tolist():
+        if count == 0:
+            result.append(None)
+        elif count % 2 == 1:
+            result.append(sorted_values[start + count // 2])
+        else:
+            i = start + count // 2
+            result.append((sorted_values[i - 1] + sorted_values[i]) / 2)
+        start += count
+    return result
+
+
+def _grouped_first(groups, keys, n_groups: int) -> list:
+    """每组中 key 最小且最先出现的元素下标，空组为 -1"""
+    if len(keys) == 0:
+        return [-1] * n_groups
+    order = np.lexsort((keys, groups))
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.minimum(np.cumsum(counts) - counts, len(order) - 1)
+    return np.where(counts > 0, order[starts], -1).tolist()
+
+
+def _split_rows(groups, selected, n_groups: int) -> List[list]:
+    """按组拆分满足条件的行号，组内保持原顺序"""
+    rows = np.flatnonzero(selected)
+    bounds = np.searchsorted(groups[rows], np.arange(1, n_groups))
+    return [part.tolist() for part in np.split(rows, bounds)]
+
+
+def calculate_teams_statistics_vectorized(
+    teams_matches: Dict[int, List[MatchStatistics]],
+) -> Optional[List[TeamStatistics]]:
+    """
+    向量化计算各队伍的统计数据（不含排名）
+
+    Args:
+        teams_matches: 队伍号 -> 该队伍的比赛列表（均不为空）
+
+    Returns:
+        与 teams_matches 顺序相同的队伍统计数据列表，无法向量化时返回None
+    """
+    if np is None or not teams_matches or not all(teams_matches.values()):
+        return None
+
+    # 1. 展开为特征矩阵和周期数组（唯一的逐场循环）
+    mask_rows = []
+    count_rows = []
+    float_rows = []
+    statuses = []
+    climb_durations = []
+    match_nos = []
+    tournament_levels = []
+    coral_times = array("d")
+    algae_times = array("d")
+    team_sizes = []
+    for matches in teams_matches.values():
+        team_sizes.append(len(matches))
+        for match in matches:
+            coral = match.score_coral
+            algae = match.score_algae
+            intake_algae = match.intake_algae
+            mask_rows.append(
+                (
+                    coral.auto_mask,
+                    coral.stack_l1_mask,
+                    coral.l1_mask,
+                    coral.l2_mask,
+                    coral.l3_mask,
+                    coral.l4_mask,
+                    coral.successful_mask,
+                    coral.defended_mask,
+                    algae.auto_mask,
+                    algae.place_net_mask,
+                    algae.shoot_net_mask,
+                    algae.processor_mask,
+                    algae.last_sec_processor_mask,
+                    algae.tactical_mask,
+                    algae.success_mask,
+                    algae.defended_mask,
+                )
+            )
+            count_rows.append(
+                (
+                    1 if match.leave else 0,
+                    match.intake_coral.teleop_ground_cnt,
+                    match.intake_coral.teleop_load_station_cnt,
+                    intake_algae.auto_reef_cnt + intake_algae.auto_scrape_cnt,
+                    intake_algae.teleop_scrape_cnt,
+                    intake_algae.teleop_reef_cnt,
+                    intake_algae.teleop_ground_front_cnt,
+                    intake_algae.teleop_ground_middle_cnt,
+                    intake_algae.teleop_ground_back_cnt,
+                    len(coral.cycle_times),
+                    len(algae.cycle_times),
+                )
+            )
+            if _SEQUENTIAL_FLOAT_SUM:
+                float_rows.append(
+                    (
+                        match.climb_up.time,
+                        match.climb_up.duration,
+                        match.get_defense_total_time(),
+                        match.get_give_up_total_time(),
+                    )
+                )
+            else:
+                branch_mask = coral.l2_mask | coral.l3_mask | coral.l4_mask
+                float_rows.append(
+                    (
+                        match.climb_up.time,
+                        match.climb_up.duration,
+                        match.get_defense_total_time(),
+                        match.get_give_up_total_time(),
+                        match.get_coral_teleop_time(),
+                        match.get_algae_teleop_time(),
+                        sum(coral.cycle_times[i] for i in iter_mask(branch_mask)),
+                    )
+                )
+            statuses.append(match.climb_up.status)
+            climb_durations.append(match.climb_up.duration)
+            match_nos.append(match.match_no)
+            tournament_levels.append(match.tournament_level)
+            coral_times.extend(coral.cycle_times)
+            algae_times.extend(algae.cycle_times)
+
+    try:
+        masks = np.array(mask_rows, dtype=np.uint64)
+    except OverflowError:
+        return None
+    counts = np.array(count_rows, dtype=np.int64)
+    floats = np.array(float_rows, dtype=np.float64)
+    statuses = np.array(statuses, dtype=object)
+    if max(counts[:, _CORAL_CYCLES].max(), counts[:, _ALGAE_CYCLES].max()) > (
+        _MAX_CYCLES
+    ):
+        return None
+
+    n_teams = len(team_sizes)
+    n_matches = len(mask_rows)
+    group = np.repeat(np.arange(n_teams), team_sizes)
+    group_starts = np.cumsum(team_sizes) - team_sizes
+
+    def team_sum(values) -> list:
+        return np.bincount(group, weights=values, minlength=n_teams).tolist()
+
+    def team_int_sum(values) -> list:
+        return np.add.reduceat(np.asarray(values, np.int64), group_starts).tolist()
+
+    def first_max_rows(values) -> list:
+        return _grouped_first(group, -np.asarray(values, np.int64), n_teams)
+
+    def pc(values):
+        return _popcount(values)
+
+    c_auto = masks[:, _C_AUTO]
+    c_stack_l1 = masks[:, _C_STACK_L1]
+    c_l1 = masks[:, _C_L1]
+    c_l2 = masks[:, _C_L2]
+    c_l3 = masks[:, _C_L3]
+    c_l4 = masks[:, _C_L4]
+    c_success = masks[:, _C_SUCCESS]
+    c_defended = masks[:, _C_DEFENDED]
+    a_auto = masks[:, _A_AUTO]
+    a_place_net = masks[:, _A_PLACE_NET]
+    a_shoot_net = masks[:, _A_SHOOT_NET]
+    a_processor = masks[:, _A_PROCESSOR]
+    a_last_sec_processor = masks[:, _A_LAST_SEC_PROCESSOR]
+    a_tactical = masks[:, _A_TACTICAL]
+    a_success = masks[:, _A_SUCCESS]
+    a_defended = masks[:, _A_DEFENDED]
+    c_all = np.left_shift(
+        np.uint64(1), counts[:, _CORAL_CYCLES].astype(np.uint64)
+    ) - np.uint64(1)
+    c_teleop = c_all & ~c_auto
+    a_all = np.left_shift(
+        np.uint64(1), counts[:, _ALGAE_CYCLES].astype(np.uint64)
+    ) - np.uint64(1)
+    a_teleop = a_all & ~a_auto
+
+    # 周期级数组：所属比赛、在该场中的序号、时间
+    coral_cycle_row = np.repeat(np.arange(n_matches), counts[:, _CORAL_CYCLES])
+    coral_cycle_pos = (
+        np.arange(len(coral_cycle_row))
+        - np.repeat(
+            np.cumsum(counts[:, _CORAL_CYCLES]) - counts[:, _CORAL_CYCLES],
+            counts[:, _CORAL_CYCLES],
+        )
+    ).astype(np.uint64)
+    coral_cycle_times = np.array(coral_times, dtype=np.float64)
+    algae_cycle_row = np.repeat(np.arange(n_matches), counts[:, _ALGAE_CYCLES])
+    algae_cycle_pos = (
+        np.arange(len(algae_cycle_row))
+        - np.repeat(
+            np.cumsum(counts[:, _ALGAE_CYCLES]) - counts[:, _ALGAE_CYCLES],
+            counts[:, _ALGAE_CYCLES],
+        )
+    ).astype(np.uint64)
+    algae_cycle_times = np.array(algae_times, dtype=np.float64)
+
+    def coral_cycles(mask):
+        return ((mask[coral_cycle_row] >> coral_cycle_pos) & np.uint64(1)).astype(bool)
+
+    def algae_cycles(mask):
+        return ((mask[algae_cycle_row] >> algae_cycle_pos) & np.uint64(1)).astype(bool)
+
+    def coral_cycle_medians(mask) -> list:
+        selected = coral_cycles(mask)
+        return _grouped_medians(
+            group[coral_cycle_row[selected]], coral_cycle_times[selected], n_teams
+        )
+
+    # 2. 按比赛计算的特征
+    if _SEQUENTIAL_FLOAT_SUM:
+        selected = coral_cycles(c_teleop)
+        coral_time = np.bincount(
+            coral_cycle_row[selected],
+            weights=coral_cycle_times[selected],
+            minlength=n_matches,
+        )
+        selected = algae_cycles(a_teleop)
+        algae_time = np.bincount(
+            algae_cycle_row[selected],
+            weights=algae_cycle_times[selected],
+            minlength=n_matches,
+        )
+        selected = coral_cycles(c_l2 | c_l3 | c_l4)
+        branch_time = np.bincount(
+            coral_cycle_row[selected],
+            weights=coral_cycle_times[selected],
+            minlength=n_matches,
+        )
+    else:
+        coral_time = floats[:, 4]
+        algae_time = floats[:, 5]
+        branch_time = floats[:, 6]
+
+    is_success = statuses == "success"
+    is_failure = statuses == "failure"
+    is_hit_chain = statuses == "hit_chain"
+    is_park = statuses == "park"
+    is_parked = (
+        is_success | is_park | (statuses == "fail") | (statuses == "touch_chain")
+    )
+    leave = counts[:, _LEAVE]
+
+    c_low = c_l1 | c_stack_l1
+    c_success_auto = c_success & c_auto
+    a_net = a_place_net | a_shoot_net
+    a_success_processor = pc(a_success & a_processor)
+    a_success_place_net = pc(a_success & a_place_net)
+    a_success_shoot_net = pc(a_success & a_shoot_net)
+    epa = (
+        leave * 3
+        + pc(c_success_auto & (c_l3 | c_l4)) * 2
+        + pc(c_success_auto & (c_l1 | c_l2 | c_stack_l1))
+        + pc(c_success & c_low & ~c_auto) * 2
+        + a_success_processor * 2
+        + a_success_place_net * 4
+        + a_success_shoot_net * 4
+        + pc(a_success & a_last_sec_processor) * 2
+        + is_success * 10
+    )
+    ppg = (
+        leave * 3
+        + pc(c_success & c_low) * 2
+        + pc(c_success_auto & c_low)
+        + pc(c_success & c_l2) * 3
+        + pc(c_success_auto & c_l2)
+        + pc(c_success & c_l3) * 4
+        + pc(c_success_auto & c_l3) * 2
+        + pc(c_success & c_l4) * 5
+        + pc(c_success_auto & c_l4) * 2
+        + a_success_processor * 6
+        + pc(a_success & a_net) * 4
+        + is_success * 12
+        + is_park * 2
+    )
+    auto_high_mid = pc(c_success_auto & (c_l3 | c_l4))
+    auto_low_slot = pc(c_success_auto & (c_stack_l1 | c_l1 | c_l2))
+    auto_net_place = pc(a_success & a_auto & a_net)
+    auto_algae_process = counts[:, _ALGAE_AUTO_PROCESS]
+    coral_levels = [
+        ("l1", c_l1, 0),
+        ("l2", c_l2, 0),
+        ("l3", c_l3, 0.0),
+        ("l4", c_l4, 0),
+        ("stack_l1", c_stack_l1, 0),
+    ]
+    level_success = [pc(c_success & mask & ~c_auto) for _, mask, _ in coral_levels]
+    level_attempt = [pc(mask & ~c_auto) for _, mask, _ in coral_levels]
+    algae_cycle_success = pc(a_success & ~a_auto)
+    tactical = pc(a_tactical)
+    processor = pc(a_processor)
+    teleop_defended = pc(c_teleop & c_defended)
+
+    # 3. 按队伍分组归约
+    coral_time_sum = team_sum(coral_time)
+    algae_time_sum = team_sum(algae_time)
+    defense_time_sum = team_sum(floats[:, 2])
+    give_up_time_sum = team_sum(floats[:, 3])
+
+    success_rows = _split_rows(group, is_success, n_teams)
+    failure_rows = _split_rows(group, is_failure, n_teams)
+    hit_chain_rows = _split_rows(group, is_hit_chain, n_teams)
+    park_time_medians = _grouped_medians(
+        group[is_parked], floats[is_parked, 0] / 1000, n_teams
+    )
+    climb_keys = np.where(floats[:, 1] > 0, floats[:, 1], 151.0)[is_success]
+    climb_min_rows = np.flatnonzero(is_success)
+    climb_min = [
+        climb_min_rows[i].item() if i >= 0 else -1
+        for i in _grouped_first(group[is_success], climb_keys, n_teams)
+    ]
+
+    branch_sum = team_int_sum(pc(c_success & (c_l2 | c_l3 | c_l4)))
+    branch_time_sum = team_sum(branch_time)
+    epa_sum = team_int_sum(epa)
+    ppg_sum = team_int_sum(ppg)
+    ppg_max = first_max_rows(ppg)
+    ppg = ppg.tolist()
+
+    leave_sum = team_int_sum(leave)
+    preload_sum = team_int_sum((c_success_auto & np.uint64(1)) != 0)
+    auto_high_mid_sum = team_int_sum(auto_high_mid)
+    auto_high_mid_total = team_int_sum(pc(c_auto & (c_l3 | c_l4)))
+    auto_low_slot_sum = team_int_sum(auto_low_slot)
+    auto_low_slot_total = team_int_sum(pc(c_auto & c_low))
+    auto_maxes = [
+        ("auto_high_mid_coral_max", auto_high_mid),
+        ("auto_low_slot_coral_max", auto_low_slot),
+        ("auto_net_place_max", auto_net_place),
+        ("auto_algae_process_max", auto_algae_process),
+    ]
+    auto_max_rows = [first_max_rows(values) for _, values in auto_maxes]
+    auto_maxes = [(name, values.tolist()) for name, values in auto_maxes]
+
+    level_success_sum = [team_int_sum(values) for values in level_success]
+    level_attempt_sum = [team_int_sum(values) for values in level_attempt]
+    total_success_sum = team_int_sum(sum(level_success))
+    total_attempt_sum = team_int_sum(sum(level_attempt))
+    undefended_selected = []
+    for _, mask, _ in coral_levels:
+        undefended_selected.append(
+            coral_cycles(c_success & mask & ~c_auto & ~c_defended)
+        )
+    level_cycle_medians = [
+        _grouped_medians(
+            group[coral_cycle_row[selected]], coral_cycle_times[selected], n_teams
+        )
+        for selected in undefended_selected
+    ]
+    all_cycle_medians = _grouped_medians(
+        np.concatenate(
+            [group[coral_cycle_row[selected]] for selected in undefended_selected]
+        ),
+        np.concatenate(
+            [coral_cycle_times[selected] for selected in undefended_selected]
+        ),
+        n_teams,
+    )
+    coral_ground_sum = team_int_sum(counts[:, _CORAL_GROUND])
+    coral_station_sum = team_int_sum(counts[:, _CORAL_LOAD_STATION])
+
+    scrape_sum = team_int_sum(counts[:, _ALGAE_SCRAPE])
+    reef_sum = team_int_sum(counts[:, _ALGAE_REEF])
+    front_sum = team_int_sum(counts[:, _ALGAE_FRONT])
+    middle_sum = team_int_sum(counts[:, _ALGAE_MIDDLE])
+    back_sum = team_int_sum(counts[:, _ALGAE_BACK])
+    algae_cycle_success_medians = _grouped_medians(
+        group, algae_cycle_success, n_teams
+    )
+    algae_cycle_success_max = first_max_rows(algae_cycle_success)
+    algae_cycle_success = algae_cycle_success.tolist()
+    shoot_net_sum = team_int_sum(pc(a_shoot_net))
+    place_net_sum = team_int_sum(pc(a_place_net))
+    shoot_net_success_sum = team_int_sum(a_success_shoot_net)
+    place_net_success_sum = team_int_sum(a_success_place_net)
+    selected = algae_cycles(a_success & a_net & ~a_defended)
+    net_cycle_medians = _grouped_medians(
+        group[algae_cycle_row[selected]], algae_cycle_times[selected], n_teams
+    )
+    tactical_max = first_max_rows(tactical)
+    tactical = tactical.tolist()
+    last_second_rows = _split_rows(
+        group, (a_last_sec_processor & a_success) != 0, n_teams
+    )
+    processor_max = first_max_rows(processor)
+    processor = processor.tolist()
+
+    teleop_success_sum = team_int_sum(pc(c_teleop & c_success))
+    teleop_defended_sum = team_int_sum(teleop_defended)
+    teleop_undefended_sum = team_int_sum(pc(c_teleop & ~c_defended))
+    teleop_defended_max = first_max_rows(teleop_defended)
+    teleop_defended = teleop_defended.tolist()
+    selected = coral_cycles(c_teleop & c_defended & c_success)
+    defended_cycle_groups = group[coral_cycle_row[selected]]
+    defended_cycle_times = coral_cycle_times[selected]
+    defended_cycle_rows = coral_cycle_row[selected]
+    defended_max = [
+        (defended_cycle_times[i].item(), defended_cycle_rows[i].item())
+        if i >= 0
+        else None
+        for i in _grouped_first(
+            defended_cycle_groups, -defended_cycle_times, n_teams
+        )
+    ]
+    defended_medians = _grouped_medians(
+        defended_cycle_groups, defended_cycle_times, n_teams
+    )
+    undefended_medians = coral_cycle_medians(c_teleop & ~c_defended & c_success)
+
+    # 4. 组装各队伍的统计数据
+    team_statistics = []
+    for t, team_no in enumerate(teams_matches):
+        n = team_sizes[t]
+        team_stat = create_team_statistics(team_no)
+
+        # 时间占比
+        team_stat.cycle_teleop_coral_time_ratio.value = (coral_time_sum[t] / n) / 135.0
+        team_stat.cycle_teleop_algae_time_ratio.value = (algae_time_sum[t] / n) / 135.0
+        team_stat.cycle_teleop_defense_time_ratio.value = (
+            defense_time_sum[t] / n
+        ) / 135.0
+        team_stat.cycle_teleop_give_up_time_ratio.value = (
+            give_up_time_sum[t] / n
+        ) / 135.0
+
+        # 爬升
+        for match_list, rows in (
+            (team_stat.climb_success_matches, success_rows[t]),
+            (team_stat.climb_fail_matches, failure_rows[t]),
+            (team_stat.climb_touch_chain_matches, hit_chain_rows[t]),
+        ):
+            match_list.match_nos = [match_nos[row] for row in rows]
+            match_list.tournament_levels = [tournament_levels[row] for row in rows]
+        team_stat.climb_park_time_median.value = (
+            park_time_medians[t] if park_time_medians[t] is not None else 150.0
+        )
+        total_attempts = len(success_rows[t]) + len(failure_rows[t]) + len(
+            hit_chain_rows[t]
+        )
+        team_stat.climb_success_percentage.value = (
+            len(success_rows[t]) / total_attempts if total_attempts > 0 else 0.0
+        )
+        row = climb_min[t]
+        if row >= 0:
+            duration = climb_durations[row]
+            team_stat.climb_success_cycle_time_min.value = (
+                duration if duration > 0 else 151
+            )
+            team_stat.climb_success_cycle_time_min.match_no = match_nos[row]
+            team_stat.climb_success_cycle_time_min.tournament_level = (
+                tournament_levels[row]
+            )
+        else:
+            team_stat.climb_success_cycle_time_min.value = 151.0
+
+        # BPS / EPA / PPG
+        team_stat.bps_value.value = (
+            branch_sum[t] / branch_time_sum[t] * 100 if branch_time_sum[t] > 0 else 0
+        )
+        team_stat.epa_value.value = epa_sum[t] / n
+        team_stat.ppg_avg.value = _mean(ppg_sum[t], n)
+        row = ppg_max[t]
+        team_stat.ppg_max_single_match.value = ppg[row]
+        team_stat.ppg_max_single_match.match_no = match_nos[row]
+        team_stat.ppg_max_single_match.tournament_level = tournament_levels[row]
+
+        # 自动阶段
+        team_stat.auto_line_cross_percentage.value = leave_sum[t] / n
+        team_stat.auto_high_mid_coral_success_rate.value = (
+            auto_high_mid_sum[t] / auto_high_mid_total[t]
+            if auto_high_mid_total[t] > 0
+            else 0.0
+        )
+        team_stat.auto_low_slot_coral_success_rate.value = (
+            auto_low_slot_sum[t] / auto_low_slot_total[t]
+            if auto_low_slot_total[t] > 0
+            else 0.0
+        )
+        for (name, values), max_rows in zip(auto_maxes, auto_max_rows):
+            row = max_rows[t]
+            if values[row] > 0:
+                rank_value = getattr(team_stat, name)
+                rank_value.value = values[row]
+                rank_value.match_no = match_nos[row]
+                rank_value.tournament_level = tournament_levels[row]
+        team_stat.auto_preload_coral_percentage.value = preload_sum[t] / n
+
+        # 手动筒
+        for i, (level, _, zero) in enumerate(coral_levels):
+            success_avg = _mean(level_success_sum[i][t], n)
+            attempt_avg = _mean(level_attempt_sum[i][t], n)
+            getattr(team_stat, f"{level}_teleop_success_count_avg").value = success_avg
+            getattr(team_stat, f"{level}_teleop_success_percentage").value = (
+                success_avg / attempt_avg if attempt_avg > 0 else zero
+            )
+            median = level_cycle_medians[i][t]
+            getattr(
+                team_stat, f"{level}_teleop_undefended_success_cycle_time_median"
+            ).value = (median if median is not None else 9999.0)
+        success_avg = _mean(total_success_sum[t], n)
+        attempt_avg = _mean(total_attempt_sum[t], n)
+        team_stat.total_teleop_success_count_avg.value = success_avg
+        team_stat.total_teleop_undefended_success_cycle_time_median.value = (
+            all_cycle_medians[t] if all_cycle_medians[t] is not None else 9999.0
+        )
+        team_stat.total_teleop_success_percentage.value = (
+            success_avg / attempt_avg if attempt_avg > 0 else 0
+        )
+        coral_sources = coral_station_sum[t] + coral_ground_sum[t]
+        team_stat.coral_source_ground_percentage.value = (
+            coral_ground_sum[t] / coral_sources if coral_sources else 0
+        )
+        team_stat.coral_source_station_percentage.value = (
+            coral_station_sum[t] / coral_sources if coral_sources else 0.0
+        )
+
+        # 手动球
+        row = processor_max[t]
+        team_stat.processor_success_max_single_match.value = processor[row]
+        if processor[row] > 0:
+            team_stat.processor_success_max_single_match.match_no = match_nos[row]
+            team_stat.processor_success_max_single_match.tournament_level = (
+                tournament_levels[row]
+            )
+        team_stat.avg_scrape_algae_count.value = _mean(scrape_sum[t], n)
+        team_stat.avg_pickup_algae_count.value = _mean(reef_sum[t], n)
+        team_stat.algae_success_cycle_count_median.value = (
+            algae_cycle_success_medians[t]
+        )
+        row = algae_cycle_success_max[t]
+        team_stat.algae_success_cycle_count_max.value = algae_cycle_success[row]
+        team_stat.algae_success_cycle_count_max.match_no = match_nos[row]
+        team_stat.algae_success_cycle_count_max.tournament_level = (
+            tournament_levels[row]
+        )
+        algae_sources = front_sum[t] + middle_sum[t] + back_sum[t] + reef_sum[t]
+        if algae_sources > 0:
+            team_stat.algae_source_front_percentage.value = front_sum[t] / algae_sources
+            team_stat.algae_source_mid_percentage.value = middle_sum[t] / algae_sources
+            team_stat.algae_source_back_percentage.value = back_sum[t] / algae_sources
+            team_stat.algae_source_reef_percentage.value = reef_sum[t] / algae_sources
+        else:
+            team_stat.algae_source_front_percentage.value = 0.0
+            team_stat.algae_source_mid_percentage.value = 0.0
+            team_stat.algae_source_back_percentage.value = 0.0
+            team_stat.algae_source_reef_percentage.value = 0.0
+        net_attempts = place_net_sum[t] + shoot_net_sum[t]
+        if net_attempts > 0:
+            team_stat.net_place_percentage.value = place_net_sum[t] / net_attempts
+            team_stat.net_shoot_percentage.value = shoot_net_sum[t] / net_attempts
+        else:
+            team_stat.net_place_percentage.value = 0.0
+            team_stat.net_shoot_percentage.value = 0.0
+        team_stat.net_place_success_rate.value = (
+            place_net_success_sum[t] / place_net_sum[t] if place_net_sum[t] > 0 else 0.0
+        )
+        team_stat.net_shoot_success_rate.value = (
+            shoot_net_success_sum[t] / shoot_net_sum[t] if shoot_net_sum[t] > 0 else 0.0
+        )
+        team_stat.net_success_undefended_cycle_time_median.value = (
+            net_cycle_medians[t] if net_cycle_medians[t] is not None else 9999.0
+        )
+        row = tactical_max[t]
+        team_stat.tactical_max_single_match.value = tactical[row]
+        team_stat.tactical_max_single_match.match_no = match_nos[row]
+        team_stat.tactical_max_single_match.tournament_level = tournament_levels[row]
+        team_stat.last_second_processer_matches.match_nos = [
+            match_nos[row] for row in last_second_rows[t]
+        ]
+        team_stat.last_second_processer_matches.tournament_levels = [
+            tournament_levels[row] for row in last_second_rows[t]
+        ]
+
+        # 防守抗性
+        if teleop_success_sum[t] > 0:
+            team_stat.coral_defended_percentage.value = teleop_defended_sum[t] / (
+                teleop_defended_sum[t] + teleop_undefended_sum[t]
+            )
+        else:
+            team_stat.coral_defended_percentage.value = 0.0
+        row = teleop_defended_max[t]
+        team_stat.coral_defended_max_single_match.value = teleop_defended[row]
+        team_stat.coral_defended_max_single_match.match_no = match_nos[row]
+        team_stat.coral_defended_max_single_match.tournament_level = (
+            tournament_levels[row]
+        )
+        if defended_max[t] is not None:
+            max_time, row = defended_max[t]
+            team_stat.defended_success_coral_cycle_time_max.value = max_time
+            team_stat.defended_success_coral_cycle_time_max.match_no = match_nos[row]
+            team_stat.defended_success_coral_cycle_time_max.tournament_level = (
+                tournament_levels[row]
+            )
+            team_stat.defended_success_coral_cycle_time_median.value = (
+                defended_medians[t]
+            )
+        else:
+            team_stat.defended_success_coral_cycle_time_max.value = 9999.0
+            team_stat.defended_success_coral_cycle_time_median.value = 9999.0
+        team_stat.undefended_success_coral_cycle_time_median.value = (
+            undefended_medians[t] if undefended_medians[t] is not None else 9999.0
+        )
+        increase = (
+            team_stat.defended_vs_undefended_success_coral_cycle_time_increase_percentage
+        )
+        if defended_max[t] is not None and undefended_medians[t] is not None:
+            if undefended_medians[t] > 0:
+                increase.value = (
+                    defended_medians[t] - undefended_medians[t]
+                ) / undefended_medians[t]
+            else:
+                increase.value = 0.0
+        else:
+            increase.value = 0.0
+
+        team_statistics.append(team_stat)
+
+    return team_statistics
+
+
+def _tuple_getter(names: List[str]):
+    """与 attrgetter 相同，但只有一个属性时也返回元组"""
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        return lambda obj: (getter(obj),)
+    return getter
+
+
+def calculate_all_ranks_vectorized(
+    team_statistics: List[TeamStatistics], fields_descending: Dict[str, bool]
+) -> bool:
+    """
+    一次计算所有字段的排名并写回各队伍，相同值获得相同排名（1, 2, 2, 4）
+
+    与对每个字段调用 calculate_rank_data 的结果相同。
+
+    Args:
+        team_statistics: 队伍统计数据列表
+        fields_descending: 字段名 -> 是否降序
+
+    Returns:
+        是否已完成排名；未安装NumPy或存在非数值/NaN时返回False，由调用方逐字段排名
+    """
+    if np is None:
+        return False
+    if not team_statistics or not fields_descending:
+        return True
+
+    field_names = list(fields_descending)
+    get_fields = _tuple_getter(field_names)
+    get_values = _tuple_getter([f"{name}.value" for name in field_names])
+
+    # 队伍 × 字段 的数值矩阵
+    try:
+        values = np.array(
+            [get_values(team_stat) for team_stat in team_statistics], dtype=np.float64
+        )
+    except (TypeError, ValueError, OverflowError):
+        return False
+    if np.isnan(values).any():
+        return False
+
+    # 降序字段取负后统一按升序排列
+    descending = np.array([fields_descending[name] for name in field_names])
+    keys = np.where(descending, -values, values)
+    order = np.argsort(keys, axis=0, kind="stable")
+    sorted_keys = np.take_along_axis(keys, order, axis=0)
+
+    # 排序后每个位置的排名 = 所在并列段第一个位置 + 1
+    n_teams = len(team_statistics)
+    positions = np.broadcast_to(np.arange(n_teams)[:, None], keys.shape)
+    run_starts = np.ones(keys.shape, dtype=bool)
+    run_starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    sorted_ranks = np.maximum.accumulate(np.where(run_starts, positions, 0), axis=0) + 1
+
+    ranks = np.empty_like(sorted_ranks)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=0)
+
+    for team_stat, team_ranks in zip(team_statistics, ranks.tolist()):
+        for field_obj, rank in zip(get_fields(team_stat), team_ranks):
+            field_obj.rank = rank
+    return True
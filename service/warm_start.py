@@ -0,0 +1,212 @@
+"""
+聚合结果的热启动快照
+
+把缓存中当前版本的队伍统计数据（含各项排名）连同生成它们时的文件目录和
+聚合逻辑的摘要一起写入单个文件。重启后一次读入，聚合逻辑变化过的快照直接丢弃；
+否则与当前数据集的文件目录（每个文件的队伍号和内容哈希）比对：
+目录一致的结果直接放入缓存立即可用；有文件增删或同名文件内容被改写时
+先照常提供旧结果，同时在后台只重新计算受影响的队伍。
+"""
+
+import os
+import hashlib
+import datetime
+import threading
+import logging
+from dataclasses import fields
+from typing import Dict, List, Optional
+from backend.schema import team_statistics_schema
+from backend.schema.team_statistics_schema import TeamStatistics
+from backend.schema import serialization
+from backend.service import (
+    aggregate_team_statistics,
+    partial_aggregation,
+    vectorized_aggregation,
+)
+from backend.service.match_store import MatchStore
+from backend.service.match_filter import NO_FILTER, compile_filter
+from backend.service.statistics_cache import TeamStatisticsCache
+
+logger = logging.getLogger(__name__)
+
+WARM_START_FORMAT_VERSION = 3
+
+# 字段定义变化后旧快照不再可用
+_SCHEMA_FIELDS = [f.name for f in fields(TeamStatistics)]
+
+# 计算队伍统计数据的模块，其中任何一处计算方式变化后旧快照的数值都不再可信。
+# 不包括 analyze_single_file：它只决定比赛统计数据的内容，重新分析后改写的
+# 文件会改变目录中的内容哈希，相应队伍照常重新计算；未重新分析的文件内容不变，
+# 快照中的结果仍与之一致
+_AGGREGATION_MODULES = (
+    team_statistics_schema,
+    aggregate_team_statistics,
+    partial_aggregation,
+    vectorized_aggregation,
+)
+
+
+def aggregation_digest() -> str:
+    """聚合逻辑的摘要（各聚合模块源码的哈希），随快照保存"""
+    digest = hashlib.sha1()
+    for module in _AGGREGATION_MODULES:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+_AGGREGATION_DIGEST = aggregation_digest()
+
+
+def catalog_digest(catalog: Dict[str, List]) -> str:
+    """文件目录（文件名、队伍号、内容哈希）的摘要，用作持久化的数据集版本标记"""
+    digest = hashlib.sha1()
+    for filename in sorted(catalog):
+        team_no, content_digest = catalog[filename]
+        digest.update(f"{filename}\t{team_no}\t{content_digest}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TeamStatisticsWarmStart:
+    """队伍统计缓存的持久化与启动恢复"""
+
+    def __init__(
+        self, path: str, match_store: MatchStore, cache: TeamStatisticsCache
+    ):
+        self.path = path
+        self.match_store = match_store
+        self.cache = cache
+        self._saved_digest: Optional[str] = None
+        self._saved_filters = set()
+        self._lock = threading.Lock()
+
+    def save(self) -> bool:
+        """把当前版本的缓存项写入快照，内容没有变化时跳过，返回是否写入"""
+        with self._lock:
+            version, catalog = self.match_store.catalog()
+            entries = self.cache.current_entries()
+            if self.match_store.version != version or not entries:
+                # 读取期间数据发生了变化，留到下一次
+                return False
+            digest = catalog_digest(catalog)
+            if digest == self._saved_digest and set(entries) <= self._saved_filters:
+                return False
+
+            payload = {
+                "format_version": WARM_START_FORMAT_VERSION,
+                "schema": _SCHEMA_FIELDS,
+                "aggregation": _AGGREGATION_DIGEST,
+                "created_at": datetime.datetime.now().isoformat(),
+                "dataset_version": digest,
+                "catalog": catalog,
+                "entries": [
+                    {
+                        "tournament_levels": list(match_filter.tournament_levels),
+                        "match_range": match_filter.match_range_expression,
+                        "window": match_filter.window,
+                        "teams": [team_stat.to_dict() for team_stat in team_statistics],
+                    }
+                    for match_filter, team_statistics in entries.items()
+                ],
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            serialization.dump_file(tmp_path, payload)
+            os.replace(tmp_path, self.path)
+
+            self._saved_digest = digest
+            self._saved_filters = set(entries)
+            logger.info(f"已保存 {len(entries)} 组队伍统计数据到 {self.path}")
+            return True
+
+    def restore(self) -> int:
+        """
+        从快照恢复缓存，返回恢复的过滤条件数
+
+        与当前文件目录不一致的部分在后台线程中重新计算
+        """
+        entries = []
+        stale_teams = set()
+        try:
+            entries, stale_teams = self._load()
+        except Exception as e:
+            logger.error(f"读取热启动快照 {self.path} 时出错: {str(e)}")
+
+        version = self.match_store.version
+        restored = []
+        for match_filter, team_statistics in entries:
+            if self.cache.seed(match_filter, team_statistics, version):
+                restored.append((match_filter, team_statistics))
+        if restored and not stale_teams:
+            # 快照与当前数据一致，无需立即重写
+            self._saved_digest = catalog_digest(self.match_store.catalog()[1])
+            self._saved_filters = {match_filter for match_filter, _ in restored}
+        if restored:
+            logger.info(
+                f"已从热启动快照恢复 {len(restored)} 组队伍统计数据，"
+                f"需要重新计算的队伍 {len(stale_teams)} 支"
+            )
+
+        if stale_teams or NO_FILTER not in dict(restored):
+            threading.Thread(
+                target=self._refresh,
+                args=(restored if stale_teams else [], stale_teams, version),
+                name="warm-start-refresh",
+                daemon=True,
+            ).start()
+        return len(restored)
+
+    def _load(self):
+        """读取快照，返回 ([(过滤条件, 队伍统计数据)], 受影响的队伍号集合)"""
+        if not os.path.exists(self.path):
+            return [], set()
+        payload = serialization.load_file(self.path)
+        if (
+            payload.get("format_version") != WARM_START_FORMAT_VERSION
+            or payload.get("schema") != _SCHEMA_FIELDS
+            or payload.get("aggregation") != _AGGREGATION_DIGEST
+        ):
+            logger.warning("热启动快照的格式、字段定义或聚合逻辑已变化，忽略快照")
+            return [], set()
+
+        _, catalog = self.match_store.catalog()
+        saved_catalog = payload.get("catalog", {})
+        stale_teams = set()
+        if payload.get("dataset_version") != catalog_digest(catalog):
+            # 新增、删除或内容被改写的文件，改写前后的队伍都需要重新计算
+            for filename in saved_catalog.keys() | catalog.keys():
+                saved = saved_catalog.get(filename)
+                current = catalog.get(filename)
+                if saved != current:
+                    for item in (saved, current):
+                        if item is not None:
+                            stale_teams.add(item[0])
+
+        entries = []
+        for entry in payload.get("entries", []):
+            match_filter = compile_filter(
+                entry.get("tournament_levels", []),
+                entry.get("match_range"),
+                window=entry.get("window"),
+            )
+            team_statistics = [
+                TeamStatistics._from_dict(data) for data in entry.get("teams", [])
+            ]
+            entries.append((match_filter, team_statistics))
+        return entries, stale_teams
+
+    def _refresh(self, restored, stale_teams, version: int) -> None:
+        """后台重新计算过期的队伍，并预热默认过滤条件"""
+        try:
+            for match_filter, team_statistics in restored:
+                # 恢复的列表已在缓存中供请求读取，重新计算只在复制的对象上排名，
+                # replace 失败时原列表保持不变
+                refreshed = self.cache.recompute_teams(
+                    match_filter, team_statistics, stale_teams
+                )
+                self.cache.replace(match_filter, team_statistics, refreshed, version)
+            # 默认（不过滤）的结果没有缓存时提前算好
+            self.cache.get(NO_FILTER)
+            logger.info("热启动快照的后台刷新完成")
+        except Exception as e:
+            logger.error(f"热启动快照后台刷新失败: {str(e)}")
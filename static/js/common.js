@@ -68,22 +68,52 @@ function hideSuccess() {
     }
 }
 
+// GET 响应的本地副本：url -> { etag, body }，再次请求时带上 If-None-Match，
+// 服务器返回 304 时直接使用本地副本
+const apiResponseCache = new Map();
+const API_RESPONSE_CACHE_MAX_ENTRIES = 50;
+
 // API 请求封装
 async function apiRequest(url, options = {}) {
     try {
+        const method = (options.method || 'GET').toUpperCase();
+        const cached = method === 'GET' ? apiResponseCache.get(url) : undefined;
+        const headers = {
+            'Content-Type': 'application/json',
+            ...options.headers
+        };
+        if (cached) {
+            headers['If-None-Match'] = cached.etag;
+        }
+
         const response = await fetch(url, {
-            headers: {
-                'Content-Type': 'application/json',
-                ...options.headers
-            },
-            ...options
+            ...options,
+            headers
         });
-        
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
+
+        let body;
+        if (response.status === 304 && cached) {
+            body = cached.body;
+            // 最近使用的放到最后
+            apiResponseCache.delete(url);
+            apiResponseCache.set(url, cached);
+        } else {
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            body = await response.text();
+            const etag = response.headers.get('ETag');
+            if (method === 'GET' && etag) {
+                apiResponseCache.delete(url);
+                apiResponseCache.set(url, { etag, body });
+                if (apiResponseCache.size > API_RESPONSE_CACHE_MAX_ENTRIES) {
+                    apiResponseCache.delete(apiResponseCache.keys().next().value);
+                }
+            }
         }
-        
-        const data = await response.json();
+
+        // 每次重新解析，调用方修改返回的数据不会影响本地副本
+        const data = JSON.parse(body);
         if (!data.success) {
             throw new Error(data.message || '请求失败');
         }
@@ -229,46 +259,20 @@ function getSelectedTournamentLevels() {
     return Array.from(checkboxes).map(cb => cb.value);
 }
 
-// 解析match_no范围表达式（如1-7,9-11,15）
-function parseMatchFilter(filterStr) {
-    if (!filterStr || !filterStr.trim()) {
-        return [];
-    }
-    
-    const matchNos = [];
-    const parts = filterStr.split(',');
-    
-    for (const part of parts) {
-        const trimmed = part.trim();
-        if (!trimmed) continue;
-        
-        if (trimmed.includes('-')) {
-            // 处理范围，如 1-7
-            const [start, end] = trimmed.split('-').map(s => parseInt(s.trim()));
-            if (!isNaN(start) && !isNaN(end) && start <= end) {
-                for (let i = start; i <= end; i++) {
-                    matchNos.push(i);
-                }
-            }
-        } else {
-            // 处理单个数字，如 15
-            const num = parseInt(trimmed);
-            if (!isNaN(num)) {
-                matchNos.push(num);
-            }
-        }
-    }
+// 获取match_no范围表达式（如1-7,9-11,15），由服务端解析
+function getMatchFilter(elementId = 'match-filter') {
+    const input = document.getElementById(elementId);
+    if (!input) return '';
     
-    // 去重并排序
-    return [...new Set(matchNos)].sort((a, b) => a - b);
+    return input.value.trim();
 }
 
-// 获取match_no过滤条件
-function getMatchFilter(elementId = 'match-filter') {
+// 获取最近场次窗口（每支队伍只统计最近N场），留空返回空字符串
+function getMatchWindow(elementId = 'match-window') {
     const input = document.getElementById(elementId);
-    if (!input) return [];
-    
-    return parseMatchFilter(input.value);
+    if (!input) return '';
+
+    return input.value.trim();
 }
 
 // 设置选中的队伍
@@ -354,6 +354,7 @@ async function refreshData() {
         const selectedTeams = getSelectedTeams();
         const selectedLevels = getSelectedTournamentLevels();
         const matchFilter = getMatchFilter('match-filter');
+        const matchWindow = getMatchWindow('match-window');
         
         if (selectedTeams.length === 0) {
             showError('请至少选择一个队伍');
@@ -365,7 +366,12 @@ async function refreshData() {
         const params = new URLSearchParams();
         selectedTeams.forEach(team => params.append('teams', team));
         selectedLevels.forEach(level => params.append('tournament_levels', level));
-        matchFilter.forEach(matchNo => params.append('match_nos', matchNo));
+        if (matchFilter) {
+            params.append('match_range', matchFilter);
+        }
+        if (matchWindow) {
+            params.append('window', matchWindow);
+        }
         
         // 获取队伍统计数据
         const response = await apiRequest('/api/team-statistics?' + params.toString());
@@ -532,6 +532,7 @@ async function refreshRanking() {
         const selectedAttributes = getSelectedRankingAttributes();
         const selectedLevels = getSelectedTournamentLevels();
         const matchFilter = getMatchFilter('match-filter-ranking');
+        const matchWindow = getMatchWindow('match-window-ranking');
         
         if (selectedAttributes.length === 0) {
             showError('请至少选择一个排名属性');
@@ -543,7 +544,12 @@ async function refreshRanking() {
         const params = new URLSearchParams();
         selectedAttributes.forEach(attr => params.append('attributes', attr.key));
         selectedLevels.forEach(level => params.append('tournament_levels', level));
-        matchFilter.forEach(matchNo => params.append('match_nos', matchNo));
+        if (matchFilter) {
+            params.append('match_range', matchFilter);
+        }
+        if (matchWindow) {
+            params.append('window', matchWindow);
+        }
         
         // 单次调用接口获取所有属性的排名数据
         const response = await apiRequest('/api/rankings?' + params.toString());
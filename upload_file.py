@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-单文件上传脚本 - 将本地JSON文件上传到FRC Scout接口
+文件上传脚本 - 将本地JSON文件上传到FRC Scout接口
+单个文件使用 /api/match-records，多个文件使用批量接口 /api/match-records/batch
 """
 
 import requests
@@ -8,7 +9,7 @@ import json
 import sys
 import os
 import argparse
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 
 def validate_json_data(data: Dict[str, Any]) -> bool:
@@ -74,12 +75,14 @@ def upload_file(file_path: str, host: str = "localhost", port: int = 5000) -> bo
         )
 
         # 处理响应
-        if response.status_code == 201:
+        if response.status_code in (201, 202):
             result = response.json()
             print("✅ 上传成功!")
             print(f"   文件名: {result.get('filename', 'N/A')}")
             print(f"   时间戳: {result.get('timestamp', 'N/A')}")
             print(f"   消息: {result.get('message', 'N/A')}")
+            if result.get("job_id"):
+                print(f"   分析任务: {result.get('status_url', result['job_id'])}")
             return True
         else:
             print(f"❌ 上传失败 (状态码: {response.status_code})")
@@ -102,6 +105,62 @@ def upload_file(file_path: str, host: str = "localhost", port: int = 5000) -> bo
         return False
 
 
+def upload_files_batch(
+    file_paths: List[str], host: str = "localhost", port: int = 5000
+) -> bool:
+    """通过批量接口一次性上传多个文件"""
+    records = []
+    for file_path in file_paths:
+        data = read_and_validate_file(file_path)
+        if data:
+            records.append(data)
+    if not records:
+        print("❌ 没有可上传的文件")
+        return False
+
+    # 构建URL
+    url = f"https://{host}/api/match-records/batch"
+
+    try:
+        print(f"📤 正在批量上传 {len(records)} 个文件到: {url}")
+
+        response = requests.post(
+            url, json=records, headers={"Content-Type": "application/json"}, timeout=120
+        )
+
+        if response.status_code == 200:
+            result = response.json()
+            print(
+                f"✅ 批量上传完成: 成功 {result.get('success_count', 0)} 个，"
+                f"失败 {result.get('error_count', 0)} 个"
+            )
+            for item in result.get("results", []):
+                if not item.get("success"):
+                    print(f"   第 {item.get('index')} 条失败: {item.get('message')}")
+            return result.get("error_count", 0) == 0 and len(records) == len(
+                file_paths
+            )
+        else:
+            print(f"❌ 批量上传失败 (状态码: {response.status_code})")
+            try:
+                error_data = response.json()
+                print(f"   错误信息: {error_data.get('message', '未知错误')}")
+            except:
+                print(f"   响应内容: {response.text}")
+            return False
+
+    except requests.exceptions.ConnectionError:
+        print(f"❌ 连接失败: 无法连接到 {url}")
+        print("   请确保服务器正在运行")
+        return False
+    except requests.exceptions.Timeout:
+        print("❌ 请求超时")
+        return False
+    except Exception as e:
+        print(f"❌ 上传过程中发生错误: {e}")
+        return False
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(
@@ -112,10 +171,17 @@ def main():
   python upload_file.py --file match_record.json
   python upload_file.py --file match_record.json --host 192.168.1.100 --port 8080
   python upload_file.py -f match_record.json -H localhost -p 5000
+  python upload_file.py -f queued/*.json    # 多个文件走批量接口
         """,
     )
 
-    parser.add_argument("-f", "--file", required=True, help="要上传的JSON文件路径")
+    parser.add_argument(
+        "-f",
+        "--file",
+        required=True,
+        nargs="+",
+        help="要上传的JSON文件路径，可指定多个",
+    )
 
     parser.add_argument(
         "-H",
@@ -132,12 +198,15 @@ def main():
 
     print("🚀 FRC Scout 文件上传工具")
     print("=" * 50)
-    print(f"文件: {args.file}")
+    print(f"文件: {', '.join(args.file)}")
     print(f"服务器: {args.host}:{args.port}")
     print("=" * 50)
 
     # 执行上传
-    success = upload_file(args.file, args.host, args.port)
+    if len(args.file) == 1:
+        success = upload_file(args.file[0], args.host, args.port)
+    else:
+        success = upload_files_batch(args.file, args.host, args.port)
 
     print("=" * 50)
     if success:
@@ -2,6 +2,10 @@ import re
 import os
 import shutil
 import logging
+from backend.service.match_filter import match_order_key
+from backend.service.match_store import MatchStore
+from backend.service.sqlite_store import SQLiteMatchIndex
+from backend.service.processed_snapshot import ProcessedSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,61 @@ ATTRIBUTE_SHORTCUTS_FILE = os.path.join(
 os.makedirs(RAW_DATA_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
 
+# 存储后端: "file"（默认，仅使用JSON文件）或 "sqlite"（额外维护带索引的SQLite库）
+STORAGE_BACKEND = os.environ.get("SCOUTING_STORAGE_BACKEND", "file")
+SQLITE_DB_PATH = os.path.join(
+    os.path.dirname(__file__), "match_records", "match_statistics.db"
+)
+# 处理后数据的压缩快照及其追加日志（仅 file 后端使用）
+PROCESSED_SNAPSHOT_FILE = os.path.join(
+    os.path.dirname(__file__), "match_records", "processed_snapshot.json"
+)
+PROCESSED_SNAPSHOT_LOG_FILE = os.path.join(
+    os.path.dirname(__file__), "match_records", "processed_snapshot.log"
+)
+# 快照压缩任务的执行间隔（分钟）
+SNAPSHOT_COMPACT_INTERVAL_MINUTES = 10
+
+# 聚合结果的热启动快照及其保存间隔（分钟）
+WARM_START_FILE = os.path.join(
+    os.path.dirname(__file__), "match_records", "team_statistics_warm_start.json"
+)
+WARM_START_SAVE_INTERVAL_MINUTES = 2
+
+# 上传的比赛记录是否交给后台队列异步分析（返回202），以及队列容量
+INGEST_ASYNC = os.environ.get("SCOUTING_INGEST_ASYNC", "true").lower() == "true"
+INGEST_QUEUE_SIZE = 256
+
+# 队伍统计全量聚合是否使用NumPy向量化实现（需要安装numpy，未安装时自动使用逐场实现）
+VECTORIZED_AGGREGATION = (
+    os.environ.get("SCOUTING_VECTORIZED_AGGREGATION", "false").lower() == "true"
+)
+
+# 未缓存的过滤条件是否由预先提取的 (队伍, 比赛等级, 场次) 部分聚合合并得到
+# （跨比赛等级合并的浮点数总和可能与逐场累加在最后一位上不同）
+PARTIAL_AGGREGATION = (
+    os.environ.get("SCOUTING_PARTIAL_AGGREGATION", "false").lower() == "true"
+)
+
+# 批量获取队伍统计数据时一次请求的过滤条件数量上限（与队伍统计数据缓存的容量一致）
+TEAM_STATISTICS_BATCH_MAX_FILTERS = 16
+
+# 预序列化响应缓存的总字节数上限（JSON原文与gzip副本合计）
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.environ.get("SCOUTING_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+)
+
+# 常驻内存的比赛统计数据存储
+if STORAGE_BACKEND == "sqlite":
+    match_store = MatchStore(PROCESSED_DATA_DIR, index=SQLiteMatchIndex(SQLITE_DB_PATH))
+else:
+    match_store = MatchStore(
+        PROCESSED_DATA_DIR,
+        snapshot=ProcessedSnapshot(
+            PROCESSED_SNAPSHOT_FILE, PROCESSED_SNAPSHOT_LOG_FILE
+        ),
+    )
+
 
 def parse_filename(filename):
     """解析文件名，提取tournament_level, match_no, timestamp等信息"""
@@ -80,12 +139,10 @@ def get_file_list(include_trash=False):
                 file_info["status"] = "trash"
                 files.append(file_info)
 
-    # 按tournament_level, match_no, timestamp排序
+    # 按tournament_level, match_no, timestamp排序，Practice < Qualification < Playoff
     def sort_key(file_info):
-        # 为tournament_level分配权重，Practice < Qualification < Playoff
-        level_weight = {"Practice": 1, "Qualification": 2, "Playoff": 3}
-        return (
-            level_weight.get(file_info["tournament_level"], 0),
+        return match_order_key(
+            file_info["tournament_level"],
             file_info["match_no"],
             file_info["timestamp"],
         )
@@ -112,6 +169,7 @@ def move_files_to_trash(filenames):
             processed_dst = os.path.join(TRASH_PROCESSED_DIR, filename)
             if os.path.exists(processed_src):
                 shutil.move(processed_src, processed_dst)
+            match_store.remove(filename)
 
             success_count += 1
             logger.info(f"已将文件移动到回收站: {filename}")
@@ -141,6 +199,7 @@ def restore_files_from_trash(filenames):
             processed_dst = os.path.join(PROCESSED_DATA_DIR, filename)
             if os.path.exists(processed_src):
                 shutil.move(processed_src, processed_dst)
+                match_store.add_from_file(filename)
 
             success_count += 1
             logger.info(f"已从回收站恢复文件: {filename}")
@@ -168,6 +227,7 @@ def permanently_delete_files(filenames):
             processed_path = os.path.join(TRASH_PROCESSED_DIR, filename)
             if os.path.exists(processed_path):
                 os.remove(processed_path)
+            match_store.remove(filename)
 
             success_count += 1
             logger.info(f"已永久删除文件: {filename}")